@@ -0,0 +1,222 @@
+"""
+KvLite micro-benchmark.
+
+Sweeps pool sizes (reader connections), shard counts, key counts, value sizes
+and concurrency levels for the common KvLite operations and reports ops/sec
+and latency percentiles as JSON. Everything runs against a temporary
+directory; no external services are needed.
+
+Usage:
+    python benchmarks/kvlite_bench.py --pool-sizes 1,4,8 --concurrency 1,16,64 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from socketio_proxy.util.kvlite import KvLite
+from socketio_proxy.util.sharded_kvlite import ShardedKvLite
+
+ALL_OPS = ["get", "set", "mget", "mset", "incr", "hset", "setnx", "list_group", "cleanup"]
+GROUP = "bench"
+
+# 遍历整个 group 或清理过期键的操作开销远大于单键操作，按比例减少执行次数
+HEAVY_OP_DIVISOR = {"list_group": 100, "cleanup": 100}
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    latencies.sort()
+    to_ms = lambda seconds: round(seconds * 1000, 4)
+    return {
+        "ops": len(latencies),
+        "elapsed_s": round(elapsed, 4),
+        "ops_per_sec": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "mean": to_ms(statistics.fmean(latencies)) if latencies else 0.0,
+            "p50": to_ms(percentile(latencies, 50)),
+            "p90": to_ms(percentile(latencies, 90)),
+            "p99": to_ms(percentile(latencies, 99)),
+            "max": to_ms(latencies[-1]) if latencies else 0.0,
+        },
+    }
+
+async def run_concurrent(op: Callable[[int], Awaitable[Any]], total: int, concurrency: int) -> Dict[str, Any]:
+    """用 concurrency 个协程执行 total 次 op，记录每次调用的延迟。"""
+    latencies: List[float] = []
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await op(i)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return summarize(latencies, time.perf_counter() - started)
+
+async def insert_expired(store, count: int, value: bytes):
+    """直接通过写连接插入已过期的行，供 cleanup 基准使用。"""
+    shards = store.shards if isinstance(store, ShardedKvLite) else [store]
+    expired_at = time.time() - 1
+    for shard in shards:
+        rows = [(GROUP, f"expired:{i}", value, expired_at) for i in range(count // len(shards))]
+        async with shard._get_writer() as conn:
+            await conn.executemany(KvLite._SQL_INSERT, rows)
+            await conn.commit()
+
+async def run_cleanup(store):
+    shards = store.shards if isinstance(store, ShardedKvLite) else [store]
+    for shard in shards:
+        async with shard._get_writer() as conn:
+            await conn.execute(KvLite._SQL_CLEANUP, (time.time(),))
+            await conn.commit()
+
+async def bench_cleanup(store, total: int, expired_per_run: int, value: bytes) -> Dict[str, Any]:
+    """
+    TTL 清理由单个后台任务顺序执行，因此不做并发扫描：
+    每轮先插入 expired_per_run 个过期键，只对清理语句本身计时。
+    """
+    latencies: List[float] = []
+    for _ in range(total):
+        await insert_expired(store, expired_per_run, value)
+        start = time.perf_counter()
+        await run_cleanup(store)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, sum(latencies))
+
+def build_ops(store, keys: List[str], value: bytes, batch_size: int) -> Dict[str, Callable[[int], Awaitable[Any]]]:
+    key_count = len(keys)
+    rand = random.Random(42)
+
+    def batch(i: int) -> List[str]:
+        start = (i * batch_size) % key_count
+        return [keys[(start + j) % key_count] for j in range(batch_size)]
+
+    return {
+        "get": lambda i: store.get(keys[rand.randrange(key_count)], GROUP),
+        "set": lambda i: store.set(keys[rand.randrange(key_count)], value, GROUP),
+        "mget": lambda i: store.mget(batch(i), GROUP),
+        "mset": lambda i: store.mset({key: value for key in batch(i)}, GROUP),
+        "incr": lambda i: store.incr(f"counter:{i % 64}", "bench_counters"),
+        "hset": lambda i: store.hset(f"hash:{i % 64}", f"field:{i % 16}", i, "bench_hashes"),
+        "setnx": lambda i: store.setnx(f"nx:{i}", value, "bench_nx"),
+        "list_group": lambda i: store.list_group(GROUP),
+    }
+
+async def bench_case(args, pool_size: int, shards: int, key_count: int, value_size: int) -> List[Dict[str, Any]]:
+    work_dir = tempfile.mkdtemp(prefix="kvlite_bench_")
+    db_path = os.path.join(work_dir, "bench.db")
+    if shards > 1:
+        store = await ShardedKvLite.create(db_path, shards, pool_size=pool_size, cleanup_interval=None)
+    else:
+        store = await KvLite.create(db_path, pool_size=pool_size, cleanup_interval=None)
+
+    results = []
+    try:
+        value = os.urandom(value_size)
+        keys = [f"key:{i:08d}" for i in range(key_count)]
+        for start in range(0, key_count, 1000):
+            await store.mset({key: value for key in keys[start:start + 1000]}, GROUP)
+
+        ops = build_ops(store, keys, value, args.batch_size)
+        for op_name in args.ops:
+            total = max(1, args.requests // HEAVY_OP_DIVISOR.get(op_name, 1))
+            concurrency_levels = [1] if op_name == "cleanup" else args.concurrency
+            for concurrency in concurrency_levels:
+                if op_name == "cleanup":
+                    summary = await bench_cleanup(store, total, min(key_count, 1000), value)
+                else:
+                    summary = await run_concurrent(ops[op_name], total, concurrency)
+                case = {
+                    "op": op_name,
+                    "pool_size": pool_size,
+                    "shards": shards,
+                    "key_count": key_count,
+                    "value_size": value_size,
+                    "concurrency": concurrency,
+                }
+                if op_name in ("mget", "mset"):
+                    case["batch_size"] = args.batch_size
+                case.update(summary)
+                results.append(case)
+                if not args.quiet:
+                    print(f"{op_name:>10} pool={pool_size:<3} shards={shards:<2} keys={key_count:<8} "
+                          f"value={value_size:<7} c={concurrency:<4} {case['ops_per_sec']:>12} ops/s "
+                          f"p99={case['latency_ms']['p99']}ms", file=sys.stderr)
+    finally:
+        await store.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+async def async_main(args):
+    results = []
+    for pool_size in args.pool_sizes:
+        for shards in args.shards:
+            for key_count in args.key_counts:
+                for value_size in args.value_sizes:
+                    results.extend(await bench_case(args, pool_size, shards, key_count, value_size))
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {
+            "requests": args.requests,
+            "batch_size": args.batch_size,
+            "reader_mmap_size": KvLite.READER_MMAP_SIZE,
+            "reader_cache_kb": KvLite.READER_CACHE_KB,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+def main():
+    parser = argparse.ArgumentParser(description="KvLite micro-benchmark")
+    parser.add_argument("--ops", type=lambda v: v.split(","), default=ALL_OPS, help=f"Comma-separated ops ({','.join(ALL_OPS)})")
+    parser.add_argument("--pool-sizes", type=parse_int_list, default=[1, 4, 8], help="Reader pool sizes to sweep")
+    parser.add_argument("--shards", type=parse_int_list, default=[1], help="Shard counts to sweep (>1 uses ShardedKvLite)")
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 16, 64], help="Concurrent coroutines to sweep")
+    parser.add_argument("--value-sizes", type=parse_int_list, default=[64, 4096], help="Value sizes in bytes to sweep")
+    parser.add_argument("--key-counts", type=parse_int_list, default=[10000], help="Pre-populated key counts to sweep")
+    parser.add_argument("--requests", type=int, default=2000, help="Operations per case")
+    parser.add_argument("--batch-size", type=int, default=50, help="Keys per mget/mset call")
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="Do not print per-case progress to stderr")
+    args = parser.parse_args()
+
+    unknown = [op for op in args.ops if op not in ALL_OPS]
+    if unknown:
+        parser.error(f"Unknown ops: {', '.join(unknown)}")
+
+    asyncio.run(async_main(args))
+
+if __name__ == "__main__":
+    main()
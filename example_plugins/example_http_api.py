@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request, Depends
 from socketio_proxy.config.logging import logger
 from socketio_proxy.core.socketio_client import SocketIOClient
+from socketio_proxy.core.emit_scheduler import EmitQueueFullError
 from socketio_proxy.web.dependencies import app_context
 
 router = APIRouter()
@@ -32,7 +33,29 @@ async def send_sio_message(
     event = body.get("event", "message")
     data = body.get("data", {})
     
-    await sio_client.client.emit(event, data)
+    try:
+        # 经由出站调度器发送 (限速 / 优先级 / 有界队列)
+        await sio_client.emit(event, data, body.get("priority", "normal"))
+    except EmitQueueFullError as e:
+        return {"status": "error", "message": str(e)}
     logger.info(f"Sent SIO message via custom API. Event: {event}, Data: {data}")
     
-    return {"status": "ok", "message": "SIO message sent."}
\ No newline at end of file
+    return {"status": "ok", "message": "SIO message sent."}
+
+@router.post("/custom_api/call_sio")
+async def call_sio(
+    request: Request,
+    sio_client: SocketIOClient = Depends(lambda: app_context.get_sio_client())
+):
+    """
+    一个通过 sio_client.call 发送消息并等待服务端确认 (ack) 的端点。
+    """
+    if not sio_client.client.connected:
+        return {"status": "error", "message": "Socket.IO client is not connected."}
+
+    body = await request.json()
+    event = body.get("event", "message")
+    data = body.get("data", {})
+
+    ack = await sio_client.call(event, data)
+    return {"status": "ok", "ack": ack}
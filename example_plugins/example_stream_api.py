@@ -0,0 +1,75 @@
+import asyncio
+import os
+from typing import Optional
+from fastapi import APIRouter, Request, HTTPException
+from socketio_proxy.config.logging import logger
+from socketio_proxy.util.kvlite import KvLite
+from socketio_proxy.web.dependencies import app_context
+
+router = APIRouter()
+
+STREAM_DB_PATH = os.getenv("STREAM_DB_PATH", "streams.db")
+MAX_PULL_COUNT = 1000
+MAX_PULL_BLOCK = 30.0
+
+_kvlite_lock = asyncio.Lock()
+
+async def get_stream_store() -> KvLite:
+    """
+    懒加载共享的 KvLite 实例，并注册到 app_context 中供其他插件 (例如预处理器) 使用。
+    """
+    store = app_context.get_custom_data("kvlite")
+    if store:
+        return store
+    async with _kvlite_lock:
+        store = app_context.get_custom_data("kvlite")
+        if not store:
+            store = await KvLite.create(STREAM_DB_PATH)
+            app_context.set_custom_data("kvlite", store)
+            logger.info(f"Stream store opened at '{STREAM_DB_PATH}'.")
+    return store
+
+@router.post("/streams/{stream}")
+async def append_stream(stream: str, request: Request):
+    """向流追加一个条目。请求体为任意 JSON。"""
+    body = await request.json()
+    store = await get_stream_store()
+    entry_id = await store.xadd(stream, body)
+    return {"status": "ok", "id": entry_id}
+
+@router.get("/streams/{stream}")
+async def pull_stream(stream: str, after: Optional[int] = None, group: Optional[str] = None,
+                      count: int = 100, block: float = 0):
+    """
+    拉取流中的条目。
+    - 指定 group 时从该消费组最后确认的位置之后读取，否则从 after (默认 0) 之后读取。
+    - block: 没有新条目时最多等待的秒数 (长轮询)。
+    """
+    count = max(1, min(count, MAX_PULL_COUNT))
+    block = max(0.0, min(block, MAX_PULL_BLOCK))
+    store = await get_stream_store()
+    if group and after is None:
+        entries = await store.xreadgroup(stream, group, count, block)
+    else:
+        entries = await store.xread(stream, after or 0, count, block)
+    return {
+        "status": "ok",
+        "entries": [{"id": entry_id, "data": data} for entry_id, data in entries],
+        "last_id": entries[-1][0] if entries else after
+    }
+
+@router.post("/streams/{stream}/ack")
+async def ack_stream(stream: str, request: Request):
+    """
+    确认消费组的处理位置。请求体: {"group": str, "id": int}
+    """
+    body = await request.json()
+    try:
+        group = body["group"]
+        entry_id = int(body["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid request format. Required JSON: {'group': str, 'id': int}")
+
+    store = await get_stream_store()
+    offset = await store.xack(stream, group, entry_id)
+    return {"status": "ok", "group": group, "last_id": offset}
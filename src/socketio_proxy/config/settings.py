@@ -15,17 +15,60 @@ class ProxyConfig:
     listen_port: int
     base_url: str
     headers: Dict[str, str]
+    history_size: int = 1000
+    history_max_bytes: int = 8 * 1024 * 1024
+    history_backfill: int = 100
+    sse_buffer_size: int = 1000
+    ws_compress_level: int = 6
+    ws_per_message_deflate: bool = True
+    call_timeout: float = 10.0
+    max_inflight_calls: int = 1000
+    emit_max_queue: int = 10000
+    emit_rate_limits: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    emit_default_rate: Optional[float] = None
+    emit_default_burst: Optional[float] = None
+    emit_global_rate: Optional[float] = None
+    emit_global_burst: Optional[float] = None
+    trace_sample_rate: float = 0.01
+    trace_buffer_size: int = 500
+    loop_lag_interval: float = 0.1
+    loop_lag_warn_ms: float = 100.0
+    web_workers: int = 0
+    ipc_path: str = "/tmp/socketio_proxy.ipc"
+    ipc_max_buffer_bytes: int = 16 * 1024 * 1024
+    ingest_listen_port: Optional[int] = None
+    overload_queue_ratio: Optional[float] = None
+    overload_loop_lag_ms: Optional[float] = None
+
+    def emit_options(self) -> Dict[str, Any]:
+        """Keyword arguments for the outbound EmitScheduler."""
+        return {
+            "max_queue": self.emit_max_queue,
+            "rate_limits": self.emit_rate_limits,
+            "default_rate": self.emit_default_rate,
+            "default_burst": self.emit_default_burst,
+            "global_rate": self.emit_global_rate,
+            "global_burst": self.emit_global_burst,
+        }
 
 @dataclass
 class DispatchRule:
     schema: Dict[str, Any]
     dispatchers: List[Dict[str, Any]]
     preprocessor: Optional[str] = None # New field for event preprocessor
+    priority: str = "normal" # high / normal / low, used by the overload controller
+    sample_rate: Optional[float] = None # Fraction of events kept while this rule is being shed
 
 @dataclass
 class DispatchConfig:
     rules: List[DispatchRule] = field(default_factory=list)
 
+def _optional_float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+def _optional_int(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
 class ConfigLoader:
     def __init__(self, config_path=None):
         config = {}
@@ -39,7 +82,31 @@ class ConfigLoader:
             listen_host=proxy_config_data.get("listen_host", os.getenv("LISTEN_HOST", "0.0.0.0")),
             listen_port=int(proxy_config_data.get("listen_port", os.getenv("LISTEN_PORT", "3080"))),
             base_url=proxy_config_data.get("base_url", os.getenv("BASE_URL", "")),
-            headers=proxy_config_data.get("headers", {})
+            headers=proxy_config_data.get("headers", {}),
+            history_size=int(proxy_config_data.get("history_size", 1000)),
+            history_max_bytes=int(proxy_config_data.get("history_max_bytes", 8 * 1024 * 1024)),
+            history_backfill=int(proxy_config_data.get("history_backfill", 100)),
+            sse_buffer_size=int(proxy_config_data.get("sse_buffer_size", 1000)),
+            ws_compress_level=int(proxy_config_data.get("ws_compress_level", 6)),
+            ws_per_message_deflate=bool(proxy_config_data.get("ws_per_message_deflate", True)),
+            call_timeout=float(proxy_config_data.get("call_timeout", 10.0)),
+            max_inflight_calls=int(proxy_config_data.get("max_inflight_calls", 1000)),
+            emit_max_queue=int(proxy_config_data.get("emit_max_queue", 10000)),
+            emit_rate_limits=proxy_config_data.get("emit_rate_limits") or {},
+            emit_default_rate=_optional_float(proxy_config_data.get("emit_default_rate")),
+            emit_default_burst=_optional_float(proxy_config_data.get("emit_default_burst")),
+            emit_global_rate=_optional_float(proxy_config_data.get("emit_global_rate")),
+            emit_global_burst=_optional_float(proxy_config_data.get("emit_global_burst")),
+            trace_sample_rate=float(proxy_config_data.get("trace_sample_rate", 0.01)),
+            trace_buffer_size=int(proxy_config_data.get("trace_buffer_size", 500)),
+            loop_lag_interval=float(proxy_config_data.get("loop_lag_interval", 0.1)),
+            loop_lag_warn_ms=float(proxy_config_data.get("loop_lag_warn_ms", 100.0)),
+            web_workers=int(proxy_config_data.get("web_workers", os.getenv("WEB_WORKERS", "0"))),
+            ipc_path=proxy_config_data.get("ipc_path", "/tmp/socketio_proxy.ipc"),
+            ipc_max_buffer_bytes=int(proxy_config_data.get("ipc_max_buffer_bytes", 16 * 1024 * 1024)),
+            ingest_listen_port=_optional_int(proxy_config_data.get("ingest_listen_port")),
+            overload_queue_ratio=_optional_float(proxy_config_data.get("overload_queue_ratio")),
+            overload_loop_lag_ms=_optional_float(proxy_config_data.get("overload_loop_lag_ms"))
         )
 
         if self.proxy_config.base_url and not self.proxy_config.base_url.startswith('/'):
@@ -52,7 +119,9 @@ class ConfigLoader:
             parsed_rules.append(DispatchRule(
                 schema=rule_data['schema'],
                 dispatchers=rule_data['dispatchers'],
-                preprocessor=rule_data.get('preprocessor')
+                preprocessor=rule_data.get('preprocessor'),
+                priority=rule_data.get('priority', 'normal'),
+                sample_rate=_optional_float(rule_data.get('sample_rate'))
             ))
         self.dispatch_config = DispatchConfig(rules=parsed_rules)
 
@@ -0,0 +1,295 @@
+"""
+Outbound emit scheduling: rate limiting, priorities and coalescing for upstream sends.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from socketio_proxy.config.logging import logger
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+class EmitQueueFullError(Exception):
+    """Raised when an emit is rejected because the outbound queue is full."""
+    pass
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `burst` tokens stored."""
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst and burst > 0 else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+@dataclass
+class _EmitItem:
+    event: str
+    data: Any
+    priority: int
+    coalesce_key: Optional[str]
+    future: asyncio.Future
+    call_timeout: Optional[float] = None  # set for calls that wait for the server's ack
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class EmitScheduler:
+    """
+    Queues outbound emits and sends them from a single worker task.
+
+    - Per-event token buckets (plus an optional global bucket) cap the send rate.
+    - Three priority lanes (high / normal / low); higher lanes are always served first.
+    - Items submitted with a coalesce_key replace a queued, not yet sent item with
+      the same event and key, so only the latest state is sent.
+    - Calls (emits that wait for an ack) are queued and rate limited like any
+      other emit; once admitted they run concurrently so the worker does not
+      wait for the ack.
+    - The queue is bounded; submit() rejects with EmitQueueFullError (or waits
+      for space when block=True).
+    """
+    SCAN_LIMIT = 64  # How far into a lane to look past rate-limited items
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, send: Callable[[str, Any], Awaitable[Any]], max_queue: int = 10000,
+                 call: Optional[Callable[..., Awaitable[Any]]] = None,
+                 rate_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 default_rate: Optional[float] = None, default_burst: Optional[float] = None,
+                 global_rate: Optional[float] = None, global_burst: Optional[float] = None):
+        self._send = send
+        self._call = call
+        self.max_queue = max_queue
+        self._rate_limits = rate_limits or {}
+        self._default_rate = default_rate
+        self._default_burst = default_burst
+        self._global_bucket = TokenBucket(global_rate, global_burst) if global_rate else None
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+
+        self._lanes: List[Deque[_EmitItem]] = [deque() for _ in PRIORITIES]
+        self._coalesce_index: Dict[Tuple[str, str], _EmitItem] = {}
+        self._size = 0
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._calls: Set[asyncio.Future] = set()  # admitted calls waiting for their ack
+        self._closed = False
+
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+
+    def _bucket_for(self, event: str) -> Optional[TokenBucket]:
+        if event not in self._buckets:
+            limit = self._rate_limits.get(event)
+            if limit:
+                self._buckets[event] = TokenBucket(float(limit["rate"]), limit.get("burst"))
+            elif self._default_rate:
+                self._buckets[event] = TokenBucket(self._default_rate, self._default_burst)
+            else:
+                self._buckets[event] = None
+        return self._buckets[event]
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, event: str, data: Any, priority: str = "normal",
+                     coalesce_key: Optional[str] = None, block: bool = False,
+                     call_timeout: Optional[float] = None) -> asyncio.Future:
+        """
+        Enqueues an emit and returns a future that resolves once it has been sent.
+        With call_timeout, the event is sent as a call and the future resolves
+        to the server's ack instead.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Expected one of: {', '.join(PRIORITIES)}")
+        if call_timeout is not None:
+            if self._call is None:
+                raise ValueError("This scheduler cannot send calls.")
+            coalesce_key = None  # every call expects its own ack
+        if self._closed:
+            raise ConnectionError("Emit scheduler closed.")
+        self._ensure_worker()
+
+        if coalesce_key is not None:
+            queued = self._coalesce_index.get((event, coalesce_key))
+            if queued is not None:
+                queued.data = data
+                self.coalesced += 1
+                return queued.future
+
+        while self._size >= self.max_queue:
+            if not block:
+                self.rejected += 1
+                raise EmitQueueFullError(f"Outbound queue is full ({self.max_queue} pending emits).")
+            self._space.clear()
+            await self._space.wait()
+            if self._closed:
+                raise ConnectionError("Emit scheduler closed.")
+
+        item = _EmitItem(event, data, PRIORITIES[priority], coalesce_key, asyncio.get_running_loop().create_future(),
+                         call_timeout)
+        self._lanes[item.priority].append(item)
+        if coalesce_key is not None:
+            self._coalesce_index[(event, coalesce_key)] = item
+        self._size += 1
+        self._wakeup.set()
+        return item.future
+
+    async def emit(self, event: str, data: Any, priority: str = "normal",
+                   coalesce_key: Optional[str] = None, block: bool = False) -> Any:
+        """Submits an emit and waits until it has been sent."""
+        return await (await self.submit(event, data, priority, coalesce_key, block))
+
+    async def call(self, event: str, data: Any, timeout: float, priority: str = "normal", block: bool = False) -> Any:
+        """Queues a call and returns the server's ack. The timeout covers the ack, not the queue wait."""
+        return await (await self.submit(event, data, priority, block=block, call_timeout=timeout))
+
+    def _next_ready(self, now: float) -> Tuple[Optional[_EmitItem], float]:
+        """
+        Picks the first sendable item from the highest non-empty lane.
+        Returns (item, 0) or (None, seconds to wait before retrying).
+        """
+        wait = float("inf")
+        if self._global_bucket:
+            global_wait = self._global_bucket.wait_time(now)
+            if global_wait > 0:
+                return None, global_wait
+
+        for lane in self._lanes:
+            blocked_events = set()
+            for index, item in enumerate(lane):
+                if index >= self.SCAN_LIMIT:
+                    break
+                if item.event in blocked_events:
+                    continue  # keep per-event order
+                bucket = self._bucket_for(item.event)
+                item_wait = bucket.wait_time(now) if bucket else 0.0
+                if item_wait == 0:
+                    del lane[index]
+                    if bucket:
+                        bucket.take()
+                    if self._global_bucket:
+                        self._global_bucket.take()
+                    return item, 0.0
+                blocked_events.add(item.event)
+                wait = min(wait, item_wait)
+        return None, wait
+
+    async def _run(self):
+        while True:
+            if not self._size:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            item, wait = self._next_ready(time.monotonic())
+            if item is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._size -= 1
+            self._space.set()
+            if item.coalesce_key is not None:
+                self._coalesce_index.pop((item.event, item.coalesce_key), None)
+
+            if item.call_timeout is not None:
+                self._start_call(item)
+                continue
+            try:
+                result = await self._send(item.event, item.data)
+                self.sent += 1
+                self._latencies.append(time.monotonic() - item.enqueued_at)
+                if not item.future.done():
+                    item.future.set_result(result)
+            except asyncio.CancelledError:
+                self._fail(item, ConnectionError("Emit scheduler closed."))
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Emit of '{item.event}' failed: {e}")
+                self._fail(item, e)
+
+    def _start_call(self, item: _EmitItem):
+        """Sends an admitted call without holding up the worker; the caller gets the ack or the error."""
+        self.sent += 1
+        self._latencies.append(time.monotonic() - item.enqueued_at)
+        task = asyncio.ensure_future(self._call(item.event, item.data, timeout=item.call_timeout))
+        self._calls.add(task)
+
+        def done(task: asyncio.Future):
+            self._calls.discard(task)
+            if item.future.done():
+                if not task.cancelled():
+                    task.exception()
+            elif task.cancelled():
+                item.future.cancel()
+            elif task.exception() is not None:
+                item.future.set_exception(task.exception())
+            else:
+                item.future.set_result(task.result())
+        task.add_done_callback(done)
+
+    @staticmethod
+    def _fail(item: _EmitItem, error: Exception):
+        if not item.future.done():
+            item.future.set_exception(error)
+            # Submitters may not await the future; the failure is already logged/counted.
+            item.future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3) if ordered else 0.0
+        return {
+            "queue_depth": self._size,
+            "max_queue": self.max_queue,
+            "lanes": {name: len(self._lanes[index]) for name, index in PRIORITIES.items()},
+            "sent": self.sent,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "send_latency_ms": {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99),
+                                "max": round(ordered[-1] * 1000, 3) if ordered else 0.0},
+        }
+
+    async def close(self):
+        """
+        Stops the worker, fails any emits still queued and cancels calls
+        still waiting for an ack. Later submits raise ConnectionError.
+        """
+        self._closed = True
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for lane in self._lanes:
+            while lane:
+                self._fail(lane.popleft(), ConnectionError("Emit scheduler closed."))
+        self._coalesce_index.clear()
+        self._size = 0
+        self._space.set()  # wake blocked submitters so they see the scheduler is closed
+        calls = list(self._calls)
+        for task in calls:
+            task.cancel()
+        if calls:
+            await asyncio.gather(*calls, return_exceptions=True)
@@ -0,0 +1,319 @@
+"""
+Local IPC between the ingest process and web worker processes.
+
+The ingest process owns the upstream SocketIOClient and the dispatch
+pipeline and runs an IngestHub on a Unix domain socket. Each web worker
+connects with a RemoteSocketIOClient, which:
+- receives every event published to the ingest WebSocketManager as the
+  already-encoded frame, together with its sequence number;
+- receives a status snapshot (connection state, emit and call stats) every
+  STATUS_INTERVAL seconds;
+- forwards upstream sends (emit, call, restart, reload) as RPCs.
+
+Messages are msgpack arrays, each prefixed with a 4-byte big-endian length:
+  hub -> worker: ["event", seq, event, frame] | ["status", {...}] | ["reply", id, error_type, result]
+  worker -> hub: ["hello", index] | ["rpc", id, method, args]
+"""
+import asyncio
+import itertools
+import os
+import struct
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import msgpack
+import socketio
+import httpx
+
+from socketio_proxy.config.logging import logger
+from socketio_proxy.core.emit_scheduler import EmitQueueFullError
+from socketio_proxy.core.socketio_client import SocketIOClient, CallCapacityError
+
+LENGTH_PREFIX = struct.Struct(">I")
+STATUS_INTERVAL = 1.0
+
+# Exceptions that keep their type across the IPC boundary, so web routes
+# answer the same way (429, 400, 504, ...) as in single-process mode.
+_ERRORS: Dict[str, type] = {
+    "EmitQueueFullError": EmitQueueFullError,
+    "CallCapacityError": CallCapacityError,
+    "ValueError": ValueError,
+    "FileNotFoundError": FileNotFoundError,
+    "socketio.TimeoutError": socketio.exceptions.TimeoutError,
+}
+
+def _error_name(error: BaseException) -> str:
+    if isinstance(error, socketio.exceptions.TimeoutError):
+        return "socketio.TimeoutError"
+    name = type(error).__name__
+    return name if name in _ERRORS else "RuntimeError"
+
+def _pack(message: list) -> bytes:
+    payload = msgpack.packb(message, use_bin_type=True)
+    return LENGTH_PREFIX.pack(len(payload)) + payload
+
+async def _read(reader: asyncio.StreamReader) -> list:
+    header = await reader.readexactly(LENGTH_PREFIX.size)
+    (length,) = LENGTH_PREFIX.unpack(header)
+    return msgpack.unpackb(await reader.readexactly(length), raw=False)
+
+class _Worker:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.index: Optional[int] = None
+        self.dropped = 0
+
+class IngestHub:
+    """
+    Ingest side of the IPC channel. Fans encoded /ws frames out to the web
+    workers and executes their upstream sends on the real SocketIOClient.
+    A worker that cannot keep up (more than max_buffer_bytes unsent) misses
+    frames; its history is reset at the gap.
+    """
+    def __init__(self, path: str, sio_client: SocketIOClient, websocket_manager: Any,
+                 reloader: Optional[Callable[[], Awaitable[dict]]] = None, max_buffer_bytes: int = 16 * 1024 * 1024):
+        self.path = path
+        self.sio_client = sio_client
+        self.reloader = reloader
+        self.max_buffer_bytes = max_buffer_bytes
+        self.workers: Set[_Worker] = set()
+        self.rpcs = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._status_task: Optional[asyncio.Task] = None
+        websocket_manager.add_listener(self._on_publish)
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+        self._status_task = asyncio.create_task(self._push_status())
+        logger.info(f"Ingest IPC hub listening on {self.path}.")
+
+    async def stop(self):
+        if self._status_task is not None:
+            self._status_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for worker in list(self.workers):
+            worker.writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _send(self, worker: _Worker, message: list):
+        if not worker.writer.is_closing():
+            worker.writer.write(_pack(message))
+
+    def _on_publish(self, seq: int, message: dict, frame: Any):
+        if not self.workers:
+            return
+        data = _pack(["event", seq, message.get("event", ""), frame])  # encoded once for all workers
+        for worker in self.workers:
+            if worker.writer.is_closing():
+                continue
+            if worker.writer.transport.get_write_buffer_size() > self.max_buffer_bytes:
+                worker.dropped += 1
+                if worker.dropped == 1 or worker.dropped % 1000 == 0:
+                    logger.warning(f"Web worker {worker.index} is not keeping up: {worker.dropped} frame(s) dropped.")
+                continue
+            worker.writer.write(data)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "connected": self.sio_client.client.connected,
+            "emit_stats": self.sio_client.get_emit_stats(),
+            "call_stats": self.sio_client.get_call_stats(),
+        }
+
+    async def _push_status(self):
+        while True:
+            await asyncio.sleep(STATUS_INTERVAL)
+            if self.workers:
+                status = ["status", self.status()]
+                for worker in list(self.workers):
+                    self._send(worker, status)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        worker = _Worker(writer)
+        self.workers.add(worker)
+        self._send(worker, ["status", self.status()])
+        try:
+            while True:
+                message = await _read(reader)
+                if message[0] == "hello":
+                    worker.index = message[1]
+                    logger.info(f"Web worker {worker.index} connected to the ingest hub.")
+                elif message[0] == "rpc":
+                    await self._rpc(worker, *message[1:])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.workers.discard(worker)
+            writer.close()
+            logger.info(f"Web worker {worker.index} disconnected from the ingest hub.")
+
+    def _reply(self, worker: _Worker, rpc_id: int, error: Optional[BaseException], result: Any = None):
+        if error is None:
+            self._send(worker, ["reply", rpc_id, None, result])
+        else:
+            self._send(worker, ["reply", rpc_id, _error_name(error), str(error)])
+
+    async def _rpc(self, worker: _Worker, rpc_id: int, method: str, args: list):
+        self.rpcs += 1
+        if method == "submit":
+            # Queued inline, in arrival order; a full queue with block=True holds this
+            # worker's channel, which applies backpressure to its senders.
+            try:
+                future = await self.sio_client.scheduler.submit(*args)
+            except Exception as e:
+                self._reply(worker, rpc_id, e)
+                return
+            future.add_done_callback(
+                lambda f: self._reply(worker, rpc_id, f.exception()) if not f.cancelled()
+                else self._reply(worker, rpc_id, RuntimeError("emit cancelled")))
+            return
+        asyncio.create_task(self._run_rpc(worker, rpc_id, method, args))
+
+    async def _run_rpc(self, worker: _Worker, rpc_id: int, method: str, args: list):
+        try:
+            if method == "call":
+                result = await self.sio_client.call(*args)
+            elif method == "sio_call":
+                event, data, timeout = args
+                result = await self.sio_client.client.call(event, data, timeout=timeout)
+            elif method == "restart":
+                result = await self.sio_client.restart()
+            elif method == "reload":
+                if self.reloader is None:
+                    raise RuntimeError("Config reload is not available.")
+                result = await self.reloader()
+            else:
+                raise ValueError(f"Unknown IPC method '{method}'")
+        except Exception as e:
+            self._reply(worker, rpc_id, e)
+            return
+        self._reply(worker, rpc_id, None, result)
+
+class _RemoteSio:
+    """Stands in for socketio.AsyncClient in a web worker (`.connected` and `.call`)."""
+    def __init__(self, owner: "RemoteSocketIOClient"):
+        self._owner = owner
+
+    @property
+    def connected(self) -> bool:
+        return self._owner.status.get("connected", False)
+
+    async def call(self, event: str, data: Any = None, timeout: Optional[float] = None) -> Any:
+        return await self._owner._rpc("sio_call", [event, data, timeout])
+
+class _RemoteScheduler:
+    """Stands in for EmitScheduler in a web worker; submit() returns a future resolved once emitted."""
+    def __init__(self, owner: "RemoteSocketIOClient"):
+        self._owner = owner
+
+    async def submit(self, event: str, data: Any = None, priority: str = "normal",
+                     coalesce_key: Optional[str] = None, block: bool = False) -> asyncio.Future:
+        return self._owner._send_rpc("submit", [event, data, priority, coalesce_key, block])
+
+class RemoteSocketIOClient:
+    """
+    The SocketIOClient interface used by web routes and plugins, backed by
+    the ingest process over IPC. Frames received from the hub are published
+    to the worker's WebSocketManager.
+    """
+    RECONNECT_MIN = 0.1
+    RECONNECT_MAX = 5.0
+
+    def __init__(self, path: str, websocket_manager: Any, index: int = 0):
+        self.path = path
+        self.websocket_manager = websocket_manager
+        self.index = index
+        self.status: Dict[str, Any] = {}
+        self.http_client = httpx.AsyncClient()
+        self.client = _RemoteSio(self)
+        self.scheduler = _RemoteScheduler(self)
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, uri: str = None):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        await self.http_client.aclose()
+
+    async def _run(self):
+        delay = self.RECONNECT_MIN
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                self._writer.write(_pack(["hello", self.index]))
+                delay = self.RECONNECT_MIN
+                while True:
+                    await self._handle(await _read(reader))
+            except (OSError, asyncio.IncompleteReadError) as e:
+                logger.warning(f"Web worker {self.index}: ingest hub unavailable ({e}), retrying in {delay:.1f}s.")
+            self._writer = None
+            self.status = {}
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Lost the connection to the ingest process"))
+            self._pending.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX)
+
+    async def _handle(self, message: list):
+        kind = message[0]
+        if kind == "event":
+            _, seq, event, frame = message
+            await self.websocket_manager.publish_frame(seq, event, frame)
+        elif kind == "status":
+            self.status = message[1]
+        elif kind == "reply":
+            _, rpc_id, error_type, result = message
+            future = self._pending.pop(rpc_id, None)
+            if future is None or future.done():
+                return
+            if error_type is None:
+                future.set_result(result)
+            else:
+                future.set_exception(_ERRORS.get(error_type, RuntimeError)(result))
+
+    def _send_rpc(self, method: str, args: list) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if self._writer is None or self._writer.is_closing():
+            future.set_exception(ConnectionError("Not connected to the ingest process"))
+            return future
+        rpc_id = next(self._ids)
+        self._pending[rpc_id] = future
+        self._writer.write(_pack(["rpc", rpc_id, method, args]))
+        return future
+
+    async def _rpc(self, method: str, args: List[Any]) -> Any:
+        return await self._send_rpc(method, args)
+
+    async def emit(self, event: str, data: Any = None, priority: str = "normal",
+                   coalesce_key: Optional[str] = None, block: bool = False):
+        await self._rpc("submit", [event, data, priority, coalesce_key, block])
+
+    async def call(self, event: str, data: Any = None, timeout: float = None, block: bool = False) -> Any:
+        return await self._rpc("call", [event, data, timeout, block])
+
+    async def restart(self):
+        await self._rpc("restart", [])
+
+    async def reload(self) -> dict:
+        return await self._rpc("reload", [])
+
+    def get_emit_stats(self) -> Dict[str, Any]:
+        return self.status.get("emit_stats", {})
+
+    def get_call_stats(self) -> Dict[str, Any]:
+        return self.status.get("call_stats", {})
+
+    @property
+    def http_client_instance(self):
+        return self.http_client
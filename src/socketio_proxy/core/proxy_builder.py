@@ -7,17 +7,34 @@ from socketio_proxy.core.proxy_server import SocketIOProxy
 from socketio_proxy.config.settings import ConfigLoader
 from socketio_proxy.config.logging import logger
 from socketio_proxy.handlers.event_handler_manager import EventHandlerManager
+from socketio_proxy.handlers.overload import OverloadController
 from socketio_proxy.handlers.preprocessors.manager import PreprocessorManager
 from socketio_proxy.handlers.dispatchers.manager import DispatcherManager
 from socketio_proxy.web.websocket_manager import WebSocketManager
+from socketio_proxy.web.sse_manager import SseManager
 from socketio_proxy.web.route_manager import RouteManager
 from socketio_proxy.core.socketio_client import SocketIOClient
 from socketio_proxy.web.dependencies import app_context
+from socketio_proxy.util.tracing import tracer
+from socketio_proxy.util.loop_lag import LoopLagMonitor
+from socketio_proxy.core.ipc import IngestHub
+from socketio_proxy.core.web_workers import WebWorkerPool
 
 class SocketIOProxyBuilder:
     def __init__(self, config_path: str):
+        self.config_path = config_path
         self.config_loader = ConfigLoader(config_path)
-        self.websocket_manager = WebSocketManager()
+        self.event_handler_manager = None
+        proxy_config = self.config_loader.proxy_config
+        self.websocket_manager = WebSocketManager(
+            history_size=proxy_config.history_size,
+            history_max_bytes=proxy_config.history_max_bytes,
+            backfill=proxy_config.history_backfill,
+            compress_level=proxy_config.ws_compress_level
+        )
+        self.sse_manager = SseManager(self.websocket_manager, proxy_config.sse_buffer_size)
+        tracer.configure(proxy_config.trace_sample_rate, proxy_config.trace_buffer_size)
+        self.loop_monitor = LoopLagMonitor(proxy_config.loop_lag_interval, proxy_config.loop_lag_warn_ms)
         self.http_client = httpx.AsyncClient()
         self.preprocessor_manager = self._build_preprocessor_manager()
         self.dispatcher_manager = self._build_dispatcher_manager()
@@ -45,28 +62,63 @@ class SocketIOProxyBuilder:
     async def build(self) -> SocketIOProxy:
         route_manager = self._build_route_manager()
         
-        event_handler_manager = EventHandlerManager(
+        event_handler_manager = self.event_handler_manager = EventHandlerManager(
             self.config_loader.dispatch_config,
             self.http_client,
             self.websocket_manager,
             self.preprocessor_manager,
-            self.dispatcher_manager
+            self.dispatcher_manager,
+            overload=OverloadController(
+                self.config_loader.proxy_config.overload_queue_ratio,
+                self.config_loader.proxy_config.overload_loop_lag_ms,
+                self.loop_monitor
+            )
         )
  
         sio_client = SocketIOClient(
             callback_handler=event_handler_manager.handle,
-            headers=self.config_loader.proxy_config.headers
+            headers=self.config_loader.proxy_config.headers,
+            call_timeout=self.config_loader.proxy_config.call_timeout,
+            max_inflight_calls=self.config_loader.proxy_config.max_inflight_calls,
+            emit_options=self.config_loader.proxy_config.emit_options()
         )
  
         # 注册共享实例到 app_context
         app_context.set_sio_client(sio_client)
         app_context.set_websocket_manager(self.websocket_manager)
+        app_context.set_sse_manager(self.sse_manager)
+        app_context.set_event_handler_manager(event_handler_manager)
+        app_context.set_config_reloader(self.reload_dispatch_rules)
+        app_context.set_loop_monitor(self.loop_monitor)
         
         # 将加载的路由传递给 Proxy
         proxy = SocketIOProxy(
             self.config_loader.proxy_config,
             event_handler_manager,
             sio_client,
-            external_routers=list(route_manager.items.values())
+            external_routers=list(route_manager.items.values()),
+            loop_monitor=self.loop_monitor
         )
-        return proxy
\ No newline at end of file
+        proxy_config = self.config_loader.proxy_config
+        if proxy_config.web_workers > 0:
+            # Ingest mode: web clients are served by worker processes fed over IPC.
+            proxy.ipc_hub = IngestHub(proxy_config.ipc_path, sio_client, self.websocket_manager,
+                                      reloader=self.reload_dispatch_rules,
+                                      max_buffer_bytes=proxy_config.ipc_max_buffer_bytes)
+            proxy.worker_pool = WebWorkerPool(proxy_config, self.config_path)
+        return proxy
+
+    async def reload_dispatch_rules(self) -> dict:
+        """
+        Re-reads the config file and swaps in the new dispatch rules without
+        touching the Socket.IO connection or web clients. Only `dispatch` and
+        `extend.preprocessors` are reloaded; other sections need a restart.
+        """
+        if not self.config_path or not os.path.exists(self.config_path):
+            raise FileNotFoundError(f"Config file not found: {self.config_path}")
+        config_loader = ConfigLoader(self.config_path)
+        if config_loader.extend_config.preprocessors:
+            self.preprocessor_manager.load_from_paths(config_loader.extend_config.preprocessors)
+        result = await self.event_handler_manager.reload(config_loader.dispatch_config)
+        self.config_loader.dispatch_config = config_loader.dispatch_config
+        return result
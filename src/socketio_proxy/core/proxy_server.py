@@ -6,7 +6,8 @@ from socketio_proxy.web import routes as api
 from socketio_proxy.config.logging import logger
 from socketio_proxy.config.settings import ProxyConfig
 from socketio_proxy.handlers.event_handler_manager import EventHandlerManager
-from typing import List
+from socketio_proxy.util.loop_lag import LoopLagMonitor
+from typing import List, Optional
 from fastapi import APIRouter
 
 class SocketIOProxy:
@@ -14,7 +15,8 @@ class SocketIOProxy:
     A class to manage the lifecycle of the proxy server.
     """
 
-    def __init__(self, proxy_config: ProxyConfig, event_handler_manager: EventHandlerManager, sio_client: SocketIOClient, external_routers: List[APIRouter] = None):
+    def __init__(self, proxy_config: ProxyConfig, event_handler_manager: EventHandlerManager, sio_client: SocketIOClient, external_routers: List[APIRouter] = None,
+                 loop_monitor: Optional[LoopLagMonitor] = None):
         logger.info(f"Proxy init. SIO URL: {proxy_config.socketio_server_url}, Listen: {proxy_config.listen_host}:{proxy_config.listen_port}, Base URL: {proxy_config.base_url}, Headers: {proxy_config.headers}")
 
         self.proxy_config = proxy_config
@@ -24,6 +26,7 @@ class SocketIOProxy:
         self.sio = self.sio_client.client
         self.http_client = self.sio_client.http_client_instance
         self.external_routers = external_routers if external_routers else []
+        self.loop_monitor = loop_monitor
         self.app = api.create_app(
             self.sio_client, self.proxy_config.base_url, self.websocket_manager, self.external_routers
         )
@@ -31,24 +34,45 @@ class SocketIOProxy:
         self.server = None
         self.sio_task = None
         self.server_task = None
+        # Set by SocketIOProxyBuilder when proxy.web_workers > 0.
+        self.ipc_hub = None
+        self.worker_pool = None
 
     async def start(self):
         """
         Starts the proxy server and the Socket.IO client.
         """
-        server_config = uvicorn.Config(
-            self.app, host=self.proxy_config.listen_host, port=self.proxy_config.listen_port, log_level="warning"
-        )
-        self.server = uvicorn.Server(server_config)
+        port = self.proxy_config.listen_port
+        if self.worker_pool:
+            # Web workers own listen_port; this process serves the full app only on ingest_listen_port, if set.
+            port = self.proxy_config.ingest_listen_port
+        if port is not None:
+            server_config = uvicorn.Config(
+                self.app, host=self.proxy_config.listen_host, port=port, log_level="warning",
+                ws_per_message_deflate=self.proxy_config.ws_per_message_deflate
+            )
+            self.server = uvicorn.Server(server_config)
 
         logger.info(f"Proxy starting. HTTP listening on http://{self.proxy_config.listen_host}:{self.proxy_config.listen_port}")
+        if self.loop_monitor:
+            self.loop_monitor.start()
+
+        tasks = []
+        if self.worker_pool:
+            await self.ipc_hub.start()
+            self.worker_pool.start()
+            logger.info(f"Serving web clients from {self.worker_pool.count} worker process(es).")
+            tasks.append(asyncio.create_task(self.worker_pool.supervise()))
 
         self.sio_task = asyncio.create_task(
             self.sio_client.start(self.proxy_config.socketio_server_url)
         )
-        self.server_task = asyncio.create_task(self.server.serve())
+        tasks.append(self.sio_task)
+        if self.server:
+            self.server_task = asyncio.create_task(self.server.serve())
+            tasks.append(self.server_task)
 
-        await asyncio.gather(self.sio_task, self.server_task)
+        await asyncio.gather(*tasks)
 
     async def stop(self):
         """
@@ -56,13 +80,21 @@ class SocketIOProxy:
         """
         if self.sio_task and not self.sio_task.done():
             self.sio_task.cancel()
-        if self.sio.connected:
-            await self.sio.disconnect()
+        try:
+            # Closes the emit scheduler (failing queued emits and pending calls) before disconnecting.
+            await self.sio_client.stop()
+        except Exception as e:
+            logger.error(f"Error stopping the Socket.IO client: {e}")
 
         if self.server and self.server.started:
             self.server.should_exit = True
         if self.server_task and not self.server_task.done():
             self.server_task.cancel()
 
+        if self.worker_pool:
+            await self.worker_pool.stop()
+            await self.ipc_hub.stop()
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
         await self.http_client.aclose()
         logger.info("Proxy stopped.")
@@ -1,21 +1,81 @@
 """
 Handles the Socket.IO client and its events.
 """
+import asyncio
+import time
 import socketio
 import httpx
 import json
+from collections import deque
+from typing import Any, Deque, Dict, Optional
 from socketio_proxy.config.logging import logger
+from socketio_proxy.core.emit_scheduler import EmitScheduler
+from socketio_proxy.util.tracing import tracer
+
+class CallCapacityError(Exception):
+    """Raised when the maximum number of in-flight calls has been reached."""
+    pass
+
+class CallStats:
+    """
+    Per-event latency statistics for request/response calls.
+    Keeps counters plus a bounded window of recent latencies for percentiles.
+    """
+    WINDOW_SIZE = 1000
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latencies: Deque[float] = deque(maxlen=self.WINDOW_SIZE)
+
+    def record(self, latency: float, outcome: str = "ok"):
+        self.count += 1
+        if outcome == "timeout":
+            self.timeouts += 1
+        elif outcome == "error":
+            self.errors += 1
+        else:
+            self.latencies.append(latency)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3) if ordered else 0.0
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency_ms": {
+                "avg": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+                "p50": pct(0.50),
+                "p90": pct(0.90),
+                "p99": pct(0.99),
+                "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+            },
+        }
 
 class SocketIOClient:
     """
     Manages a Socket.IO AsyncClient instance and its event handlers.
     """
-    def __init__(self, callback_handler=None, headers=None):
+    # Event names come from HTTP callers, so only this many get their own call stats;
+    # calls to any further event are counted under OTHER_EVENTS.
+    MAX_TRACKED_EVENTS = 256
+    OTHER_EVENTS = "other"
+
+    def __init__(self, callback_handler=None, headers=None, call_timeout: float = 10.0, max_inflight_calls: int = 1000,
+                 emit_options: Optional[Dict[str, Any]] = None):
         self.sio = socketio.AsyncClient(logger=False, engineio_logger=False)
         self.http_client = httpx.AsyncClient()
         self.callback_handler = callback_handler if callback_handler else self._default_callback_handler
         self.headers = headers
         self.uri = None
+        self.call_timeout = call_timeout
+        self.max_inflight_calls = max_inflight_calls
+        self.inflight_calls = 0
+        self.call_stats: Dict[str, CallStats] = {}
+        self.scheduler = EmitScheduler(self.sio.emit, call=self.sio.call, **(emit_options or {}))
 
         self._register_events()
 
@@ -34,7 +94,8 @@ class SocketIOClient:
 
         @self.sio.on("*")
         async def catch_all(event, data):
-            await self.callback_handler(event, data)
+            with tracer.trace(event):
+                await self.callback_handler(event, data)
 
     async def _default_callback_handler(self, event, data):
         logger.warning(f"No custom handler. Evt: {event}, Data: {data}")
@@ -45,6 +106,7 @@ class SocketIOClient:
         await self.sio.connect(uri, headers=self.headers)
 
     async def stop(self):
+        await self.scheduler.close()
         await self.sio.disconnect()
 
     async def restart(self):
@@ -61,6 +123,60 @@ class SocketIOClient:
         else:
             logger.warning("sio restart failed: no URI.")
 
+    async def emit(self, event: str, data: Any = None, priority: str = "normal",
+                   coalesce_key: Optional[str] = None, block: bool = False):
+        """
+        Sends an event through the outbound scheduler and waits until it has been emitted.
+        Raises EmitQueueFullError when the queue is full (unless block=True).
+        """
+        await self.scheduler.emit(event, data, priority, coalesce_key, block)
+
+    def get_emit_stats(self) -> Dict[str, Any]:
+        return self.scheduler.stats()
+
+    async def call(self, event: str, data: Any = None, timeout: float = None, block: bool = False) -> Any:
+        """
+        Emits an event through the outbound scheduler (so rate limits apply) and
+        waits for the server's acknowledgement, returning its payload.
+        Raises CallCapacityError when max_inflight_calls calls are already pending,
+        EmitQueueFullError when the outbound queue is full (unless block=True),
+        and socketio.exceptions.TimeoutError when no ack arrives in time.
+        """
+        if self.inflight_calls >= self.max_inflight_calls:
+            raise CallCapacityError(f"Too many in-flight calls (max {self.max_inflight_calls}).")
+
+        stats = self._stats_for(event)
+        self.inflight_calls += 1
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await self.scheduler.call(event, data, timeout or self.call_timeout, block=block)
+            outcome = "ok"
+            return result
+        except socketio.exceptions.TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            self.inflight_calls -= 1
+            stats.record(time.perf_counter() - start, outcome)
+
+    def _stats_for(self, event: str) -> CallStats:
+        stats = self.call_stats.get(event)
+        if stats is None:
+            if len(self.call_stats) >= self.MAX_TRACKED_EVENTS:
+                event = self.OTHER_EVENTS
+                stats = self.call_stats.get(event)
+            if stats is None:
+                stats = self.call_stats[event] = CallStats()
+        return stats
+
+    def get_call_stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": self.inflight_calls,
+            "max_inflight": self.max_inflight_calls,
+            "events": {event: stats.summary() for event, stats in self.call_stats.items()},
+        }
+
     @property
     def client(self):
         return self.sio
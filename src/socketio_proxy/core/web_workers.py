@@ -0,0 +1,136 @@
+"""
+Multi-worker web tier (proxy.web_workers > 0).
+
+The ingest process binds the listening socket once and spawns N web worker
+processes that share it. Each worker serves /ws, /stream, static assets and
+plugin routes with its own event loop, fed by the ingest process over IPC
+(see socketio_proxy.core.ipc). Only the ingest process connects upstream.
+"""
+import asyncio
+import multiprocessing
+import os
+import socket
+from typing import List, Optional
+import uvicorn
+
+from socketio_proxy.config.logging import logger
+from socketio_proxy.config.settings import ConfigLoader, ProxyConfig
+from socketio_proxy.core.ipc import RemoteSocketIOClient
+from socketio_proxy.web import routes as api
+from socketio_proxy.web.dependencies import app_context
+from socketio_proxy.web.route_manager import RouteManager
+from socketio_proxy.web.sse_manager import SseManager
+from socketio_proxy.web.websocket_manager import WebSocketManager
+from socketio_proxy.util.loop_lag import LoopLagMonitor
+
+PARENT_CHECK_INTERVAL = 1.0
+
+class WebWorkerPool:
+    """Starts the web worker processes and restarts any that exit unexpectedly."""
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, proxy_config: ProxyConfig, config_path: str):
+        self.proxy_config = proxy_config
+        self.config_path = config_path
+        self.count = proxy_config.web_workers
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._socket: Optional[socket.socket] = None
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.count
+        self._stopping = False
+
+    def _bind(self) -> socket.socket:
+        config = uvicorn.Config(None, host=self.proxy_config.listen_host, port=self.proxy_config.listen_port)
+        sock = config.bind_socket()
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=run_worker, name=f"socketio-proxy-web-{index}",
+            args=(self.config_path, self._socket, index), daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info(f"Started web worker {index} (pid {process.pid}).")
+
+    def start(self):
+        self._socket = self._bind()
+        for index in range(self.count):
+            self._spawn(index)
+
+    async def supervise(self):
+        """Runs until cancelled, replacing workers that die."""
+        while not self._stopping:
+            await asyncio.sleep(self.CHECK_INTERVAL)
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive() and not self._stopping:
+                    logger.error(f"Web worker {index} exited with code {process.exitcode}; restarting it.")
+                    self.restarts += 1
+                    self._spawn(index)
+
+    async def stop(self, timeout: float = 10.0):
+        self._stopping = True
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            if process is not None:
+                await loop.run_in_executor(None, process.join, timeout)
+                if process.is_alive():
+                    process.kill()
+        if self._socket is not None:
+            self._socket.close()
+
+def run_worker(config_path: str, sock: socket.socket, index: int):
+    """Entry point of a web worker process."""
+    try:
+        asyncio.run(_serve_worker(config_path, sock, index))
+    except KeyboardInterrupt:
+        pass
+
+async def _serve_worker(config_path: str, sock: socket.socket, index: int):
+    config_loader = ConfigLoader(config_path)
+    proxy_config = config_loader.proxy_config
+    websocket_manager = WebSocketManager(
+        history_size=proxy_config.history_size,
+        history_max_bytes=proxy_config.history_max_bytes,
+        backfill=proxy_config.history_backfill,
+        compress_level=proxy_config.ws_compress_level
+    )
+    sse_manager = SseManager(websocket_manager, proxy_config.sse_buffer_size)
+    sio_client = RemoteSocketIOClient(proxy_config.ipc_path, websocket_manager, index)
+
+    route_manager = RouteManager()
+    if config_loader.extend_config.routes:
+        route_manager.load_from_paths(config_loader.extend_config.routes)
+
+    app_context.set_sio_client(sio_client)
+    app_context.set_websocket_manager(websocket_manager)
+    app_context.set_sse_manager(sse_manager)
+    app_context.set_config_reloader(sio_client.reload)
+    loop_monitor = LoopLagMonitor(proxy_config.loop_lag_interval, proxy_config.loop_lag_warn_ms)
+    app_context.set_loop_monitor(loop_monitor)
+
+    app = api.create_app(sio_client, proxy_config.base_url, websocket_manager, list(route_manager.items.values()))
+    server = uvicorn.Server(uvicorn.Config(
+        app, log_level="warning", ws_per_message_deflate=proxy_config.ws_per_message_deflate
+    ))
+    await sio_client.start()
+    loop_monitor.start()
+    watcher = asyncio.create_task(_exit_with_parent(server))
+    try:
+        await server.serve(sockets=[sock])
+    finally:
+        watcher.cancel()
+        await loop_monitor.stop()
+        await sio_client.stop()
+
+async def _exit_with_parent(server: uvicorn.Server):
+    """Shuts the worker down if the ingest process goes away without stopping it (e.g. SIGKILL)."""
+    parent = os.getppid()
+    while os.getppid() == parent:
+        await asyncio.sleep(PARENT_CHECK_INTERVAL)
+    logger.warning("Ingest process exited; stopping web worker.")
+    server.should_exit = True
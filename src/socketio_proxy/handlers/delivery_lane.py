@@ -0,0 +1,174 @@
+"""
+Per-dispatcher delivery lanes: a bounded queue drained by the dispatcher's own workers.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from socketio_proxy.config.logging import logger
+from socketio_proxy.util.tracing import Trace, current_trace
+
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest", "block")
+
+class DeliveryLane:
+    """
+    Decouples one dispatcher from the event path.
+    EventHandler submits messages and returns immediately; `concurrency`
+    workers call dispatcher.dispatch() in the background. A message still
+    undelivered `deadline` seconds after it was submitted is abandoned.
+    When the queue holds `queue_size` messages, `overflow` decides:
+    drop_new, drop_oldest, or block (the submitter waits for space).
+    """
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, dispatcher: Any, name: str = "", queue_size: int = 10000, concurrency: int = 1,
+                 deadline: Optional[float] = None, overflow: str = "drop_new"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Expected one of: {', '.join(OVERFLOW_POLICIES)}")
+        self.dispatcher = dispatcher
+        self.name = name or dispatcher.type
+        self.queue_size = queue_size
+        self.concurrency = max(1, concurrency)
+        self.deadline = deadline
+        self.overflow = overflow
+
+        self._queue: Deque[Tuple[float, dict, Optional[Trace]]] = deque()
+        self._items = asyncio.Condition()
+        self._space = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._busy = 0
+
+        self.submitted = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.expired = 0
+        self.max_depth = 0
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+
+    def _ensure_workers(self):
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def submit(self, message: dict):
+        """Queues a message for delivery. Only waits when the queue is full and overflow is 'block'."""
+        self._ensure_workers()
+        while len(self._queue) >= self.queue_size:
+            if self.overflow == "block":
+                self._space.clear()
+                await self._space.wait()
+                continue
+            self._drop()
+            if self.overflow == "drop_new":
+                return
+            self._queue.popleft()
+
+        self._queue.append((time.monotonic(), message, current_trace.get()))
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, len(self._queue))
+        async with self._items:
+            self._items.notify()
+
+    def _drop(self):
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"Lane '{self.name}' full ({self.queue_size}), {self.overflow}: {self.dropped} message(s) dropped so far.")
+
+    async def _work(self):
+        while True:
+            async with self._items:
+                await self._items.wait_for(lambda: self._queue)
+                enqueued_at, message, trace = self._queue.popleft()
+            self._space.set()
+            self._busy += 1
+            try:
+                if trace is None:
+                    await self._deliver(enqueued_at, message)
+                else:
+                    await self._deliver_traced(enqueued_at, message, trace)
+            finally:
+                self._busy -= 1
+
+    async def _deliver_traced(self, enqueued_at: float, message: dict, trace: Trace):
+        """Delivers a sampled message with its trace made current, recording queue wait and dispatch time."""
+        waited = time.monotonic() - enqueued_at
+        started = time.perf_counter()
+        trace.add(f"queue:{self.name}", started - waited, waited)
+        token = current_trace.set(trace)
+        try:
+            with trace.span(f"dispatch:{self.name}"):
+                await self._deliver(enqueued_at, message)
+        finally:
+            current_trace.reset(token)
+
+    async def _deliver(self, enqueued_at: float, message: dict):
+        remaining = None
+        if self.deadline is not None:
+            remaining = self.deadline - (time.monotonic() - enqueued_at)
+            if remaining <= 0:
+                self.expired += 1
+                return
+        try:
+            await asyncio.wait_for(self.dispatcher.dispatch(message), timeout=remaining)
+            self.delivered += 1
+            self._latencies.append(time.monotonic() - enqueued_at)
+        except asyncio.TimeoutError:
+            self.expired += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Lane '{self.name}' dispatch failed: {e}")
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def lag(self) -> float:
+        """Age in seconds of the oldest undelivered message."""
+        return time.monotonic() - self._queue[0][0] if self._queue else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3) if ordered else 0.0
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "queue_size": self.queue_size,
+            "concurrency": self.concurrency,
+            "busy": self._busy,
+            "overflow": self.overflow,
+            "lag_ms": round(self.lag() * 1000, 3),
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "delivery_latency_ms": {"p50": pct(0.50), "p99": pct(0.99)},
+        }
+
+    async def close(self, timeout: float = 30.0):
+        """Waits up to `timeout` seconds for queued messages to be delivered, then stops the workers."""
+        deadline = time.monotonic() + timeout
+        while (self._queue or self._busy) and time.monotonic() < deadline and self._workers:
+            await asyncio.sleep(0.05)
+        if self._queue:
+            logger.warning(f"Lane '{self.name}' closed with {len(self._queue)} undelivered message(s).")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @classmethod
+    def from_config(cls, dispatcher: Any, config: Dict[str, Any]) -> "DeliveryLane":
+        lane_config = config.get("lane") or {}
+        deadline = lane_config.get("deadline")
+        return cls(
+            dispatcher,
+            name=f"{config.get('type', dispatcher.type)}:{config.get('url') or config.get('path') or config.get('name') or ''}".rstrip(":"),
+            queue_size=int(lane_config.get("queue_size", 10000)),
+            concurrency=int(lane_config.get("concurrency", dispatcher.lane_concurrency())),
+            deadline=float(deadline) if deadline is not None else None,
+            overflow=lane_config.get("overflow", "drop_new")
+        )
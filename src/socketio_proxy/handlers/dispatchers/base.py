@@ -1,16 +1,44 @@
 from abc import ABC, abstractmethod
+from socketio_proxy.util.tracing import span
 
 class Dispatcher(ABC):
     """Abstract base class for all dispatchers."""
     
     # A class-level attribute to identify the dispatcher type in config.yaml
     type: str = "base"
+    # Delivery lane attached by DispatcherManager; None means dispatch inline.
+    lane = None
+    # fields/exclude Projection attached by DispatcherManager; None sends the whole message.
+    projection = None
 
     @abstractmethod
     async def dispatch(self, message: dict):
         """Dispatches the message."""
         pass
 
+    async def submit(self, message: dict):
+        """Hands the message to this dispatcher's delivery lane, or dispatches inline without one."""
+        if self.projection is not None:
+            with span("project"):
+                message = self.projection(message)
+        if self.lane is None:
+            with span(f"dispatch:{self.type}"):
+                await self.dispatch(message)
+        else:
+            await self.lane.submit(message)
+
+    def lane_concurrency(self) -> int:
+        """Default number of lane workers; 1 keeps delivery in order."""
+        return 1
+
+    def stats(self):
+        """Returns runtime metrics for GET /dispatch/stats, or None if the dispatcher has none."""
+        return None
+
+    async def close(self):
+        """Releases resources. Called after its lane has drained, on reload removal or shutdown."""
+        pass
+
     @classmethod
     def from_config(cls, config: dict, **kwargs):
         """Creates a dispatcher instance from its configuration."""
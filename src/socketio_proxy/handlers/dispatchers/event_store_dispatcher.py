@@ -0,0 +1,85 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from socketio_proxy.handlers.dispatchers.base import Dispatcher
+from socketio_proxy.util.event_store import EventStore
+from socketio_proxy.web.dependencies import app_context
+from socketio_proxy.config.logging import logger
+
+# One EventStore per directory, shared by every dispatcher writing there:
+# real path -> [store, number of dispatchers using it]. A reload that changes
+# the dispatcher config reuses the open store instead of recovering the
+# directory again under the old instance.
+_open_stores: Dict[str, List[Any]] = {}
+
+class EventStoreDispatcher(Dispatcher):
+    """
+    Persists events into an indexed, segment-based EventStore.
+    Events are buffered and appended in batches from a worker thread, so
+    dispatch() never blocks the event loop on disk I/O. Once `max_pending`
+    events are buffered, dispatch() waits for the write, which holds back
+    the delivery lane.
+    """
+    type = "event_store"
+
+    def __init__(self, store: EventStore, name: str = "default", max_pending: int = 1000):
+        self.store = store
+        self.name = name
+        self.max_pending = max(1, max_pending)
+        self._pending: List[Tuple[float, str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def dispatch(self, message: dict):
+        self._pending.append((time.time(), message.get("event", ""), message.get("data")))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+        if len(self._pending) >= self.max_pending:
+            # Shielded: a lane deadline cancelling this dispatch must not abort the write.
+            await asyncio.shield(self._flush_task)
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(None, self.store.append_batch, batch)
+            except Exception as e:
+                logger.error(f"Event store '{self.name}' write failed, {len(batch)} event(s) lost: {e}")
+
+    async def close(self):
+        if self._flush_task is not None:
+            await self._flush_task
+        key = os.path.realpath(self.store.directory)
+        entry = _open_stores.get(key)
+        if entry is not None and entry[0] is self.store:
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del _open_stores[key]
+        self.store.close()
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs):
+        name = config.get("name", "default")
+        directory = config.get("path", "event_store")
+        max_segment_bytes = int(config.get("max_segment_bytes", 64 * 1024 * 1024))
+        key = os.path.realpath(directory)
+        entry = _open_stores.get(key)
+        if entry is None:
+            store = EventStore(
+                directory,
+                max_segment_bytes=max_segment_bytes,
+                retention_bytes=config.get("retention_bytes"),
+                retention_seconds=config.get("retention_seconds")
+            )
+            entry = _open_stores[key] = [store, 0]
+        else:
+            # Same directory under a changed config: the newest settings apply to the shared store.
+            store = entry[0]
+            store.max_segment_bytes = max_segment_bytes
+            store.retention_bytes = config.get("retention_bytes")
+            store.retention_seconds = config.get("retention_seconds")
+        entry[1] += 1
+        app_context.register_event_store(name, store)
+        return cls(store, name, int(config.get("max_pending", 1000)))
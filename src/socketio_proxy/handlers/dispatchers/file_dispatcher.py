@@ -1,17 +1,40 @@
 import aiofiles
 import json
 from socketio_proxy.handlers.dispatchers.base import Dispatcher
+from socketio_proxy.util.binary import has_binary, split_binary
+from socketio_proxy.util.wire_format import WireFormat, get_format, encode
 
 class FileDispatcher(Dispatcher):
+    """
+    Appends events to a file as JSON lines.
+    An event with binary attachments is written as a raw segment: a JSON line
+    whose attachments are placeholders and which lists their sizes under
+    "_attachments", followed by the attachment bytes as-is and a newline.
+    With format msgpack or cbor, events are appended as a stream of
+    self-delimiting objects instead.
+    """
     type = "file"
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, wire_format: WireFormat = None):
         self.file_path = file_path
+        self.wire_format = wire_format or get_format("json")
 
     async def dispatch(self, message: dict):
-        async with aiofiles.open(self.file_path, mode='a') as f:
-            await f.write(json.dumps(message) + '\n')
+        if self.wire_format.binary:
+            async with aiofiles.open(self.file_path, mode='ab') as f:
+                await f.write(encode(message, self.wire_format))
+            return
+
+        if not has_binary(message):
+            async with aiofiles.open(self.file_path, mode='a') as f:
+                await f.write(json.dumps(message) + '\n')
+            return
+
+        skeleton, attachments = split_binary(message)
+        header = json.dumps({**skeleton, "_attachments": [len(a) for a in attachments]})
+        async with aiofiles.open(self.file_path, mode='ab') as f:
+            await f.write(header.encode("utf-8") + b'\n' + b''.join(attachments) + b'\n')
 
     @classmethod
     def from_config(cls, config: dict, **kwargs):
-        return cls(config['path'])
\ No newline at end of file
+        return cls(config['path'], get_format(config.get('format', 'json')))
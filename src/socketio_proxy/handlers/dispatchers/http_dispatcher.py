@@ -1,23 +1,178 @@
+import json
+import time
 import httpx
+from typing import Any, Dict, Optional
 from socketio_proxy.handlers.dispatchers.base import Dispatcher
+from socketio_proxy.util.adaptive_limiter import AdaptiveLimiter, LimiterOverflowError
+from socketio_proxy.util.binary import BINARY_MEDIA_TYPE, has_binary, split_binary, pack_binary, json_default
+from socketio_proxy.util.wire_format import WireFormat, get_format, encode
+from socketio_proxy.util.compression import Compressor
 from socketio_proxy.config.logging import logger
 
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+except ImportError:
+    h2 = None
+
+# Dispatcher config keys that call for a dedicated client instead of the shared one.
+CLIENT_OPTIONS = ("timeout", "limits", "http2")
+BINARY_MODES = ("multipart", "length", "base64")
+
 class HttpDispatcher(Dispatcher):
+    """
+    POSTs events to a webhook URL.
+    Targets that configure `timeout`, `limits` or `http2` get their own
+    connection pool, so a slow target cannot exhaust the shared one.
+    With `concurrency` set, in-flight requests are capped by an adaptive,
+    latency-based limit and excess events wait in a bounded queue.
+    Events with binary attachments are posted according to `binary`:
+    multipart (a JSON "message" part plus one octet-stream part per
+    attachment), length (the container from socketio_proxy.util.binary),
+    or base64 (plain JSON with base64 attachments).
+    `format` selects the body encoding (json, msgpack or cbor); msgpack and
+    cbor carry attachments natively.
+    With `compression` set, bodies above a size threshold are sent gzip- or
+    deflate-compressed with a matching Content-Encoding.
+    """
     type = "http"
 
-    def __init__(self, callback_url: str, http_client: httpx.AsyncClient):
+    def __init__(self, callback_url: str, http_client: httpx.AsyncClient,
+                 headers: Optional[Dict[str, str]] = None, owns_client: bool = False,
+                 limiter: Optional[AdaptiveLimiter] = None, binary: str = "multipart",
+                 wire_format: Optional[WireFormat] = None, compressor: Optional[Compressor] = None):
+        if binary not in BINARY_MODES:
+            raise ValueError(f"Unknown binary mode '{binary}'. Expected one of: {', '.join(BINARY_MODES)}")
+        self.binary = binary
+        self.wire_format = wire_format or get_format("json")
+        self._content_headers = {**(headers or {}), "Content-Type": self.wire_format.content_type}
         self.callback_url = callback_url
         self.http_client = http_client
+        self.headers = headers
+        self.owns_client = owns_client
+        self.limiter = limiter
+        self.compressor = compressor
 
     async def dispatch(self, message: dict):
+        if self.limiter is None:
+            await self._post(message)
+            return
+
+        try:
+            await self.limiter.acquire()
+        except LimiterOverflowError as e:
+            logger.warning(f"HTTP dispatch to {self.callback_url} dropped: {e}")
+            return
+        start = time.perf_counter()
+        ok = False
         try:
-            await self.http_client.post(self.callback_url, json=message)
+            ok = await self._post(message)
+        finally:
+            self.limiter.release(time.perf_counter() - start, ok)
+
+    async def _post(self, message: dict) -> bool:
+        """Sends one event. Returns False on transport errors and on 429 / 5xx responses."""
+        try:
+            body = self._body(message)
+            body.setdefault("headers", self.headers)
+            if self.compressor is not None:
+                body = self._compress(body)
+            response = await self.http_client.post(self.callback_url, **body)
+            return response.status_code != 429 and response.status_code < 500
         except httpx.RequestError as e:
             logger.error(f"HTTP dispatch error to {self.callback_url}: {e}")
+            return False
+
+    def _body(self, message: dict) -> Dict[str, Any]:
+        """Request body arguments for httpx, without JSON-expanding binary attachments."""
+        if self.wire_format.binary or not has_binary(message):
+            return {"content": encode(message, self.wire_format), "headers": self._content_headers}
+        if self.binary == "base64":
+            return {"content": json.dumps(message, default=json_default).encode("utf-8"),
+                    "headers": {**(self.headers or {}), "Content-Type": "application/json"}}
+        skeleton, attachments = split_binary(message)
+        if self.binary == "length":
+            return {"content": pack_binary(skeleton, attachments),
+                    "headers": {**(self.headers or {}), "Content-Type": BINARY_MEDIA_TYPE}}
+        files = {"message": (None, json.dumps(skeleton).encode("utf-8"), "application/json")}
+        for index, attachment in enumerate(attachments):
+            files[f"attachment{index}"] = (f"attachment{index}", attachment, "application/octet-stream")
+        # httpx sets the multipart Content-Type (with its boundary) itself; a configured one would break it.
+        headers = {key: value for key, value in (self.headers or {}).items() if key.lower() != "content-type"}
+        return {"files": files, "headers": headers}
+
+    def _compress(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        headers = dict(body["headers"] or {})
+        if "files" in body:
+            # Render the multipart body so it can be compressed as a whole.
+            request = httpx.Request("POST", self.callback_url, files=body["files"])
+            content = request.read()
+            headers["Content-Type"] = request.headers["Content-Type"]
+        else:
+            content = body["content"]
+        content, encoding = self.compressor.compress(content)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return {"content": content, "headers": headers}
+
+    def lane_concurrency(self) -> int:
+        # Webhook posts are independent; let the limiter (if any) bound them instead.
+        return self.limiter.max_limit if self.limiter else 100
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        if self.limiter is None and self.compressor is None:
+            return None
+        stats: Dict[str, Any] = {"url": self.callback_url}
+        if self.limiter is not None:
+            stats.update(self.limiter.stats())
+        if self.compressor is not None:
+            stats["compression"] = self.compressor.stats()
+        return stats
+
+    async def close(self):
+        if self.owns_client:
+            await self.http_client.aclose()
+
+    @staticmethod
+    def _build_timeout(value: Any) -> httpx.Timeout:
+        if isinstance(value, dict):
+            default = value.get("default", 5.0)
+            return httpx.Timeout(default, connect=value.get("connect", default), read=value.get("read", default),
+                                 write=value.get("write", default), pool=value.get("pool", default))
+        return httpx.Timeout(value)
+
+    @staticmethod
+    def _build_limits(value: Dict[str, Any]) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=value.get("max_connections", 100),
+            max_keepalive_connections=value.get("max_keepalive_connections", 20),
+            keepalive_expiry=value.get("keepalive_expiry", 5.0)
+        )
 
     @classmethod
     def from_config(cls, config: dict, **kwargs):
-        http_client = kwargs.get("http_client")
-        if not http_client:
-            raise ValueError("HttpDispatcher requires 'http_client' in kwargs")
-        return cls(config['url'], http_client)
\ No newline at end of file
+        url = config.get('url') or config.get('target')
+        if not url:
+            raise ValueError("HttpDispatcher requires a 'url' in its config")
+        headers = config.get("headers") or None
+        limiter = AdaptiveLimiter.from_config(config["concurrency"]) if config.get("concurrency") else None
+        binary = config.get("binary", "multipart")
+        wire_format = get_format(config.get("format", "json"))
+        compressor = Compressor.from_config(config["compression"]) if config.get("compression") else None
+        options = {"limiter": limiter, "binary": binary, "wire_format": wire_format, "compressor": compressor}
+
+        if not any(key in config for key in CLIENT_OPTIONS):
+            http_client = kwargs.get("http_client")
+            if not http_client:
+                raise ValueError("HttpDispatcher requires 'http_client' in kwargs")
+            return cls(url, http_client, headers, **options)
+
+        http2 = bool(config.get("http2", False))
+        if http2 and h2 is None:
+            raise ValueError("HTTP/2 requires the 'h2' package (pip install 'httpx[http2]')")
+        http_client = httpx.AsyncClient(
+            timeout=cls._build_timeout(config.get("timeout", 5.0)),
+            limits=cls._build_limits(config.get("limits") or {}),
+            http2=http2
+        )
+        logger.info(f"HTTP dispatcher for {url} uses a dedicated client (http2={http2}).")
+        return cls(url, http_client, headers, owns_client=True, **options)
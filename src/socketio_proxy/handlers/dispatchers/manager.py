@@ -3,17 +3,32 @@ from typing import Dict, Type, Any
 from socketio_proxy.config.logging import logger
 from socketio_proxy.util.reflection_manager import ReflectionManager
 from socketio_proxy.handlers.dispatchers.base import Dispatcher
+from socketio_proxy.handlers.delivery_lane import DeliveryLane
+from socketio_proxy.util.projection import Projection
 
 class DispatcherManager(ReflectionManager[Type[Dispatcher]]):
     def __init__(self, dispatchers_dir: str, base_module_path: str):
         super().__init__(dispatchers_dir, base_module_path, "dispatcher")
         self._instance_cache: Dict[frozenset, Dispatcher] = {}
+        # Projections shared by the cached dispatchers, pruned as dispatchers are released.
+        self._projections: Dict[Any, Projection] = {}
 
     @staticmethod
     def _is_concrete_dispatcher(obj: Any) -> bool:
         """检查对象是否是 Dispatcher 的一个具体子类"""
         return inspect.isclass(obj) and issubclass(obj, Dispatcher) and obj is not Dispatcher
 
+    @staticmethod
+    def _freeze(value: Any) -> Any:
+        """Recursively converts dicts and lists into hashable equivalents for the cache key."""
+        if isinstance(value, dict):
+            return frozenset((key, DispatcherManager._freeze(item)) for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            return tuple(DispatcherManager._freeze(item) for item in value)
+        if isinstance(value, set):
+            return frozenset(DispatcherManager._freeze(item) for item in value)
+        return value
+
     def _register_from_module(self, module: Any):
         for name, dispatcher_class in inspect.getmembers(module, DispatcherManager._is_concrete_dispatcher):
             if dispatcher_class.type in self.items:
@@ -23,8 +38,7 @@ class DispatcherManager(ReflectionManager[Type[Dispatcher]]):
 
     def get_dispatcher(self, config: dict, **kwargs) -> Dispatcher:
         # Create a cache key from config and kwargs
-        # Convert dicts to frozenset of items for hashability
-        cache_key = frozenset(config.items()), frozenset(kwargs.items())
+        cache_key = self._freeze(config), self._freeze(kwargs)
 
         if cache_key in self._instance_cache:
             logger.debug(f"Returning cached dispatcher for config: {config}")
@@ -39,7 +53,38 @@ class DispatcherManager(ReflectionManager[Type[Dispatcher]]):
         if not dispatcher_class:
             raise ValueError(f"Unknown dispatcher type: '{dispatcher_type}'")
             
+        projection = Projection.from_config(config, self._projections)
         instance = dispatcher_class.from_config(config, **kwargs)
+        instance.projection = projection
+        instance.lane = DeliveryLane.from_config(instance, config)
         self._instance_cache[cache_key] = instance
         logger.debug(f"Created and cached new dispatcher for config: {config}")
-        return instance
\ No newline at end of file
+        return instance
+
+    def release(self, dispatcher: Dispatcher):
+        """Drops a dispatcher instance from the cache so a later identical config creates a fresh one."""
+        for key in [key for key, instance in self._instance_cache.items() if instance is dispatcher]:
+            del self._instance_cache[key]
+        self._prune_projections()
+
+    def _prune_projections(self):
+        in_use = {id(instance.projection) for instance in self._instance_cache.values()}
+        for key in [key for key, projection in self._projections.items() if id(projection) not in in_use]:
+            del self._projections[key]
+
+    async def close(self):
+        """Closes every cached dispatcher (on shutdown)."""
+        for dispatcher in {id(d): d for d in self._instance_cache.values()}.values():
+            try:
+                await self.close_dispatcher(dispatcher)
+            except Exception as e:
+                logger.error(f"Closing '{dispatcher.type}' dispatcher failed: {e}")
+        self._instance_cache.clear()
+        self._projections.clear()
+
+    @staticmethod
+    async def close_dispatcher(dispatcher: Dispatcher):
+        """Drains the dispatcher's lane, then closes the dispatcher."""
+        if dispatcher.lane is not None:
+            await dispatcher.lane.close()
+        await dispatcher.close()
@@ -0,0 +1,47 @@
+import json
+from typing import Any, Dict
+from socketio_proxy.handlers.dispatchers.base import Dispatcher
+from socketio_proxy.util.shm_ring import RingWriter
+from socketio_proxy.util.binary import json_default
+from socketio_proxy.config.logging import logger
+
+class ShmRingDispatcher(Dispatcher):
+    """
+    Writes each event once, as a compact JSON frame, into a memory-mapped ring
+    buffer file. Any number of local processes read it with
+    socketio_proxy.util.shm_ring.RingReader at their own offsets.
+    """
+    type = "shm_ring"
+
+    def __init__(self, writer: RingWriter):
+        self.writer = writer
+        self.written = 0
+        self.oversized = 0
+
+    async def dispatch(self, message: dict):
+        frame = json.dumps(message, separators=(",", ":"), default=json_default).encode("utf-8")
+        try:
+            self.writer.write(frame)
+            self.written += 1
+        except ValueError as e:
+            self.oversized += 1
+            logger.warning(f"Shared-memory ring '{self.writer.path}': {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.writer.path,
+            "capacity": self.writer.capacity,
+            "written": self.written,
+            "oversized": self.oversized,
+            "last_seq": self.writer.last_seq,
+            "retained_bytes": self.writer.write_pos - self.writer.tail_pos,
+        }
+
+    async def close(self):
+        self.writer.close()
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs):
+        writer = RingWriter(config.get("path", "/dev/shm/socketio_proxy.ring"),
+                            capacity=int(config.get("capacity", 64 * 1024 * 1024)))
+        return cls(writer)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import struct
+from typing import Any, Dict, Optional
+from socketio_proxy.handlers.dispatchers.base import Dispatcher
+from socketio_proxy.util.binary import json_default
+from socketio_proxy.config.logging import logger
+
+FRAMINGS = ("ndjson", "length")
+LENGTH_PREFIX = struct.Struct(">I")
+
+class StreamDispatcher(Dispatcher):
+    """
+    Writes events as frames over a persistent Unix domain socket or TCP connection.
+    Frames are newline-delimited JSON ("ndjson") or JSON prefixed with a 4-byte
+    big-endian length ("length"). Events are appended to a bounded write buffer
+    that a background task flushes in large writes; when the buffer is full,
+    dispatch() waits, which pushes back into the dispatcher's delivery lane.
+    The connection is re-established with exponential backoff, and data that
+    was not confirmed written is resent on the new connection.
+    """
+    type = "stream"
+
+    RECONNECT_MIN = 0.1
+    RECONNECT_MAX = 5.0
+
+    def __init__(self, path: Optional[str] = None, host: Optional[str] = None, port: Optional[int] = None,
+                 framing: str = "ndjson", max_buffer_bytes: int = 4 * 1024 * 1024):
+        if framing not in FRAMINGS:
+            raise ValueError(f"Unknown framing '{framing}'. Expected one of: {', '.join(FRAMINGS)}")
+        if not path and not (host and port):
+            raise ValueError("StreamDispatcher requires either 'path' (Unix socket) or 'host' and 'port' (TCP)")
+        self.path = path
+        self.host = host
+        self.port = port
+        self.framing = framing
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self._buffer = bytearray()
+        self._data = asyncio.Event()
+        self._space = asyncio.Event()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.frames = 0
+        self.bytes_sent = 0
+        self.connects = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def address(self) -> str:
+        return f"unix:{self.path}" if self.path else f"tcp:{self.host}:{self.port}"
+
+    def encode(self, message: dict) -> bytes:
+        payload = json.dumps(message, separators=(",", ":"), default=json_default).encode("utf-8")
+        if self.framing == "length":
+            return LENGTH_PREFIX.pack(len(payload)) + payload
+        return payload + b"\n"
+
+    async def dispatch(self, message: dict):
+        frame = self.encode(message)
+        while self._buffer and len(self._buffer) + len(frame) > self.max_buffer_bytes:
+            self._space.clear()
+            await self._space.wait()
+        self._buffer += frame
+        self.frames += 1
+        self._data.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _connect(self):
+        if self.path:
+            _, writer = await asyncio.open_unix_connection(self.path)
+        else:
+            _, writer = await asyncio.open_connection(self.host, self.port)
+        self._writer = writer
+        self.connects += 1
+        logger.info(f"Stream dispatcher connected to {self.address}.")
+
+    def _drop_connection(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _flush_loop(self):
+        delay = self.RECONNECT_MIN
+        while not self._closing or self._buffer:
+            if not self._buffer:
+                self._data.clear()
+                await self._data.wait()
+                continue
+            try:
+                if self._writer is None:
+                    await self._connect()
+                    delay = self.RECONNECT_MIN
+                chunk = bytes(self._buffer)
+                self._writer.write(chunk)
+                await self._writer.drain()
+                del self._buffer[:len(chunk)]
+                self.bytes_sent += len(chunk)
+                self._space.set()
+            except (OSError, ConnectionError) as e:
+                # Unconfirmed bytes stay buffered and are resent from a frame boundary on the next connection.
+                self.last_error = str(e)
+                self._drop_connection()
+                if self._closing:
+                    break
+                logger.warning(f"Stream dispatcher {self.address} unavailable ({e}), retrying in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_MAX)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "framing": self.framing,
+            "connected": self._writer is not None,
+            "buffered_bytes": len(self._buffer),
+            "max_buffer_bytes": self.max_buffer_bytes,
+            "frames": self.frames,
+            "bytes_sent": self.bytes_sent,
+            "connects": self.connects,
+            "last_error": self.last_error,
+        }
+
+    async def close(self, timeout: float = 5.0):
+        self._closing = True
+        self._data.set()
+        if self._flush_task is not None:
+            try:
+                await asyncio.wait_for(self._flush_task, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stream dispatcher {self.address} closed with {len(self._buffer)} byte(s) unsent.")
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+            self._writer = None
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs):
+        port = config.get("port")
+        return cls(
+            path=config.get("path"),
+            host=config.get("host"),
+            port=int(port) if port is not None else None,
+            framing=config.get("framing", "ndjson"),
+            max_buffer_bytes=int(config.get("max_buffer_bytes", 4 * 1024 * 1024))
+        )
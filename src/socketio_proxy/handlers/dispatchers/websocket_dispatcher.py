@@ -1,4 +1,3 @@
-import json
 from socketio_proxy.handlers.dispatchers.base import Dispatcher
 from socketio_proxy.web.websocket_manager import WebSocketManager
 
@@ -10,7 +9,7 @@ class WebSocketDispatcher(Dispatcher):
 
     async def dispatch(self, message: dict):
         if self.websocket_manager:
-            await self.websocket_manager.broadcast(json.dumps(message))
+            await self.websocket_manager.publish(message)
 
     @classmethod
     def from_config(cls, config: dict, **kwargs):
@@ -1,16 +1,22 @@
 from jsonschema import validate, ValidationError
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from socketio_proxy.handlers.dispatchers.base import Dispatcher
 from socketio_proxy.handlers.preprocessors.base import BasePreprocessor
+from socketio_proxy.handlers.overload import OverloadController
 from socketio_proxy.config.logging import logger
-import json
-import asyncio
+from socketio_proxy.util.binary import summarize
+from socketio_proxy.util.tracing import span
 
 class EventHandler:
-    def __init__(self, schema: Dict[str, Any], preprocessor: BasePreprocessor, dispatchers: List[Dispatcher]):
+    def __init__(self, schema: Dict[str, Any], preprocessor: BasePreprocessor, dispatchers: List[Dispatcher],
+                 priority: str = "normal", sample_rate: Optional[float] = None,
+                 overload: Optional[OverloadController] = None):
         self.schema = schema
         self.preprocessor = preprocessor
         self.dispatchers = dispatchers
+        self.priority = priority
+        self.sample_rate = sample_rate
+        self.overload = overload
 
     async def handle(self, event: str, data: Any) -> bool:
         """
@@ -19,23 +25,31 @@ class EventHandler:
         """
         json_obj = {"event": event, "data": data}
         try:
-            validate(instance=json_obj, schema=self.schema)
-            
+            with span("match"):
+                validate(instance=json_obj, schema=self.schema)
+
+            # Shed before preprocessing so dropped events cost as little as possible.
+            if self.overload is not None and not self.overload.admit(self.priority, self.sample_rate):
+                return True # Event was handled (shed under overload)
+
             # Schema matched, proceed with preprocessing and dispatching
             logger.info(f"Event matched schema. Applying preprocessor '{self.preprocessor.name}'...")
-            processed_data = await self.preprocessor.preprocess(event, data)
+            with span("preprocess"):
+                processed_data = await self.preprocessor.preprocess(event, data)
             if processed_data is None:
                 logger.info(f"Preprocessor '{self.preprocessor.name}' intercepted event '{event}'. Message dropped.")
                 return True # Event was handled (intercepted)
 
             final_json_obj = {"event": event, "data": processed_data}
 
-            message_summary = json.dumps(final_json_obj)
-            if len(message_summary) > 100:
-                message_summary = message_summary[:100] + "..."
+            with span("summarize"):
+                message_summary = summarize(final_json_obj)
             logger.info(f"Dispatching to {len(self.dispatchers)} dispatcher(s). Message summary: {message_summary}")
 
-            await asyncio.gather(*(d.dispatch(final_json_obj) for d in self.dispatchers))
+            # Each dispatcher delivers from its own lane, so a slow sink does not hold up the others.
+            with span("submit"):
+                for dispatcher in self.dispatchers:
+                    await dispatcher.submit(final_json_obj)
             
             return True # Event was handled
         except ValidationError:
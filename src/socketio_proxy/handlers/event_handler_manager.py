@@ -1,55 +1,174 @@
-from typing import List, Any
+import asyncio
+from typing import List, Any, Dict, Optional
 import httpx
+from jsonschema.validators import validator_for
 from socketio_proxy.config.settings import DispatchConfig
 from socketio_proxy.web.websocket_manager import WebSocketManager
 from socketio_proxy.handlers.preprocessors.manager import PreprocessorManager
 from socketio_proxy.handlers.event_handler import EventHandler
+from socketio_proxy.handlers.overload import OverloadController, PRIORITIES
 from socketio_proxy.handlers.dispatchers.manager import DispatcherManager
 from socketio_proxy.handlers.dispatchers.base import Dispatcher
 from socketio_proxy.config.logging import logger
-import json
+from socketio_proxy.util.binary import summarize
+from socketio_proxy.util.tracing import span
+
+class _HandlerSet:
+    """One compiled generation of rules, with a count of events still being handled by it."""
+    def __init__(self, handlers: List[EventHandler]):
+        self.handlers = handlers
+        self.inflight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def dispatchers(self) -> Dict[int, Dispatcher]:
+        return {id(d): d for handler in self.handlers for d in handler.dispatchers}
 
 class EventHandlerManager:
+    DRAIN_TIMEOUT = 30.0
+
     def __init__(self,
                  dispatch_config: DispatchConfig,
                  http_client: httpx.AsyncClient,
                  websocket_manager: WebSocketManager,
                  preprocessor_manager: PreprocessorManager,
-                 dispatcher_manager: DispatcherManager):
-        self.event_handlers: List[EventHandler] = []
+                 dispatcher_manager: DispatcherManager,
+                 overload: Optional[OverloadController] = None):
         self.default_dispatcher = dispatcher_manager.get_dispatcher({"type": "file", "path": "unhandled_messages.log"})
+        self.http_client = http_client
         self.websocket_manager = websocket_manager
-        self._build_handlers(dispatch_config, http_client, websocket_manager, preprocessor_manager, dispatcher_manager)
+        self.preprocessor_manager = preprocessor_manager
+        self.dispatcher_manager = dispatcher_manager
+        self.overload = overload
+        if overload is not None:
+            overload.queue_pressure = self.queue_pressure
+        self._current = _HandlerSet(self._build_handlers(dispatch_config))
+        self._reload_lock = asyncio.Lock()
+        self.reload_count = 0
 
-    def _build_handlers(self, dispatch_config, http_client, websocket_manager, preprocessor_manager, dispatcher_manager):
+    @property
+    def event_handlers(self) -> List[EventHandler]:
+        return self._current.handlers
+
+    def _build_handlers(self, dispatch_config: DispatchConfig, built: Optional[List[Dispatcher]] = None) -> List[EventHandler]:
+        """Builds one EventHandler per rule. Every dispatcher obtained is also appended to `built`."""
+        handlers: List[EventHandler] = []
         for i, rule_config in enumerate(dispatch_config.rules):
+            # Fail on a broken schema now rather than on every event later.
+            validator_for(rule_config.schema).check_schema(rule_config.schema)
+            if rule_config.priority not in PRIORITIES:
+                raise ValueError(f"Rule {i+1}: unknown priority '{rule_config.priority}'. Expected one of: {', '.join(PRIORITIES)}")
+            if rule_config.sample_rate is not None and not 0 <= rule_config.sample_rate <= 1:
+                raise ValueError(f"Rule {i+1}: sample_rate must be between 0 and 1.")
             preprocessor_name = rule_config.preprocessor or "base_preprocessor"
-            preprocessor = preprocessor_manager.get_preprocessor(preprocessor_name)
+            preprocessor = self.preprocessor_manager.get_preprocessor(preprocessor_name)
 
             dispatchers: List[Dispatcher] = []
             dispatcher_types = []
             for d_config in rule_config.dispatchers:
-                dispatcher = dispatcher_manager.get_dispatcher(
+                dispatcher = self.dispatcher_manager.get_dispatcher(
                     d_config,
-                    http_client=http_client,
-                    websocket_manager=websocket_manager
+                    http_client=self.http_client,
+                    websocket_manager=self.websocket_manager
                 )
                 dispatchers.append(dispatcher)
+                if built is not None:
+                    built.append(dispatcher)
                 dispatcher_types.append(d_config.get("type", "unknown"))
             
-            handler = EventHandler(rule_config.schema, preprocessor, dispatchers)
-            self.event_handlers.append(handler)
-            logger.info(f"Rule {i+1} loaded. Preprocessor: '{preprocessor.name}', Dispatchers: {', '.join(dispatcher_types)}.")
+            handler = EventHandler(rule_config.schema, preprocessor, dispatchers,
+                                   rule_config.priority, rule_config.sample_rate, self.overload)
+            handlers.append(handler)
+            logger.info(f"Rule {i+1} loaded. Preprocessor: '{preprocessor.name}', Dispatchers: {', '.join(dispatcher_types)}, "
+                        f"Priority: {rule_config.priority}.")
+        return handlers
+
+    async def reload(self, dispatch_config: DispatchConfig) -> Dict[str, Any]:
+        """
+        Builds a new set of EventHandlers from dispatch_config and swaps it in.
+        Unchanged dispatcher configs reuse their cached instances. Events already
+        being handled finish on the old set; dispatchers that are no longer
+        referenced then have their lanes drained and are closed. If building
+        fails, the current set stays active.
+        """
+        async with self._reload_lock:
+            old = self._current
+            built: List[Dispatcher] = []
+            try:
+                new = _HandlerSet(self._build_handlers(dispatch_config, built))
+            except Exception:
+                await self._discard_unused(built, old)
+                raise
+            # Single assignment between events: handle() picks one set per event.
+            self._current = new
+            self.reload_count += 1
+
+            kept = new.dispatchers()
+            kept[id(self.default_dispatcher)] = self.default_dispatcher
+            removed = [d for key, d in old.dispatchers().items() if key not in kept]
+            for dispatcher in removed:
+                self.dispatcher_manager.release(dispatcher)
+
+            try:
+                await asyncio.wait_for(old.idle.wait(), timeout=self.DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Reload: {old.inflight} event(s) still in flight on the old rules after {self.DRAIN_TIMEOUT}s.")
+            for dispatcher in removed:
+                try:
+                    await self.dispatcher_manager.close_dispatcher(dispatcher)
+                except Exception as e:
+                    logger.error(f"Reload: closing removed '{dispatcher.type}' dispatcher failed: {e}")
+
+            logger.info(f"Dispatch rules reloaded: {len(new.handlers)} rule(s), {len(removed)} dispatcher(s) removed.")
+            return {"rules": len(new.handlers), "dispatchers": len(kept) - 1, "removed_dispatchers": len(removed),
+                    "reload_count": self.reload_count}
+
+    async def _discard_unused(self, dispatchers: List[Dispatcher], active: _HandlerSet):
+        """Releases and closes dispatchers created by a failed rebuild that the active rules do not use."""
+        in_use = active.dispatchers()
+        in_use[id(self.default_dispatcher)] = self.default_dispatcher
+        unused = {id(d): d for d in dispatchers if id(d) not in in_use}
+        for dispatcher in unused.values():
+            self.dispatcher_manager.release(dispatcher)
+            try:
+                await self.dispatcher_manager.close_dispatcher(dispatcher)
+            except Exception as e:
+                logger.error(f"Reload: closing unused '{dispatcher.type}' dispatcher failed: {e}")
+
+    def dispatcher_stats(self) -> List[Dict[str, Any]]:
+        """Runtime metrics (delivery lane and dispatcher-specific) of the active dispatchers."""
+        dispatchers = self._current.dispatchers()
+        dispatchers[id(self.default_dispatcher)] = self.default_dispatcher
+        result = []
+        for dispatcher in dispatchers.values():
+            entry = {"type": dispatcher.type, **(dispatcher.stats() or {})}
+            if dispatcher.lane is not None:
+                entry["lane"] = dispatcher.lane.stats()
+            result.append(entry)
+        return result
+
+    def queue_pressure(self) -> float:
+        """Fill ratio (depth / queue_size) of the fullest delivery lane of the active dispatchers."""
+        lanes = [d.lane for d in self._current.dispatchers().values() if d.lane is not None]
+        return max((lane.depth / lane.queue_size for lane in lanes if lane.queue_size), default=0.0)
 
     async def handle(self, event: str, data: Any):
-        for handler in self.event_handlers:
-            was_handled = await handler.handle(event, data)
-            if was_handled:
-                return
+        handler_set = self._current
+        handler_set.inflight += 1
+        handler_set.idle.clear()
+        try:
+            for handler in handler_set.handlers:
+                was_handled = await handler.handle(event, data)
+                if was_handled:
+                    return
+        finally:
+            handler_set.inflight -= 1
+            if not handler_set.inflight:
+                handler_set.idle.set()
 
         original_json_obj = {"event": event, "data": data}
-        message_summary = json.dumps(original_json_obj)
-        if len(message_summary) > 100:
-            message_summary = message_summary[:100] + "..."
+        with span("summarize"):
+            message_summary = summarize(original_json_obj)
         logger.info(f"No matched schema, msg={message_summary}")
-        await self.default_dispatcher.dispatch(original_json_obj)
\ No newline at end of file
+        with span("submit"):
+            await self.default_dispatcher.submit(original_json_obj)
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Overload control for the dispatch path: sheds low-priority and sampled
+rules first when delivery lanes back up or the event loop falls behind.
+"""
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+from socketio_proxy.config.logging import logger
+
+PRIORITIES = ("high", "normal", "low")
+LEVELS = ("ok", "shedding", "critical")
+
+class OverloadController:
+    """
+    Tracks two pressure signals, refreshed at most every CHECK_INTERVAL seconds:
+    the fullest delivery lane (depth / queue_size) and the current event-loop lag.
+    Crossing either threshold enters 'shedding'; twice the threshold enters
+    'critical'. What each level does to a rule:
+
+    - high: always delivered.
+    - normal: delivered, except that a rule with a sample_rate keeps only
+      that fraction of its events at either level.
+    - low: 'shedding' keeps sample_rate of the events (none without one),
+      'critical' drops all of them.
+    """
+    CHECK_INTERVAL = 0.1
+
+    def __init__(self, queue_ratio: Optional[float] = None, loop_lag_ms: Optional[float] = None,
+                 loop_monitor: Any = None):
+        self.queue_ratio = queue_ratio
+        self.loop_lag_ms = loop_lag_ms
+        self.loop_monitor = loop_monitor
+        self.queue_pressure: Callable[[], float] = lambda: 0.0  # set by EventHandlerManager
+        self.level = 0
+        self.transitions = 0
+        self._checked_at = 0.0
+        self._last_queue = 0.0
+        self._last_lag_ms = 0.0
+        self.counts: Dict[str, Dict[str, int]] = {
+            priority: {"passed": 0, "shed": 0, "sampled_out": 0} for priority in PRIORITIES
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.queue_ratio is not None or self.loop_lag_ms is not None
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        self._last_queue = self.queue_pressure()
+        self._last_lag_ms = self.loop_monitor.current * 1000 if self.loop_monitor is not None else 0.0
+
+        level = 0
+        for value, threshold in ((self._last_queue, self.queue_ratio), (self._last_lag_ms, self.loop_lag_ms)):
+            if threshold is None or threshold <= 0:
+                continue
+            if value >= 2 * threshold:
+                level = 2
+            elif value >= threshold:
+                level = max(level, 1)
+        if level != self.level:
+            self.transitions += 1
+            log = logger.warning if level > self.level else logger.info
+            log(f"Overload level {LEVELS[self.level]} -> {LEVELS[level]} "
+                f"(lane fill {self._last_queue:.0%}, loop lag {self._last_lag_ms:.1f}ms).")
+            self.level = level
+
+    def admit(self, priority: str, sample_rate: Optional[float] = None) -> bool:
+        """Returns False if an event of a rule with this priority and sample rate should be dropped now."""
+        counts = self.counts[priority]
+        if not self.enabled or priority == "high":
+            counts["passed"] += 1
+            return True
+        self._refresh()
+        if self.level == 0 or (priority == "normal" and sample_rate is None):
+            counts["passed"] += 1
+            return True
+        if priority == "low" and self.level == 2:
+            counts["shed"] += 1
+            return False
+        if sample_rate is None:
+            counts["shed"] += 1
+            return False
+        if random.random() < sample_rate:
+            counts["passed"] += 1
+            return True
+        counts["sampled_out"] += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "level": LEVELS[self.level],
+            "lane_fill": round(self._last_queue, 4),
+            "loop_lag_ms": round(self._last_lag_ms, 3),
+            "queue_ratio_threshold": self.queue_ratio,
+            "loop_lag_threshold_ms": self.loop_lag_ms,
+            "transitions": self.transitions,
+            "by_priority": self.counts,
+        }
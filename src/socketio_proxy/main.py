@@ -3,6 +3,7 @@ Main entry point for the Socket.IO Proxy application.
 """
 import asyncio
 import argparse
+import signal
 from socketio_proxy.core.proxy_server import SocketIOProxy
 from socketio_proxy.config.settings import ConfigLoader
 from socketio_proxy.config.logging import logger
@@ -16,6 +17,38 @@ from socketio_proxy.web.dependencies import app_context  # 导入 app_context
 from socketio_proxy.core.proxy_builder import SocketIOProxyBuilder # 导入 SocketIOProxyBuilder
 import httpx
 import os
+from typing import Set
+
+def _install_reload_signal(builder: SocketIOProxyBuilder) -> Set[asyncio.Task]:
+    """
+    Reloads dispatch rules on SIGHUP where the platform and event loop support it.
+    Returns the set of reloads still running, so shutdown can wait for them.
+    """
+    tasks: Set[asyncio.Task] = set()  # keeps running reloads referenced until they finish
+    if not hasattr(signal, "SIGHUP"):
+        return tasks
+
+    async def reload():
+        try:
+            await builder.reload_dispatch_rules()
+        except Exception as e:
+            logger.error(f"SIGHUP config reload failed, keeping current rules: {e}")
+
+    def on_done(task: asyncio.Task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"SIGHUP config reload task failed: {task.exception()!r}")
+
+    def start_reload():
+        task = asyncio.create_task(reload())
+        tasks.add(task)
+        task.add_done_callback(on_done)
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, start_reload)
+    except (NotImplementedError, RuntimeError, ValueError):
+        logger.warning("Could not install SIGHUP handler; use POST /admin/reload instead.")
+    return tasks
 
 async def run_proxy_from_config(config_path: str):
     """
@@ -24,12 +57,17 @@ async def run_proxy_from_config(config_path: str):
     """
     builder = SocketIOProxyBuilder(config_path)
     proxy = await builder.build()
+    reloads = _install_reload_signal(builder)
     try:
         await proxy.start()
     except (KeyboardInterrupt, asyncio.CancelledError):
         logger.info("Proxy shutting down...")
     finally:
+        if reloads:
+            # Let a reload finish swapping and draining before the emit scheduler is closed under it.
+            await asyncio.gather(*reloads, return_exceptions=True)
         await proxy.stop()
+        await builder.dispatcher_manager.close()
         await builder.http_client.aclose() # Ensure http_client is closed
 
 async def async_main():
@@ -0,0 +1,157 @@
+"""
+Latency-based adaptive concurrency limit (AIMD) with a bounded wait queue.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest", "block")
+
+class LimiterOverflowError(Exception):
+    """Raised when a request is dropped because the limiter's queue is full."""
+    pass
+
+class AdaptiveLimiter:
+    """
+    Caps in-flight requests to one target and adapts the cap to its latency.
+
+    The limit grows by about one per round trip while responses stay within
+    `tolerance` times the best recently observed latency and the limit is
+    actually being used, and is multiplied by `backoff` on errors or when
+    latency rises above that, so queueing at a slow receiver shrinks the
+    limit instead of piling up more requests.
+
+    Requests over the limit wait in a FIFO queue of `queue_size`; when it is
+    full, `overflow` decides: drop_new rejects the new request, drop_oldest
+    rejects the longest-waiting one, block waits for queue space.
+    """
+    RTT_WINDOW = 100  # samples after which the baseline latency is re-measured
+
+    def __init__(self, initial_limit: int = 10, min_limit: int = 1, max_limit: int = 200,
+                 queue_size: int = 1000, overflow: str = "drop_new",
+                 tolerance: float = 2.0, backoff: float = 0.9):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Expected one of: {', '.join(OVERFLOW_POLICIES)}")
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.tolerance = tolerance
+        self.backoff = backoff
+
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._space = asyncio.Event()
+
+        self._min_rtt = float("inf")
+        self._window_min_rtt = float("inf")
+        self._window_samples = 0
+        self.last_latency = 0.0
+        self._last_decrease = 0.0
+
+        self.completed = 0
+        self.errors = 0
+        self.dropped = 0
+
+    async def acquire(self):
+        """Waits for a slot. Raises LimiterOverflowError if the request is dropped."""
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            return
+
+        while len(self._waiters) >= self.queue_size:
+            if self.overflow == "drop_new":
+                self.dropped += 1
+                raise LimiterOverflowError(f"Queue full ({self.queue_size} waiting).")
+            if self.overflow == "drop_oldest":
+                oldest = self._waiters.popleft()
+                if not oldest.done():
+                    self.dropped += 1
+                    oldest.set_exception(LimiterOverflowError("Dropped from a full queue by a newer request."))
+                continue
+            self._space.clear()
+            await self._space.wait()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter  # the slot is handed over by release()
+        except BaseException:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release_slot()  # cancelled after being granted a slot
+            raise
+
+    def release(self, latency: float, ok: bool = True):
+        """Returns a slot and feeds the request's outcome into the limit."""
+        self._update_limit(latency, ok)
+        self._release_slot()
+
+    def _release_slot(self):
+        self.inflight -= 1
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.inflight += 1
+            waiter.set_result(None)
+        self._space.set()
+
+    def _update_limit(self, latency: float, ok: bool):
+        self.completed += 1
+        self.last_latency = latency
+        if not ok:
+            self.errors += 1
+            self._decrease(latency)
+            return
+
+        self._window_min_rtt = min(self._window_min_rtt, latency)
+        self._window_samples += 1
+        if self._window_samples >= self.RTT_WINDOW:
+            # Re-baseline so a permanently slower receiver is not punished forever.
+            self._min_rtt = self._window_min_rtt
+            self._window_min_rtt = float("inf")
+            self._window_samples = 0
+        self._min_rtt = min(self._min_rtt, latency)
+
+        if latency > self._min_rtt * self.tolerance:
+            self._decrease(latency)
+        elif self.inflight >= int(self.limit) - 1:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, latency: float):
+        # At most one multiplicative decrease per round trip, so a burst of
+        # slow responses from the same congestion episode counts once.
+        now = time.monotonic()
+        if now - self._last_decrease >= latency:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "queue_size": self.queue_size,
+            "overflow": self.overflow,
+            "completed": self.completed,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "min_latency_ms": round(self._min_rtt * 1000, 3) if self._min_rtt != float("inf") else None,
+            "last_latency_ms": round(self.last_latency * 1000, 3),
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AdaptiveLimiter":
+        return cls(
+            initial_limit=int(config.get("initial_limit", 10)),
+            min_limit=int(config.get("min_limit", 1)),
+            max_limit=int(config.get("max_limit", 200)),
+            queue_size=int(config.get("queue_size", 1000)),
+            overflow=config.get("overflow", "drop_new"),
+            tolerance=float(config.get("tolerance", 2.0)),
+            backoff=float(config.get("backoff", 0.9))
+        )
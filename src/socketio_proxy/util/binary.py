@@ -0,0 +1,102 @@
+"""
+Helpers for events that carry binary attachments (``bytes`` values).
+
+Binary-capable sinks send attachments as raw bytes next to a JSON skeleton in
+which every attachment is replaced by a Socket.IO-style placeholder
+``{"_placeholder": true, "num": i}``. The length-prefixed container is::
+
+    u32 header_length | header JSON | u32 count | (u32 length | bytes) * count
+
+(all integers big endian). Text-only sinks fall back to ``{"_binary": "<base64>"}``.
+"""
+import base64
+import json
+import struct
+from typing import Any, List, Tuple, Union
+
+PLACEHOLDER_KEY = "_placeholder"
+BINARY_KEY = "_binary"
+BINARY_MEDIA_TYPE = "application/x-sio-binary"
+_U32 = struct.Struct(">I")
+
+def has_binary(value: Any) -> bool:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return True
+    if isinstance(value, dict):
+        return any(has_binary(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_binary(item) for item in value)
+    return False
+
+def split_binary(value: Any) -> Tuple[Any, List[bytes]]:
+    """Replaces attachments with placeholders; returns (skeleton, attachments)."""
+    attachments: List[bytes] = []
+
+    def walk(item: Any) -> Any:
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            attachments.append(bytes(item))
+            return {PLACEHOLDER_KEY: True, "num": len(attachments) - 1}
+        if isinstance(item, dict):
+            return {key: walk(child) for key, child in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [walk(child) for child in item]
+        return item
+
+    return walk(value), attachments
+
+def join_binary(skeleton: Any, attachments: List[bytes]) -> Any:
+    """Inverse of split_binary."""
+    if isinstance(skeleton, dict):
+        if skeleton.get(PLACEHOLDER_KEY) is True and "num" in skeleton:
+            return attachments[skeleton["num"]]
+        return {key: join_binary(child, attachments) for key, child in skeleton.items()}
+    if isinstance(skeleton, list):
+        return [join_binary(child, attachments) for child in skeleton]
+    return skeleton
+
+def pack_binary(header: Any, attachments: List[bytes]) -> bytes:
+    """Builds the length-prefixed container from a JSON header and its attachments."""
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    parts = [_U32.pack(len(header_bytes)), header_bytes, _U32.pack(len(attachments))]
+    for attachment in attachments:
+        parts.append(_U32.pack(len(attachment)))
+        parts.append(attachment)
+    return b"".join(parts)
+
+def unpack_binary(data: Union[bytes, memoryview]) -> Tuple[Any, List[bytes]]:
+    """Parses a container produced by pack_binary into (header, attachments)."""
+    view = memoryview(data)
+    (length,) = _U32.unpack_from(view, 0)
+    header = json.loads(bytes(view[4:4 + length]))
+    offset = 4 + length
+    (count,) = _U32.unpack_from(view, offset)
+    offset += 4
+    attachments = []
+    for _ in range(count):
+        (size,) = _U32.unpack_from(view, offset)
+        attachments.append(bytes(view[offset + 4:offset + 4 + size]))
+        offset += 4 + size
+    return header, attachments
+
+def json_default(value: Any) -> Any:
+    """json.dumps default= hook for text-only sinks: attachments become base64."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {BINARY_KEY: base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def binary_frame_to_json(frame: bytes) -> str:
+    """Converts a container frame into the equivalent JSON text with base64 attachments."""
+    header, attachments = unpack_binary(frame)
+    return json.dumps(join_binary(header, attachments), default=json_default)
+
+def summarize(message: Any, limit: int = 100) -> str:
+    """JSON summary for logging; attachments are shown by size only."""
+    def describe(value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f"<{len(value)} bytes>"
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    summary = json.dumps(message, default=describe)
+    if len(summary) > limit:
+        summary = summary[:limit] + "..."
+    return summary
@@ -0,0 +1,73 @@
+"""
+Body compression for outgoing payloads (HTTP Content-Encoding and
+pre-compressed WebSocket frames), with running compression-ratio counters.
+"""
+import gzip
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+ENCODINGS: Dict[str, Callable[[bytes, int], bytes]] = {
+    "gzip": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+    "deflate": lambda data, level: zlib.compress(data, level),  # HTTP "deflate" is the zlib format
+}
+
+class Compressor:
+    """
+    Compresses payloads of at least `threshold` bytes with `encoding` and
+    keeps counters of what it did. Payloads that do not shrink are sent as-is,
+    unless `always` is set for receivers that expect every payload compressed.
+    """
+    def __init__(self, encoding: str = "gzip", level: int = 6, threshold: int = 1024, always: bool = False):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown compression: '{encoding}'. Available: {', '.join(ENCODINGS)}")
+        self.encoding = encoding
+        self.level = level
+        self.threshold = threshold
+        self.always = always
+        self._compress = ENCODINGS[encoding]
+
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0   # size of the payloads that were compressed
+        self.bytes_out = 0  # their size after compression
+
+    def compress(self, data: bytes) -> Tuple[bytes, Optional[str]]:
+        """Returns (payload, content encoding), the encoding being None if the payload was left as-is."""
+        if len(data) < self.threshold and not self.always:
+            self.skipped += 1
+            return data, None
+        compressed = self._compress(data, self.level)
+        if len(compressed) >= len(data) and not self.always:
+            self.skipped += 1
+            return data, None
+        self.compressed += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(compressed)
+        return compressed, self.encoding
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Uncompressed / compressed size over everything compressed so far."""
+        return round(self.bytes_in / self.bytes_out, 3) if self.bytes_out else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "encoding": self.encoding,
+            "threshold": self.threshold,
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": self.ratio,
+        }
+
+    @classmethod
+    def from_config(cls, config: Union[str, Dict[str, Any]]) -> "Compressor":
+        """Accepts an encoding name or {encoding, level, threshold}."""
+        if isinstance(config, str):
+            return cls(config)
+        return cls(
+            encoding=config.get("encoding", "gzip"),
+            level=int(config.get("level", 6)),
+            threshold=int(config.get("threshold", 1024))
+        )
@@ -0,0 +1,293 @@
+"""
+Append-only, segment-based event store with a sidecar time/event index.
+
+Layout of the store directory:
+- ``<first_ts_us>.seg``: NDJSON lines, one event per line, append-only.
+- ``<first_ts_us>.idx``: fixed-size index records ``(ts_us, offset, length, event_crc32)``
+  pointing into the matching segment, in timestamp order.
+
+Writes are expected to come from a single thread at a time (the dispatcher's
+flush task); queries may run concurrently from other threads.
+"""
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+from socketio_proxy.config.logging import logger
+from socketio_proxy.util.binary import json_default
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+INDEX_RECORD = struct.Struct("<qQII")  # ts_us, offset, length, crc32(event name)
+
+def event_hash(event: str) -> int:
+    return zlib.crc32(event.encode("utf-8"))
+
+def encode_line(ts: float, event: str, data: Any) -> bytes:
+    """Encodes one stored event as a compact NDJSON line."""
+    return json.dumps({"ts": ts, "event": event, "data": data}, separators=(",", ":"),
+                      default=json_default).encode("utf-8") + b"\n"
+
+def _event_marker(event: str) -> bytes:
+    return b',"event":' + json.dumps(event).encode("utf-8") + b','
+
+class Segment:
+    """A single segment file and its index."""
+
+    def __init__(self, directory: str, first_ts_us: int):
+        self.first_ts_us = first_ts_us
+        base = os.path.join(directory, f"{first_ts_us:020d}")
+        self.data_path = base + SEGMENT_SUFFIX
+        self.index_path = base + INDEX_SUFFIX
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.data_path) + os.path.getsize(self.index_path)
+        except OSError:
+            return 0
+
+    def last_ts_us(self) -> Optional[int]:
+        """Timestamp of the last indexed event, or None for an empty segment."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                count = f.tell() // INDEX_RECORD.size
+                if not count:
+                    return None
+                f.seek((count - 1) * INDEX_RECORD.size)
+                return INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))[0]
+        except OSError:
+            return None
+
+    def delete(self):
+        for path in (self.data_path, self.index_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+class EventStore:
+    """
+    Durable, indexed store for dispatched events.
+    Segments are rotated at ``max_segment_bytes`` and whole segments are dropped
+    once the store exceeds ``retention_bytes`` or their newest event is older
+    than ``retention_seconds``.
+    """
+    READ_CHUNK_BYTES = 64 * 1024
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024,
+                 retention_bytes: Optional[int] = None, retention_seconds: Optional[float] = None):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.retention_bytes = retention_bytes
+        self.retention_seconds = retention_seconds
+
+        self._segments: List[Segment] = []
+        self._segments_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # several dispatchers may share one store
+        self._data_file = None
+        self._index_file = None
+        self._active_size = 0
+        self._last_ts_us = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_segments()
+
+    def _load_segments(self):
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(SEGMENT_SUFFIX):
+                try:
+                    self._segments.append(Segment(self.directory, int(filename[:-len(SEGMENT_SUFFIX)])))
+                except ValueError:
+                    logger.warning(f"Event store: ignoring unexpected file '{filename}'.")
+        if self._segments:
+            self._open_active(self._segments[-1], recover=True)
+
+    def _open_active(self, segment: Segment, recover: bool = False):
+        if recover:
+            self._recover(segment)
+        self._data_file = open(segment.data_path, "ab")
+        self._index_file = open(segment.index_path, "ab")
+        self._active_size = self._data_file.tell()
+        self._last_ts_us = max(self._last_ts_us, segment.last_ts_us() or segment.first_ts_us)
+
+    @staticmethod
+    def _recover(segment: Segment):
+        """
+        Trims a torn tail left by a crash: partial index records and data
+        bytes that are not referenced by the index.
+        """
+        if not os.path.exists(segment.index_path):
+            open(segment.index_path, "wb").close()
+        index_size = os.path.getsize(segment.index_path)
+        index_size -= index_size % INDEX_RECORD.size
+        data_end = 0
+        with open(segment.index_path, "r+b") as f:
+            f.truncate(index_size)
+            if index_size:
+                f.seek(index_size - INDEX_RECORD.size)
+                _, offset, length, _ = INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))
+                data_end = offset + length
+        if os.path.exists(segment.data_path) and os.path.getsize(segment.data_path) > data_end:
+            with open(segment.data_path, "r+b") as f:
+                f.truncate(data_end)
+
+    def _rotate(self, first_ts_us: int):
+        self._close_active()
+        segment = Segment(self.directory, first_ts_us)
+        with self._segments_lock:
+            self._segments.append(segment)
+        self._open_active(segment)
+
+    def _close_active(self):
+        for f in (self._data_file, self._index_file):
+            if f:
+                f.close()
+        self._data_file = self._index_file = None
+
+    def append_batch(self, records: List[Tuple[float, str, Any]]):
+        """
+        Appends ``(timestamp, event_name, data)`` records. Encoding happens here
+        so callers can run the whole batch off the event loop. Timestamps are
+        clamped so the index stays monotonic even if the wall clock steps back.
+        """
+        if not records:
+            return
+        with self._write_lock:
+            self._append_batch(records)
+
+    def _append_batch(self, records: List[Tuple[float, str, Any]]):
+        index_buffer = bytearray()
+        data_buffer = bytearray()
+        for ts, event, data in records:
+            ts_us = max(int(ts * 1_000_000), self._last_ts_us)
+            line = encode_line(ts_us / 1_000_000, event, data)
+            if self._data_file is None or (self._active_size + len(data_buffer) >= self.max_segment_bytes
+                                           and ts_us > self._segments[-1].first_ts_us):
+                self._write_buffers(data_buffer, index_buffer)
+                data_buffer.clear()
+                index_buffer.clear()
+                self._rotate(ts_us)
+            index_buffer += INDEX_RECORD.pack(ts_us, self._active_size + len(data_buffer), len(line), event_hash(event))
+            data_buffer += line
+            self._last_ts_us = ts_us
+        self._write_buffers(data_buffer, index_buffer)
+        self.enforce_retention()
+
+    def _write_buffers(self, data_buffer: bytearray, index_buffer: bytearray):
+        if not data_buffer:
+            return
+        # Data first, then index: the index never points past written data.
+        self._data_file.write(data_buffer)
+        self._data_file.flush()
+        self._index_file.write(index_buffer)
+        self._index_file.flush()
+        self._active_size += len(data_buffer)
+
+    def enforce_retention(self):
+        """Drops the oldest segments (never the active one) that fall outside retention."""
+        with self._segments_lock:
+            candidates = self._segments[:-1]
+            expired: List[Segment] = []
+            if self.retention_seconds:
+                cutoff_us = int((time.time() - self.retention_seconds) * 1_000_000)
+                for segment in candidates:
+                    last_ts = segment.last_ts_us()
+                    if last_ts is None or last_ts >= cutoff_us:
+                        break
+                    expired.append(segment)
+            if self.retention_bytes:
+                total = sum(segment.size() for segment in self._segments) - sum(segment.size() for segment in expired)
+                for segment in candidates[len(expired):]:
+                    if total <= self.retention_bytes:
+                        break
+                    total -= segment.size()
+                    expired.append(segment)
+            for segment in expired:
+                self._segments.remove(segment)
+
+        for segment in expired:
+            segment.delete()
+            logger.info(f"Event store: dropped segment '{segment.data_path}' (retention).")
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None, event: Optional[str] = None,
+              limit: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yields NDJSON chunks for events with ``start <= ts <= end`` (seconds),
+        optionally restricted to one event name, oldest first.
+        """
+        start_us = int(start * 1_000_000) if start is not None else None
+        end_us = int(end * 1_000_000) if end is not None else None
+        wanted_hash = event_hash(event) if event is not None else None
+        wanted_marker = _event_marker(event) if event is not None else None
+
+        with self._segments_lock:
+            segments = list(self._segments)
+
+        remaining = limit
+        chunk = bytearray()
+        for i, segment in enumerate(segments):
+            next_first = segments[i + 1].first_ts_us if i + 1 < len(segments) else None
+            if end_us is not None and segment.first_ts_us > end_us:
+                break
+            if start_us is not None and next_first is not None and next_first <= start_us:
+                continue
+            try:
+                for line in self._scan_segment(segment, start_us, end_us, wanted_hash):
+                    if wanted_marker is not None and wanted_marker not in line:
+                        continue  # crc32 collision
+                    chunk += line
+                    if remaining is not None:
+                        remaining -= 1
+                    if len(chunk) >= self.READ_CHUNK_BYTES:
+                        yield bytes(chunk)
+                        chunk.clear()
+                    if remaining is not None and remaining <= 0:
+                        break
+            except FileNotFoundError:
+                continue  # dropped by retention while we were reading
+            if remaining is not None and remaining <= 0:
+                break
+        if chunk:
+            yield bytes(chunk)
+
+    @staticmethod
+    def _scan_segment(segment: Segment, start_us: Optional[int], end_us: Optional[int],
+                      wanted_hash: Optional[int]) -> Iterator[bytes]:
+        with open(segment.index_path, "rb") as index_file, open(segment.data_path, "rb") as data_file:
+            index_fd = index_file.fileno()
+            data_fd = data_file.fileno()
+            count = os.fstat(index_fd).st_size // INDEX_RECORD.size
+
+            def record_at(position: int):
+                return INDEX_RECORD.unpack(os.pread(index_fd, INDEX_RECORD.size, position * INDEX_RECORD.size))
+
+            # Binary search for the first record with ts >= start.
+            low, high = 0, count
+            if start_us is not None:
+                while low < high:
+                    middle = (low + high) // 2
+                    if record_at(middle)[0] < start_us:
+                        low = middle + 1
+                    else:
+                        high = middle
+
+            batch_records = 1024
+            position = low
+            while position < count:
+                raw = os.pread(index_fd, INDEX_RECORD.size * min(batch_records, count - position),
+                               position * INDEX_RECORD.size)
+                for ts_us, offset, length, name_hash in INDEX_RECORD.iter_unpack(raw):
+                    if end_us is not None and ts_us > end_us:
+                        return
+                    if wanted_hash is None or name_hash == wanted_hash:
+                        yield os.pread(data_fd, length, offset)
+                position += len(raw) // INDEX_RECORD.size
+
+    def close(self):
+        with self._write_lock:
+            self._close_active()
@@ -0,0 +1,114 @@
+"""
+KvLite 的值编解码与压缩。
+
+存储格式:
+- 旧格式 / 默认格式: 直接是 msgpack 数据，没有任何头部。
+- 带头格式: MAGIC (0xc1) + 头字节 + 负载。
+  头字节高 4 位为压缩算法 id，低 4 位为编码 id。
+
+0xc1 在 msgpack 规范中永不使用，因此任何旧行都不会被误判为带头格式。
+"""
+import json
+import lzma
+import zlib
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import msgpack
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = 0xc1
+HEADER_SIZE = 2
+
+class Codec(NamedTuple):
+    id: int
+    encode: Callable[[Any], bytes]
+    decode: Callable[[memoryview], Any]
+
+class Compressor(NamedTuple):
+    id: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[memoryview], bytes]
+
+def _encode_raw(value: Any) -> bytes:
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        raise TypeError(f"Raw codec only accepts bytes-like values, got {type(value).__name__}")
+    return value
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor().compress(data)
+
+def _zstd_decompress(data: memoryview) -> bytes:
+    if zstandard is None:
+        raise RuntimeError("Value is zstd-compressed but the 'zstandard' package is not installed")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+CODECS: Dict[str, Codec] = {
+    "msgpack": Codec(0, lambda value: msgpack.packb(value, use_bin_type=True), lambda data: msgpack.unpackb(data, raw=False)),
+    "raw": Codec(1, _encode_raw, bytes),
+    "json": Codec(2, lambda value: json.dumps(value, separators=(',', ':')).encode('utf-8'), lambda data: json.loads(bytes(data))),
+}
+
+COMPRESSORS: Dict[str, Compressor] = {
+    "none": Compressor(0, lambda data: data, lambda data: data),
+    "zlib": Compressor(1, zlib.compress, zlib.decompress),
+    "lzma": Compressor(2, lzma.compress, lzma.decompress),
+    "zstd": Compressor(3, _zstd_compress, _zstd_decompress),
+}
+
+_CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+_COMPRESSORS_BY_ID = {compressor.id: compressor for compressor in COMPRESSORS.values()}
+
+def get_codec(name: str) -> Codec:
+    codec = CODECS.get(name)
+    if not codec:
+        raise ValueError(f"Unknown codec: '{name}'. Available: {', '.join(CODECS)}")
+    return codec
+
+def get_compressor(name: Optional[str]) -> Compressor:
+    compressor = COMPRESSORS.get(name or "none")
+    if not compressor:
+        raise ValueError(f"Unknown compression: '{name}'. Available: {', '.join(COMPRESSORS)}")
+    if compressor is COMPRESSORS["zstd"] and zstandard is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+    return compressor
+
+def encode_value(value: Any, codec: Codec, compressor: Compressor, compress_threshold: int) -> bytes:
+    """
+    编码一个值。msgpack 且未压缩时保持无头的旧格式，新旧版本均可读取。
+    """
+    payload = codec.encode(value)
+    compressor_id = 0
+    if compressor.id and len(payload) >= compress_threshold:
+        compressed = compressor.compress(payload)
+        # 压缩无收益时保留原始负载
+        if len(compressed) < len(payload):
+            payload = compressed
+            compressor_id = compressor.id
+
+    if codec.id == 0 and compressor_id == 0:
+        return payload
+    return b"".join((bytes((MAGIC, (compressor_id << 4) | codec.id)), payload))
+
+def decode_value(blob: bytes) -> Any:
+    """
+    解码一个值，根据头字节自动选择编码和压缩算法；无头数据按 msgpack 解码。
+    """
+    view = memoryview(blob)
+    if not view or view[0] != MAGIC:
+        return CODECS["msgpack"].decode(view)
+
+    if len(view) < HEADER_SIZE:
+        raise ValueError("Truncated value header")
+    header = view[1]
+    codec = _CODECS_BY_ID.get(header & 0x0f)
+    compressor = _COMPRESSORS_BY_ID.get(header >> 4)
+    if codec is None or compressor is None:
+        raise ValueError(f"Unknown value header: 0x{header:02x}")
+
+    payload = view[HEADER_SIZE:]
+    if compressor.id:
+        payload = memoryview(compressor.decompress(payload))
+    return codec.decode(payload)
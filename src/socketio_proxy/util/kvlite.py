@@ -3,13 +3,16 @@ import aiosqlite
 import msgpack
 import time
 import os
-from typing import Optional, Any, List, Dict
+from typing import Optional, Any, List, Dict, Tuple, Union, AsyncIterator
 from contextlib import asynccontextmanager
+from socketio_proxy.util.kv_codec import get_codec, get_compressor, encode_value, decode_value
 
 class KvLite:
     DEFAULT_NAMESPACE = "__default__"
-    LOCK_POOL_SIZE = 32  # 定长锁池大小
+    READER_MMAP_SIZE = 256 * 1024 * 1024  # 读连接的 mmap 大小 (256MB)
+    READER_CACHE_KB = 16000  # 读连接的页缓存大小 (16MB)
 
+    # 写连接: 负责建表和所有修改操作
     _SQL_SETUP = [
         "PRAGMA journal_mode = WAL;",
         "PRAGMA synchronous = NORMAL;",
@@ -20,6 +23,21 @@ class KvLite:
             value BLOB NOT NULL,
             expire_at REAL,
             PRIMARY KEY (group_name, key)
+        )""",
+        # 流 (stream): 只追加的有序条目，id 全局自增且永不复用
+        """CREATE TABLE IF NOT EXISTS kv_stream (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stream TEXT NOT NULL,
+            value BLOB NOT NULL,
+            created_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_kv_stream_stream_id ON kv_stream (stream, id)",
+        # 消费组在每个流上已确认 (ack) 的位置
+        """CREATE TABLE IF NOT EXISTS kv_stream_group (
+            stream TEXT NOT NULL,
+            group_name TEXT NOT NULL,
+            last_id INTEGER NOT NULL,
+            PRIMARY KEY (stream, group_name)
         )"""
     ]
     _SQL_INSERT = "INSERT OR REPLACE INTO kv_store (group_name, key, value, expire_at) VALUES (?, ?, ?, ?)"
@@ -27,61 +45,112 @@ class KvLite:
     _SQL_SELECT_MULTI_BASE = "SELECT key, value, expire_at FROM kv_store WHERE group_name = ? AND key IN "
     _SQL_DELETE_ONE = "DELETE FROM kv_store WHERE group_name = ? AND key = ?"
     _SQL_DELETE_MULTI_BASE = "DELETE FROM kv_store WHERE group_name = ? AND key IN "
+    _SQL_DELETE_EXPIRED_MULTI_BASE = "DELETE FROM kv_store WHERE group_name = ? AND expire_at IS NOT NULL AND expire_at <= ? AND key IN "
     _SQL_LIST_GROUP = "SELECT key FROM kv_store WHERE group_name = ? AND (expire_at IS NULL OR expire_at > ?)"
+    _SQL_SCAN_ITEMS_BASE = "SELECT key, value FROM kv_store WHERE group_name = ? AND (expire_at IS NULL OR expire_at > ?)"
+    _SQL_COUNT_GROUP_BASE = "SELECT COUNT(*) FROM kv_store WHERE group_name = ? AND (expire_at IS NULL OR expire_at > ?)"
+    _SQL_DELETE_RANGE_BASE = "DELETE FROM kv_store WHERE group_name = ? AND key IN (SELECT key FROM kv_store WHERE group_name = ?"
     _SQL_CLEANUP = "DELETE FROM kv_store WHERE expire_at IS NOT NULL AND expire_at < ?"
     _SQL_SELECT_EXPIRATION = "SELECT expire_at FROM kv_store WHERE group_name = ? AND key = ?"
     _SQL_UPDATE_TTL = "UPDATE kv_store SET expire_at = ? WHERE group_name = ? AND key = ?"
 
-    def __init__(self, db_path: str, pool_size: int = 16):
+    _SQL_XADD = "INSERT INTO kv_stream (stream, value, created_at) VALUES (?, ?, ?)"
+    _SQL_XRANGE_BASE = "SELECT id, value FROM kv_stream WHERE stream = ? AND id >= ?"
+    _SQL_XREAD = "SELECT id, value FROM kv_stream WHERE stream = ? AND id > ? ORDER BY id LIMIT ?"
+    _SQL_XLEN = "SELECT COUNT(*) FROM kv_stream WHERE stream = ?"
+    _SQL_XTRIM_MAXLEN = "DELETE FROM kv_stream WHERE stream = ? AND id <= (SELECT id FROM kv_stream WHERE stream = ? ORDER BY id DESC LIMIT 1 OFFSET ?)"
+    _SQL_XTRIM_AGE = "DELETE FROM kv_stream WHERE stream = ? AND created_at < ?"
+    _SQL_XGROUP_OFFSET = "SELECT last_id FROM kv_stream_group WHERE stream = ? AND group_name = ?"
+    _SQL_XACK = """INSERT INTO kv_stream_group (stream, group_name, last_id) VALUES (?, ?, ?)
+        ON CONFLICT (stream, group_name) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)"""
+
+    def __init__(self, db_path: str, pool_size: int = 16, codec: str = "msgpack",
+                 group_codecs: Optional[Dict[str, str]] = None, compression: Optional[str] = None,
+                 compress_threshold: int = 1024):
         self._db_path = db_path
         self._pool_size = pool_size
+        self._codec = get_codec(codec)
+        self._group_codecs = {name: get_codec(c) for name, c in (group_codecs or {}).items()}
+        self._compressor = get_compressor(compression)
+        self._compress_threshold = compress_threshold
         self._pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
-        self._lock_pool = [asyncio.Lock() for _ in range(self.LOCK_POOL_SIZE)]
+        self._readers: List[aiosqlite.Connection] = []
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._stream_waiters: Dict[str, asyncio.Event] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
 
     @classmethod
-    async def create(cls, db_path: str, pool_size: int = 5, cleanup_interval: Optional[int] = 60):
+    async def create(cls, db_path: str, pool_size: int = 5, cleanup_interval: Optional[int] = 60,
+                     mmap_size: Optional[int] = None, reader_cache_kb: Optional[int] = None,
+                     codec: str = "msgpack", group_codecs: Optional[Dict[str, str]] = None,
+                     compression: Optional[str] = None, compress_threshold: int = 1024):
         """
         工厂方法: 创建并初始化 KvLite 实例。
+        一个专用写连接负责所有修改操作，pool_size 个只读连接负责查询。
+        codec / group_codecs: 实例默认编码和按 group 指定的编码 (msgpack / raw / json)。
+        compression: 可选压缩算法 (zlib / lzma / zstd)，仅对不小于 compress_threshold 字节的值生效。
         """
-        self = cls(db_path, pool_size)
-        
-        # 1. 初始化连接池
-        for i in range(pool_size):
-            try:
-                # 只有第一个连接负责初始化建表
-                is_setup_conn = (i == 0)
+        self = cls(db_path, pool_size, codec, group_codecs, compression, compress_threshold)
+        mmap_size = self.READER_MMAP_SIZE if mmap_size is None else mmap_size
+        reader_cache_kb = self.READER_CACHE_KB if reader_cache_kb is None else reader_cache_kb
+
+        try:
+            # 1. 初始化写连接，负责建表并切换到 WAL 模式
+            self._writer = await aiosqlite.connect(db_path, timeout=10)
+            await self._setup_database(self._writer)
+
+            # 2. 初始化只读连接池 (WAL 模式下读不会阻塞写)
+            for _ in range(max(1, pool_size)):
                 conn = await aiosqlite.connect(db_path, timeout=10)
-                if is_setup_conn:
-                    await self._setup_database(conn)
+                self._readers.append(conn)
+                await self._setup_reader(conn, mmap_size, reader_cache_kb)
                 await self._pool.put(conn)
-            except aiosqlite.Error as e:
-                print(f"Error connecting to database: {e}")
-                # 如果初始化失败，关闭已创建的连接
-                await self.close()
-                raise
-        
-        # 2. 启动定期清理任务
+        except aiosqlite.Error as e:
+            print(f"Error connecting to database: {e}")
+            # 如果初始化失败，关闭已创建的连接
+            await self.close()
+            raise
+
+        # 3. 启动定期清理任务
         if cleanup_interval and cleanup_interval > 0:
             self._cleanup_task = asyncio.create_task(self._periodic_cleanup(cleanup_interval))
-            
+
         return self
 
     async def _setup_database(self, conn: aiosqlite.Connection):
         for statement in self._SQL_SETUP:
             await conn.execute(statement)
         await conn.commit()
-    
+
+    async def _setup_reader(self, conn: aiosqlite.Connection, mmap_size: int, cache_kb: int):
+        await conn.execute("PRAGMA query_only = ON;")
+        await conn.execute(f"PRAGMA mmap_size = {int(mmap_size)};")
+        await conn.execute(f"PRAGMA cache_size = -{int(cache_kb)};")
+
     # 用上下文管理器来处理连接的获取和释放
     @asynccontextmanager
     async def _get_connection(self):
-        """一个上下文管理器，用于安全地从连接池获取和归还连接。"""
+        """一个上下文管理器，用于安全地从只读连接池获取和归还连接。"""
         conn = await self._pool.get()
         try:
             yield conn
         finally:
             await self._pool.put(conn)
 
+    @asynccontextmanager
+    async def _get_writer(self):
+        """
+        一个上下文管理器，独占写连接。
+        所有修改操作 (包括读-改-写) 在锁内完成，出错时回滚未提交的事务。
+        """
+        async with self._writer_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
     async def _periodic_cleanup(self, interval: int):
         """
         定期清理过期的键值对。
@@ -89,59 +158,74 @@ class KvLite:
         while True:
             await asyncio.sleep(interval)
             try:
-                async with self._get_connection() as conn:
+                async with self._get_writer() as conn:
                     await conn.execute(self._SQL_CLEANUP, (time.time(),))
                     await conn.commit()
             except Exception as e:
                 print(f"Error during periodic cleanup: {e}")
 
-    def _serialize(self, value: Any) -> bytes:
-        return msgpack.packb(value, use_bin_type=True)
+    async def _purge_expired(self, namespace: str, keys: List[str]):
+        """
+        通过写连接删除读路径上发现的过期键。
+        只删除仍处于过期状态的行，避免误删其间被重新写入的键。
+        """
+        if not keys:
+            return
+        placeholders = ', '.join('?' for _ in keys)
+        sql = self._SQL_DELETE_EXPIRED_MULTI_BASE + f"({placeholders})"
+        async with self._get_writer() as conn:
+            await conn.execute(sql, [namespace, time.time()] + keys)
+            await conn.commit()
+
+    def set_group_codec(self, group: Optional[str], codec: Optional[str]):
+        """
+        为一个 group 指定编码 (msgpack / raw / json)，传入 None 则恢复使用实例默认编码。
+        只影响之后的写入；已有的行根据自身头部解码，不受影响。
+        """
+        namespace = self._get_namespace(group)
+        if codec is None:
+            self._group_codecs.pop(namespace, None)
+        else:
+            self._group_codecs[namespace] = get_codec(codec)
+
+    def _serialize(self, value: Any, namespace: Optional[str] = None) -> bytes:
+        codec = self._group_codecs.get(namespace, self._codec) if namespace is not None else self._codec
+        return encode_value(value, codec, self._compressor, self._compress_threshold)
 
     def _deserialize(self, value_blob: bytes) -> Any:
-        return msgpack.unpackb(value_blob, raw=False)
+        return decode_value(value_blob)
 
     def _get_namespace(self, group: Optional[str]) -> str:
         return group if group is not None else self.DEFAULT_NAMESPACE
 
-    async def _get_lock_for_namespace(self, namespace: str) -> asyncio.Lock:
-        """
-        根据 namespace 的哈希值确定锁的下标，避免全局锁。
-        """
-        namespace_hash = hash(namespace)
-        lock_index = namespace_hash % self.LOCK_POOL_SIZE
-        return self._lock_pool[lock_index]
-
     async def incr(self, key: str, group: Optional[str] = None, amount: int = 1) -> int:
         """
         原子性地增加一个键的值。如果键不存在，则从 0 开始。
         此操作会保留键原有的过期时间。
         """
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                async with conn.execute(self._SQL_SELECT_ONE, (namespace, key)) as cursor:
-                    row = await cursor.fetchone()
+        async with self._get_writer() as conn:
+            async with conn.execute(self._SQL_SELECT_ONE, (namespace, key)) as cursor:
+                row = await cursor.fetchone()
                 
-                current_num = 0
-                original_expire_at = None
-                if row:
-                    value_blob, expire_at = row
-                    if not expire_at or time.time() < expire_at:
-                        original_expire_at = expire_at
-                        try:
-                            val = self._deserialize(value_blob)
-                            if not isinstance(val, int):
-                                raise TypeError(f"Value for key '{key}' in group '{namespace}' is not an integer")
-                            current_num = val
-                        except (msgpack.exceptions.UnpackException, TypeError):
+            current_num = 0
+            original_expire_at = None
+            if row:
+                value_blob, expire_at = row
+                if not expire_at or time.time() < expire_at:
+                    original_expire_at = expire_at
+                    try:
+                        val = self._deserialize(value_blob)
+                        if not isinstance(val, int):
                             raise TypeError(f"Value for key '{key}' in group '{namespace}' is not an integer")
+                        current_num = val
+                    except (msgpack.exceptions.UnpackException, ValueError, TypeError):
+                        raise TypeError(f"Value for key '{key}' in group '{namespace}' is not an integer")
         
-                new_num = current_num + amount
-                await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(new_num), original_expire_at))
-                await conn.commit()
-                return new_num
+            new_num = current_num + amount
+            await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(new_num, namespace), original_expire_at))
+            await conn.commit()
+            return new_num
 
     async def decr(self, key: str, group: Optional[str] = None, amount: int = 1) -> int:
         """原子性地减少一个键的值。是 incr(..., amount=-amount) 的语法糖。"""
@@ -152,25 +236,23 @@ class KvLite:
         Set If Not Exists. 如果键不存在，则设置它并返回 True。如果键已存在，则什么都不做并返回 False。
         """
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                async with conn.execute(self._SQL_SELECT_EXPIRATION, (namespace, key)) as cursor:
-                    row = await cursor.fetchone()
+        async with self._get_writer() as conn:
+            async with conn.execute(self._SQL_SELECT_EXPIRATION, (namespace, key)) as cursor:
+                row = await cursor.fetchone()
                 
-                key_exists = False
-                if row:
-                    expire_at, = row
-                    if not expire_at or time.time() < expire_at:
-                        key_exists = True
+            key_exists = False
+            if row:
+                expire_at, = row
+                if not expire_at or time.time() < expire_at:
+                    key_exists = True
                 
-                if key_exists:
-                    return False
+            if key_exists:
+                return False
                 
-                expire_at = (time.time() + ttl) if ttl and ttl > 0 else None
-                await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(value), expire_at))
-                await conn.commit()
-                return True
+            expire_at = (time.time() + ttl) if ttl and ttl > 0 else None
+            await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(value, namespace), expire_at))
+            await conn.commit()
+            return True
 
     async def ttl(self, key: str, group: Optional[str] = None) -> int:
         """
@@ -198,35 +280,31 @@ class KvLite:
         返回 True 如果键存在并被更新，否则返回 False。
         """
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
         new_expire_at = time.time() + ttl
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                cursor = await conn.execute(self._SQL_UPDATE_TTL, (new_expire_at, namespace, key))
-                await conn.commit()
-                return cursor.rowcount > 0
+        async with self._get_writer() as conn:
+            cursor = await conn.execute(self._SQL_UPDATE_TTL, (new_expire_at, namespace, key))
+            await conn.commit()
+            return cursor.rowcount > 0
 
     async def getset(self, key: str, value: Any, group: Optional[str] = None, ttl: Optional[int] = None) -> Optional[Any]:
         """
         原子性地设置一个键的新值，并返回它的旧值。如果键不存在，返回 None。
         """
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                async with conn.execute(self._SQL_SELECT_ONE, (namespace, key)) as cursor:
-                    row = await cursor.fetchone()
+        async with self._get_writer() as conn:
+            async with conn.execute(self._SQL_SELECT_ONE, (namespace, key)) as cursor:
+                row = await cursor.fetchone()
                 
-                old_value = None
-                if row:
-                    value_blob, expire_at = row
-                    if not expire_at or time.time() < expire_at:
-                        old_value = self._deserialize(value_blob)
+            old_value = None
+            if row:
+                value_blob, expire_at = row
+                if not expire_at or time.time() < expire_at:
+                    old_value = self._deserialize(value_blob)
                 
-                expire_at = (time.time() + ttl) if ttl and ttl > 0 else None
-                await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(value), expire_at))
-                await conn.commit()
-                return old_value
+            expire_at = (time.time() + ttl) if ttl and ttl > 0 else None
+            await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(value, namespace), expire_at))
+            await conn.commit()
+            return old_value
 
     async def _delete_keys(self, conn: aiosqlite.Connection, namespace: str, keys: List[str]) -> int:
         """在当前事务中删除一个或多个键，返回删除的行数。"""
@@ -245,14 +323,12 @@ class KvLite:
 
     async def set(self, key: str, value: Any, group: Optional[str] = None, ttl: Optional[int] = None):
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
         expire_at = (time.time() + ttl) if ttl and ttl > 0 else None
-        serialized_value = self._serialize(value)
+        serialized_value = self._serialize(value, namespace)
 
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                await conn.execute(self._SQL_INSERT, (namespace, key, serialized_value, expire_at))
-                await conn.commit()
+        async with self._get_writer() as conn:
+            await conn.execute(self._SQL_INSERT, (namespace, key, serialized_value, expire_at))
+            await conn.commit()
 
     async def get(self, key: str, group: Optional[str] = None) -> Optional[Any]:
         namespace = self._get_namespace(group)
@@ -264,12 +340,12 @@ class KvLite:
                 return None
             
             value_blob, expire_at = row
-            if expire_at and time.time() > expire_at:
-                await self._delete_keys(conn, namespace, [key]) # 传入 conn
-                await conn.commit()
-                return None
-            
-            return self._deserialize(value_blob)
+
+        if expire_at and time.time() > expire_at:
+            await self._purge_expired(namespace, [key])
+            return None
+
+        return self._deserialize(value_blob)
 
     async def hset(self, key: str, field: str, value: Any, group: Optional[str] = None) -> int:
         """
@@ -277,31 +353,29 @@ class KvLite:
         返回: 1 如果字段是新创建的，0 如果字段是被覆盖的。
         """
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                async with conn.execute(self._SQL_SELECT_ONE, (namespace, key)) as cursor:
-                    row = await cursor.fetchone()
+        async with self._get_writer() as conn:
+            async with conn.execute(self._SQL_SELECT_ONE, (namespace, key)) as cursor:
+                row = await cursor.fetchone()
 
-                the_hash = {}
-                original_expire_at = None
+            the_hash = {}
+            original_expire_at = None
                 
-                if row:
-                    value_blob, expire_at = row
-                    original_expire_at = expire_at
-                    if not expire_at or time.time() < expire_at:
-                        val = self._deserialize(value_blob)
-                        if not isinstance(val, dict):
-                            raise TypeError(f"Value for key '{key}' in group '{namespace}' is not a hash/dictionary.")
-                        the_hash = val
-
-                is_new_field = field not in the_hash
-                the_hash[field] = value
+            if row:
+                value_blob, expire_at = row
+                original_expire_at = expire_at
+                if not expire_at or time.time() < expire_at:
+                    val = self._deserialize(value_blob)
+                    if not isinstance(val, dict):
+                        raise TypeError(f"Value for key '{key}' in group '{namespace}' is not a hash/dictionary.")
+                    the_hash = val
+
+            is_new_field = field not in the_hash
+            the_hash[field] = value
                 
-                await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(the_hash), original_expire_at))
-                await conn.commit()
+            await conn.execute(self._SQL_INSERT, (namespace, key, self._serialize(the_hash, namespace), original_expire_at))
+            await conn.commit()
                 
-                return 1 if is_new_field else 0
+            return 1 if is_new_field else 0
 
     async def hget(self, key: str, field: str, group: Optional[str] = None) -> Optional[Any]:
         """
@@ -338,16 +412,16 @@ class KvLite:
                 return None
             
             value_blob, expire_at = row
-            if expire_at and time.time() > expire_at:
-                await self._delete_keys(conn, namespace, [key])
-                await conn.commit()
-                return None
-            
-            val = self._deserialize(value_blob)
-            if not isinstance(val, dict):
-                raise TypeError(f"Value for key '{key}' in group '{namespace}' is not a hash/dictionary.")
-            
-            return val
+
+        if expire_at and time.time() > expire_at:
+            await self._purge_expired(namespace, [key])
+            return None
+
+        val = self._deserialize(value_blob)
+        if not isinstance(val, dict):
+            raise TypeError(f"Value for key '{key}' in group '{namespace}' is not a hash/dictionary.")
+
+        return val
 
     async def stats(self) -> Dict[str, Any]:
         """
@@ -379,18 +453,16 @@ class KvLite:
             return
 
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
         expire_at = (time.time() + ttl) if ttl and ttl > 0 else None
 
         data_to_insert = [
-            (namespace, key, self._serialize(value), expire_at)
+            (namespace, key, self._serialize(value, namespace), expire_at)
             for key, value in items.items()
         ]
 
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                await conn.executemany(self._SQL_INSERT, data_to_insert)
-                await conn.commit()
+        async with self._get_writer() as conn:
+            await conn.executemany(self._SQL_INSERT, data_to_insert)
+            await conn.commit()
 
     async def mget(self, keys: List[str], group: Optional[str] = None) -> Dict[str, Any]:
         if not keys:
@@ -412,20 +484,17 @@ class KvLite:
                     else:
                         results[key] = self._deserialize(value_blob)
 
-            if keys_to_delete:
-                await self._delete_keys(conn, namespace, keys_to_delete)
-                await conn.commit()
-            
+        if keys_to_delete:
+            await self._purge_expired(namespace, keys_to_delete)
+
         return results
 
     async def delete(self, key: str, group: Optional[str] = None) -> bool:
         namespace = self._get_namespace(group)
-        namespace_lock = await self._get_lock_for_namespace(namespace)
-        async with namespace_lock:
-            async with self._get_connection() as conn:
-                deleted_count = await self._delete_keys(conn, namespace, [key])
-                await conn.commit()
-                return deleted_count > 0
+        async with self._get_writer() as conn:
+            deleted_count = await self._delete_keys(conn, namespace, [key])
+            await conn.commit()
+            return deleted_count > 0
 
     async def list_group(self, group: Optional[str] = None) -> List[str]:
         namespace = self._get_namespace(group)
@@ -434,9 +503,219 @@ class KvLite:
                 rows = await cursor.fetchall()
                 return [row[0] for row in rows]
 
+    @staticmethod
+    def _prefix_upper_bound(prefix: str) -> Optional[str]:
+        """
+        计算前缀范围的上界 (不含)，使前缀查询可以走 (group_name, key) 主键索引。
+        SQLite 以 UTF-8 字节序比较 TEXT，与码点顺序一致。无上界时返回 None。
+        """
+        chars = list(prefix)
+        while chars:
+            code = ord(chars[-1]) + 1
+            if 0xD800 <= code <= 0xDFFF:
+                code = 0xE000  # 跳过代理区，其无法编码为 UTF-8
+            if code <= 0x10FFFF:
+                chars[-1] = chr(code)
+                return ''.join(chars)
+            chars.pop()
+        return None
+
+    def _key_range_clause(self, prefix: Optional[str], after: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """构造 key 的范围条件，返回 (SQL 片段, 参数)。"""
+        clause = ""
+        params: List[Any] = []
+        if prefix:
+            clause += " AND key >= ?"
+            params.append(prefix)
+            upper = self._prefix_upper_bound(prefix)
+            if upper is not None:
+                clause += " AND key < ?"
+                params.append(upper)
+        if after is not None:
+            clause += " AND key > ?"
+            params.append(after)
+        return clause, params
+
+    async def scan(self, group: Optional[str] = None, prefix: Optional[str] = None, count: int = 500,
+                   cursor: Optional[str] = None, with_values: bool = False) -> AsyncIterator[Union[str, Tuple[str, Any]]]:
+        """
+        按 key 顺序分页遍历一个 group 中未过期的键。
+        每页最多 count 条，页与页之间归还连接，不会长时间占用连接池。
+        cursor: 从该 key 之后 (不含) 开始遍历，可用上次遍历到的最后一个 key 续扫。
+        with_values: 为 True 时产出 (key, value) 元组，否则只产出 key。
+        """
+        if count <= 0:
+            raise ValueError("count must be a positive integer")
+
+        namespace = self._get_namespace(group)
+        base_sql = self._SQL_SCAN_ITEMS_BASE if with_values else self._SQL_LIST_GROUP
+        last_key = cursor
+        while True:
+            clause, params = self._key_range_clause(prefix, last_key)
+            sql = base_sql + clause + " ORDER BY key LIMIT ?"
+            async with self._get_connection() as conn:
+                async with conn.execute(sql, [namespace, time.time()] + params + [count]) as db_cursor:
+                    rows = await db_cursor.fetchall()
+
+            for row in rows:
+                if with_values:
+                    yield row[0], self._deserialize(row[1])
+                else:
+                    yield row[0]
+
+            if len(rows) < count:
+                return
+            last_key = rows[-1][0]
+
+    async def count_group(self, group: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        """
+        统计一个 group 中 (可选: 指定前缀下) 未过期的键数量。
+        """
+        namespace = self._get_namespace(group)
+        clause, params = self._key_range_clause(prefix)
+        async with self._get_connection() as conn:
+            async with conn.execute(self._SQL_COUNT_GROUP_BASE + clause, [namespace, time.time()] + params) as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def delete_prefix(self, prefix: str, group: Optional[str] = None, batch_size: int = 1000) -> int:
+        """
+        删除一个 group 中所有以 prefix 开头的键 (包括已过期的)，返回删除的行数。
+        分批删除，每批单独提交并释放写连接，避免长时间阻塞其他写操作。
+        """
+        if not prefix:
+            raise ValueError("prefix must be a non-empty string")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        namespace = self._get_namespace(group)
+        clause, params = self._key_range_clause(prefix)
+        sql = self._SQL_DELETE_RANGE_BASE + clause + " ORDER BY key LIMIT ?)"
+
+        total_deleted = 0
+        while True:
+            async with self._get_writer() as conn:
+                cursor = await conn.execute(sql, [namespace, namespace] + params + [batch_size])
+                await conn.commit()
+                deleted = cursor.rowcount
+            total_deleted += deleted
+            if deleted < batch_size:
+                return total_deleted
+
+    def _notify_stream(self, stream: str):
+        """唤醒所有在该流上阻塞等待新条目的读者。"""
+        event = self._stream_waiters.pop(stream, None)
+        if event:
+            event.set()
+
+    async def xadd(self, stream: str, value: Any, maxlen: Optional[int] = None) -> int:
+        """
+        向流末尾追加一个条目，返回其自增 id。
+        maxlen: 追加后只保留最新的 maxlen 条。
+        """
+        async with self._get_writer() as conn:
+            cursor = await conn.execute(self._SQL_XADD, (stream, self._serialize(value), time.time()))
+            entry_id = cursor.lastrowid
+            if maxlen is not None and maxlen >= 0:
+                await conn.execute(self._SQL_XTRIM_MAXLEN, (stream, stream, maxlen))
+            await conn.commit()
+
+        self._notify_stream(stream)
+        return entry_id
+
+    async def xrange(self, stream: str, start: int = 0, end: Optional[int] = None, count: int = 100) -> List[Tuple[int, Any]]:
+        """
+        按 id 顺序返回 [start, end] 区间内的条目，最多 count 条。
+        """
+        sql = self._SQL_XRANGE_BASE
+        params: List[Any] = [stream, start]
+        if end is not None:
+            sql += " AND id <= ?"
+            params.append(end)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(count)
+
+        async with self._get_connection() as conn:
+            async with conn.execute(sql, params) as cursor:
+                rows = await cursor.fetchall()
+        return [(entry_id, self._deserialize(value_blob)) for entry_id, value_blob in rows]
+
+    async def _xread_after(self, stream: str, after_id: int, count: int) -> List[Tuple[int, Any]]:
+        async with self._get_connection() as conn:
+            async with conn.execute(self._SQL_XREAD, (stream, after_id, count)) as cursor:
+                rows = await cursor.fetchall()
+        return [(entry_id, self._deserialize(value_blob)) for entry_id, value_blob in rows]
+
+    async def xread(self, stream: str, after_id: int = 0, count: int = 100, block: Optional[float] = None) -> List[Tuple[int, Any]]:
+        """
+        读取 id 大于 after_id 的条目，最多 count 条。
+        block: 没有新条目时最多等待的秒数 (长轮询)，超时返回空列表。
+        """
+        deadline = (time.monotonic() + block) if block and block > 0 else None
+        while True:
+            # 先登记等待者再查询，避免查询与 xadd 之间的通知丢失
+            waiter = self._stream_waiters.setdefault(stream, asyncio.Event()) if deadline else None
+            entries = await self._xread_after(stream, after_id, count)
+            if entries or deadline is None:
+                return entries
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return entries
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return await self._xread_after(stream, after_id, count)
+
+    async def xgroup_offset(self, stream: str, group: str) -> int:
+        """返回消费组在流上最后确认的 id，未确认过时返回 0。"""
+        async with self._get_connection() as conn:
+            async with conn.execute(self._SQL_XGROUP_OFFSET, (stream, group)) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def xreadgroup(self, stream: str, group: str, count: int = 100, block: Optional[float] = None) -> List[Tuple[int, Any]]:
+        """
+        从消费组最后确认的位置之后读取条目。读取不会移动位置，需要调用 xack 确认。
+        """
+        after_id = await self.xgroup_offset(stream, group)
+        return await self.xread(stream, after_id, count, block)
+
+    async def xack(self, stream: str, group: str, entry_id: int) -> int:
+        """
+        确认消费组已处理到 entry_id (含) 为止的所有条目。位置只会前进不会后退。
+        返回确认后的位置。
+        """
+        async with self._get_writer() as conn:
+            await conn.execute(self._SQL_XACK, (stream, group, entry_id))
+            await conn.commit()
+            async with conn.execute(self._SQL_XGROUP_OFFSET, (stream, group)) as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def xlen(self, stream: str) -> int:
+        """返回流中的条目数量。"""
+        async with self._get_connection() as conn:
+            async with conn.execute(self._SQL_XLEN, (stream,)) as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def xtrim(self, stream: str, maxlen: Optional[int] = None, max_age: Optional[float] = None) -> int:
+        """
+        按长度 (只保留最新的 maxlen 条) 和/或按时间 (删除早于 max_age 秒的条目) 裁剪流。
+        返回删除的条目数。
+        """
+        deleted = 0
+        async with self._get_writer() as conn:
+            if maxlen is not None and maxlen >= 0:
+                cursor = await conn.execute(self._SQL_XTRIM_MAXLEN, (stream, stream, maxlen))
+                deleted += cursor.rowcount
+            if max_age is not None:
+                cursor = await conn.execute(self._SQL_XTRIM_AGE, (stream, time.time() - max_age))
+                deleted += cursor.rowcount
+            await conn.commit()
+        return deleted
+
     async def close(self):
         """
-        关闭连接池和清理任务。
+        关闭写连接、只读连接池和清理任务。
         """
         if self._cleanup_task:
             self._cleanup_task.cancel()
@@ -445,9 +724,15 @@ class KvLite:
             except asyncio.CancelledError:
                 pass
             
-        while not self._pool.empty():
-            conn = await self._pool.get()
+        for conn in self._readers:
             await conn.close()
+        self._readers.clear()
+        while not self._pool.empty():
+            self._pool.get_nowait()
+
+        if self._writer:
+            await self._writer.close()
+            self._writer = None
 
     async def __aenter__(self):
         return self
@@ -0,0 +1,62 @@
+"""
+Event-loop lag monitor: measures how late a periodic timer fires, which is
+how long callbacks (event handling, encoding, ...) hold the loop.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from socketio_proxy.config.logging import logger
+
+class LoopLagMonitor:
+    WINDOW = 600
+
+    def __init__(self, interval: float = 0.1, warn_ms: float = 100.0):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.current = 0.0  # seconds, most recent sample
+        self.max = 0.0
+        self.slow = 0       # samples over warn_ms
+        self._samples: Deque[float] = deque(maxlen=self.WINDOW)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            scheduled = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - scheduled - self.interval)
+            self.current = lag
+            self.max = max(self.max, lag)
+            self._samples.append(lag)
+            if lag * 1000 >= self.warn_ms:
+                self.slow += 1
+                if self.slow == 1 or self.slow % 100 == 0:
+                    logger.warning(f"Event loop lag {lag * 1000:.1f}ms ({self.slow} slow sample(s) so far).")
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3) if ordered else 0.0
+        return {
+            "interval_ms": self.interval * 1000,
+            "current_ms": round(self.current * 1000, 3),
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max * 1000, 3),
+            "slow_samples": self.slow,
+            "warn_ms": self.warn_ms,
+            "running": self._task is not None and not self._task.done(),
+        }
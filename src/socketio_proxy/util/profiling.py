@@ -0,0 +1,102 @@
+"""
+On-demand profiling of the running event loop, for POST /admin/profile.
+
+- cprofile: deterministic profile of everything the loop thread runs during
+  the window, reported with pstats.
+- sampling: a background thread samples the loop thread's stack every
+  `interval` seconds; the report lists the hottest functions and the
+  collapsed stacks ("a;b;c count", usable with flamegraph tools).
+  Much lower overhead than cProfile.
+"""
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+MODES = ("cprofile", "sampling")
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is still recording."""
+
+_lock = asyncio.Lock()
+
+async def profile_loop(seconds: float, mode: str = "sampling", limit: int = 50,
+                       interval: float = 0.005, sort: str = "cumulative") -> str:
+    """Profiles the current event loop for `seconds` and returns a text report."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Expected one of: {', '.join(MODES)}")
+    if _lock.locked():
+        raise ProfilerBusyError("A profile is already being recorded")
+    async with _lock:
+        if mode == "cprofile":
+            return await _cprofile(seconds, limit, sort)
+        return await _sample(seconds, limit, interval)
+
+async def _cprofile(seconds: float, limit: int, sort: str) -> str:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_filename}:{code.co_name}"
+
+async def _sample(seconds: float, limit: int, interval: float) -> str:
+    target = threading.get_ident()
+    stacks: Counter = Counter()
+    stop = threading.Event()
+    samples = 0
+
+    def run():
+        nonlocal samples
+        while not stop.wait(interval):
+            frame: Optional[object] = sys._current_frames().get(target)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            stacks[";".join(reversed(names))] += 1
+            samples += 1
+
+    sampler = threading.Thread(target=run, name="loop-sampler", daemon=True)
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        await asyncio.get_running_loop().run_in_executor(None, sampler.join)
+    elapsed = time.perf_counter() - started
+
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        for name in set(frames):
+            total_counts[name] += count
+
+    out = io.StringIO()
+    out.write(f"{samples} samples of the event loop thread over {elapsed:.2f}s (every {interval * 1000:.1f}ms)\n")
+    out.write("Samples in the loop's idle wait (selector) are time the loop was not busy.\n\n")
+    out.write(f"Top {limit} functions by self samples:\n")
+    for name, count in self_counts.most_common(limit):
+        out.write(f"{count:8d} {count * 100 / max(samples, 1):6.2f}%  {name}\n")
+    out.write(f"\nTop {limit} functions by inclusive samples:\n")
+    for name, count in total_counts.most_common(limit):
+        out.write(f"{count:8d} {count * 100 / max(samples, 1):6.2f}%  {name}\n")
+    out.write("\nCollapsed stacks:\n")
+    for stack, count in stacks.most_common():
+        out.write(f"{stack} {count}\n")
+    return out.getvalue()
@@ -0,0 +1,127 @@
+"""
+Per-dispatcher payload projection: keep (``fields``) or drop (``exclude``)
+parts of the ``{"event", "data"}`` message before it is queued and encoded.
+
+Paths are dotted (``data.user.id``) or JSON Pointers (``/data/user~1name``).
+A ``*`` segment matches every element of a list or every value of an object.
+The paths are compiled once into a trie; applying it only copies the
+containers along the projected paths, untouched values are shared.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+_MISSING = object()
+_LEAF = True
+Trie = Dict[str, Union["Trie", bool]]
+
+def parse_path(path: str) -> List[str]:
+    """Splits a dotted path or JSON Pointer into its segments."""
+    if not isinstance(path, str) or not path:
+        raise ValueError(f"Invalid projection path: {path!r}")
+    if path.startswith("/"):
+        segments = [segment.replace("~1", "/").replace("~0", "~") for segment in path[1:].split("/")]
+    else:
+        segments = path.split(".")
+    if any(segment == "" for segment in segments):
+        raise ValueError(f"Invalid projection path: {path!r}")
+    return segments
+
+def _compile(paths: Iterable[str]) -> Trie:
+    trie: Trie = {}
+    for path in paths:
+        node = trie
+        segments = parse_path(path)
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if child is _LEAF:
+                break  # a shorter path already covers this one
+            node = node.setdefault(segment, {})
+        else:
+            node[segments[-1]] = _LEAF
+    return trie
+
+def _pick(value: Any, trie: Trie) -> Any:
+    if isinstance(value, dict):
+        if "*" in trie:
+            return {key: _pick_child(item, trie.get(key, trie["*"])) for key, item in value.items()}
+        result = {}
+        for key, sub in trie.items():
+            if key in value:
+                picked = value[key] if sub is _LEAF else _pick(value[key], sub)
+                if picked is not _MISSING:
+                    result[key] = picked
+        return result
+    if isinstance(value, list) and "*" in trie:
+        return [_pick_child(item, trie["*"]) for item in value]
+    return _MISSING
+
+def _pick_child(value: Any, sub: Union[Trie, bool]) -> Any:
+    if sub is _LEAF:
+        return value
+    picked = _pick(value, sub)
+    return None if picked is _MISSING else picked
+
+def _drop(value: Any, trie: Trie) -> Any:
+    if isinstance(value, dict):
+        result = dict(value)
+        for key, sub in trie.items():
+            keys = list(result) if key == "*" else [key] if key in result else []
+            for name in keys:
+                if sub is _LEAF:
+                    del result[name]
+                else:
+                    result[name] = _drop(result[name], sub)
+        return result
+    if isinstance(value, list) and "*" in trie:
+        sub = trie["*"]
+        return [] if sub is _LEAF else [_drop(item, sub) for item in value]
+    return value
+
+class Projection:
+    """
+    A compiled fields/exclude projection. The "event" key is always kept by
+    ``fields``. The result for the last message is remembered, so dispatchers
+    of one rule that share a projection also share the projected object (and
+    with it the encoding cache in wire_format).
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+        self.fields = list(fields or [])
+        self.exclude = list(exclude or [])
+        self._fields = _compile(["event"] + self.fields) if self.fields else None
+        self._exclude = _compile(self.exclude) if self.exclude else None
+        self._last: Tuple[Any, Any] = (None, None)
+
+    def __call__(self, message: dict) -> dict:
+        last_message, last_result = self._last
+        if message is last_message:
+            return last_result
+        result = message
+        if self._fields is not None:
+            result = _pick(result, self._fields)
+        if self._exclude is not None:
+            result = _drop(result, self._exclude)
+        self._last = (message, result)
+        return result
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    shared: Optional[Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], "Projection"]] = None) -> Optional["Projection"]:
+        """
+        Returns the projection for a dispatcher config, or None if it has no
+        fields/exclude. Projections with the same paths are reused from `shared`.
+        """
+        fields = config.get("fields") or []
+        exclude = config.get("exclude") or []
+        if isinstance(fields, str):
+            fields = [fields]
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        if not fields and not exclude:
+            return None
+        if shared is None:
+            return cls(fields, exclude)
+        key = (tuple(fields), tuple(exclude))
+        projection = shared.get(key)
+        if projection is None:
+            projection = shared[key] = cls(fields, exclude)
+        return projection
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import zlib
+from typing import Optional, Any, List, Dict, Tuple, Union, AsyncIterator
+from socketio_proxy.util.kvlite import KvLite
+
+class ShardedKvLite:
+    """
+    把键按 (group, key) 的哈希分布到 N 个 SQLite 文件上的 KvLite。
+    每个分片都有自己的写连接和 WAL 写锁，不相关的键不会在同一个写锁上排队。
+    接口与 KvLite 一致；mget/mset/stats 等跨分片操作以 scatter-gather 方式并发执行。
+    流 (stream) 整体落在按流名哈希选出的分片上，因此 id 顺序和消费组位置保持不变。
+    """
+    DEFAULT_NAMESPACE = KvLite.DEFAULT_NAMESPACE
+
+    def __init__(self, shards: List[KvLite]):
+        if not shards:
+            raise ValueError("ShardedKvLite requires at least one shard")
+        self._shards = shards
+
+    @staticmethod
+    def shard_paths(db_path: str, shard_count: int) -> List[str]:
+        """
+        由基础路径生成各分片的文件路径，例如 data.db -> data.0.db, data.1.db, ...
+        """
+        root, ext = os.path.splitext(db_path)
+        return [f"{root}.{i}{ext}" for i in range(shard_count)]
+
+    @classmethod
+    async def create(cls, db_path: str, shard_count: int = 4, pool_size: int = 5,
+                     cleanup_interval: Optional[int] = 60, **kwargs):
+        """
+        工厂方法: 创建并初始化所有分片。分片数一旦确定不可更改，否则键会被路由到错误的文件。
+        其余参数原样传给每个分片的 KvLite.create。
+        """
+        if shard_count <= 0:
+            raise ValueError("shard_count must be a positive integer")
+
+        shards: List[KvLite] = []
+        try:
+            for path in cls.shard_paths(db_path, shard_count):
+                shards.append(await KvLite.create(path, pool_size, cleanup_interval, **kwargs))
+        except Exception:
+            for shard in shards:
+                await shard.close()
+            raise
+        return cls(shards)
+
+    @property
+    def shards(self) -> List[KvLite]:
+        return self._shards
+
+    def set_group_codec(self, group: Optional[str], codec: Optional[str]):
+        for shard in self._shards:
+            shard.set_group_codec(group, codec)
+
+    def _get_namespace(self, group: Optional[str]) -> str:
+        return group if group is not None else self.DEFAULT_NAMESPACE
+
+    def _shard_index(self, namespace: str, key: str) -> int:
+        # 使用 crc32 而不是 hash()，保证跨进程、跨重启的路由稳定
+        return zlib.crc32(f"{namespace}\x00{key}".encode("utf-8")) % len(self._shards)
+
+    def _shard_for(self, key: str, group: Optional[str]) -> KvLite:
+        return self._shards[self._shard_index(self._get_namespace(group), key)]
+
+    def _shard_for_stream(self, stream: str) -> KvLite:
+        return self._shards[zlib.crc32(stream.encode("utf-8")) % len(self._shards)]
+
+    def _partition_keys(self, keys: List[str], group: Optional[str]) -> Dict[int, List[str]]:
+        namespace = self._get_namespace(group)
+        partitions: Dict[int, List[str]] = {}
+        for key in keys:
+            partitions.setdefault(self._shard_index(namespace, key), []).append(key)
+        return partitions
+
+    # ---- 单键操作: 直接路由到所在分片 ----
+
+    async def set(self, key: str, value: Any, group: Optional[str] = None, ttl: Optional[int] = None):
+        await self._shard_for(key, group).set(key, value, group, ttl)
+
+    async def get(self, key: str, group: Optional[str] = None) -> Optional[Any]:
+        return await self._shard_for(key, group).get(key, group)
+
+    async def delete(self, key: str, group: Optional[str] = None) -> bool:
+        return await self._shard_for(key, group).delete(key, group)
+
+    async def incr(self, key: str, group: Optional[str] = None, amount: int = 1) -> int:
+        return await self._shard_for(key, group).incr(key, group, amount)
+
+    async def decr(self, key: str, group: Optional[str] = None, amount: int = 1) -> int:
+        return await self._shard_for(key, group).decr(key, group, amount)
+
+    async def setnx(self, key: str, value: Any, group: Optional[str] = None, ttl: Optional[int] = None) -> bool:
+        return await self._shard_for(key, group).setnx(key, value, group, ttl)
+
+    async def ttl(self, key: str, group: Optional[str] = None) -> int:
+        return await self._shard_for(key, group).ttl(key, group)
+
+    async def touch(self, key: str, group: Optional[str] = None, ttl: int = 60) -> bool:
+        return await self._shard_for(key, group).touch(key, group, ttl)
+
+    async def getset(self, key: str, value: Any, group: Optional[str] = None, ttl: Optional[int] = None) -> Optional[Any]:
+        return await self._shard_for(key, group).getset(key, value, group, ttl)
+
+    async def hset(self, key: str, field: str, value: Any, group: Optional[str] = None) -> int:
+        return await self._shard_for(key, group).hset(key, field, value, group)
+
+    async def hget(self, key: str, field: str, group: Optional[str] = None) -> Optional[Any]:
+        return await self._shard_for(key, group).hget(key, field, group)
+
+    async def hgetall(self, key: str, group: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return await self._shard_for(key, group).hgetall(key, group)
+
+    # ---- 多键操作: scatter-gather ----
+
+    async def mset(self, items: Dict[str, Any], group: Optional[str] = None, ttl: Optional[int] = None):
+        if not items:
+            return
+        partitions = self._partition_keys(list(items), group)
+        await asyncio.gather(*(
+            self._shards[index].mset({key: items[key] for key in keys}, group, ttl)
+            for index, keys in partitions.items()
+        ))
+
+    async def mget(self, keys: List[str], group: Optional[str] = None) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        partitions = self._partition_keys(keys, group)
+        partial_results = await asyncio.gather(*(
+            self._shards[index].mget(shard_keys, group)
+            for index, shard_keys in partitions.items()
+        ))
+        results: Dict[str, Any] = {}
+        for partial in partial_results:
+            results.update(partial)
+        return results
+
+    async def list_group(self, group: Optional[str] = None) -> List[str]:
+        partial_results = await asyncio.gather(*(shard.list_group(group) for shard in self._shards))
+        return sorted(key for partial in partial_results for key in partial)
+
+    async def count_group(self, group: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        counts = await asyncio.gather(*(shard.count_group(group, prefix) for shard in self._shards))
+        return sum(counts)
+
+    async def delete_prefix(self, prefix: str, group: Optional[str] = None, batch_size: int = 1000) -> int:
+        counts = await asyncio.gather(*(shard.delete_prefix(prefix, group, batch_size) for shard in self._shards))
+        return sum(counts)
+
+    async def scan(self, group: Optional[str] = None, prefix: Optional[str] = None, count: int = 500,
+                   cursor: Optional[str] = None, with_values: bool = False) -> AsyncIterator[Union[str, Tuple[str, Any]]]:
+        """
+        跨分片按 key 顺序遍历，对各分片的有序结果做 k 路归并。
+        """
+        iterators = [shard.scan(group, prefix, count, cursor, with_values).__aiter__() for shard in self._shards]
+        heads: Dict[int, Union[str, Tuple[str, Any]]] = {}
+
+        async def advance(index: int):
+            try:
+                heads[index] = await iterators[index].__anext__()
+            except StopAsyncIteration:
+                heads.pop(index, None)
+
+        await asyncio.gather(*(advance(i) for i in range(len(iterators))))
+        while heads:
+            index = min(heads, key=lambda i: heads[i][0] if with_values else heads[i])
+            yield heads[index]
+            await advance(index)
+
+    async def stats(self) -> Dict[str, Any]:
+        shard_stats = await asyncio.gather(*(shard.stats() for shard in self._shards))
+        keys_per_group: Dict[str, int] = {}
+        for stats in shard_stats:
+            for group_name, count in stats["keys_per_group"].items():
+                keys_per_group[group_name] = keys_per_group.get(group_name, 0) + count
+
+        disk_usages = [stats["disk_usage_bytes"] for stats in shard_stats]
+        return {
+            "total_keys": sum(stats["total_keys"] for stats in shard_stats),
+            "keys_per_group": keys_per_group,
+            "disk_usage_bytes": -1 if -1 in disk_usages else sum(disk_usages),
+            "shards": shard_stats
+        }
+
+    # ---- 流: 整个流位于同一个分片 ----
+
+    async def xadd(self, stream: str, value: Any, maxlen: Optional[int] = None) -> int:
+        return await self._shard_for_stream(stream).xadd(stream, value, maxlen)
+
+    async def xrange(self, stream: str, start: int = 0, end: Optional[int] = None, count: int = 100) -> List[Tuple[int, Any]]:
+        return await self._shard_for_stream(stream).xrange(stream, start, end, count)
+
+    async def xread(self, stream: str, after_id: int = 0, count: int = 100, block: Optional[float] = None) -> List[Tuple[int, Any]]:
+        return await self._shard_for_stream(stream).xread(stream, after_id, count, block)
+
+    async def xgroup_offset(self, stream: str, group: str) -> int:
+        return await self._shard_for_stream(stream).xgroup_offset(stream, group)
+
+    async def xreadgroup(self, stream: str, group: str, count: int = 100, block: Optional[float] = None) -> List[Tuple[int, Any]]:
+        return await self._shard_for_stream(stream).xreadgroup(stream, group, count, block)
+
+    async def xack(self, stream: str, group: str, entry_id: int) -> int:
+        return await self._shard_for_stream(stream).xack(stream, group, entry_id)
+
+    async def xlen(self, stream: str) -> int:
+        return await self._shard_for_stream(stream).xlen(stream)
+
+    async def xtrim(self, stream: str, maxlen: Optional[int] = None, max_age: Optional[float] = None) -> int:
+        return await self._shard_for_stream(stream).xtrim(stream, maxlen, max_age)
+
+    async def close(self):
+        """
+        关闭所有分片。
+        """
+        await asyncio.gather(*(shard.close() for shard in self._shards))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,241 @@
+"""
+Single-writer, multi-reader ring buffer in a memory-mapped file.
+
+The proxy writes each event once; any number of local processes map the same
+file and read at their own offsets. Only the standard library is used, so this
+module can be copied into consumer projects as-is.
+
+File layout (little endian):
+- Header (HEADER_SIZE bytes): magic, version, epoch, capacity, tail_pos,
+  write_pos, last_seq. Positions are logical byte offsets that only grow; the
+  physical offset in the data area is ``pos % capacity``.
+- Data area: records ``(length: u32, seq: u64, payload)`` padded to 8 bytes.
+  A record that would cross the end of the data area is preceded by a padding
+  marker (or, if not even a record header fits, an implicit skip) and written
+  at the start instead.
+
+The writer advances ``tail_pos`` (oldest intact record) before overwriting old
+data and publishes ``write_pos`` after a record is complete. Readers re-check
+``tail_pos`` after copying a record to detect that it was overwritten meanwhile
+(overrun), in which case they resynchronise to the tail and report the loss.
+"""
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, List, Optional, Tuple
+
+MAGIC = b"SIORING1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQQ")  # magic, version, reserved, epoch, capacity, tail_pos, write_pos, last_seq
+HEADER_SIZE = 64
+RECORD_HEADER = struct.Struct("<IQ")  # payload length, seq
+PAD_MARKER = 0xFFFFFFFF
+ALIGN = 8
+
+# The header fields that change while running (tail_pos, write_pos, last_seq)
+# start at this offset. They are accessed through a native 'Q' memoryview:
+# struct.pack_into zero-fills its target before packing, so a concurrent
+# reader could observe 0, while a memoryview item assignment is a single
+# aligned 8-byte store. The ring is host-local (little endian).
+_FIELDS_OFFSET = 32
+_TAIL, _WRITE, _SEQ = 0, 1, 2
+
+def _fields(mm: mmap.mmap) -> memoryview:
+    return memoryview(mm)[_FIELDS_OFFSET:_FIELDS_OFFSET + 24].cast("Q")
+
+def _aligned(size: int) -> int:
+    return (size + ALIGN - 1) & ~(ALIGN - 1)
+
+class RingWriter:
+    """Appends records to the ring. Only one writer may use a file at a time."""
+
+    def __init__(self, path: str, capacity: int = 64 * 1024 * 1024):
+        self.path = path
+        self.capacity = _aligned(capacity)
+        self.epoch = time.time_ns()
+        self.tail_pos = 0
+        self.write_pos = 0
+        self.last_seq = 0
+
+        # Reuse the same inode when the file exists, so readers that still
+        # have it mapped notice the new epoch instead of reading a dead file.
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, HEADER_SIZE + self.capacity)
+            self._mm = mmap.mmap(fd, HEADER_SIZE + self.capacity)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, 0, self.epoch, self.capacity, 0, 0, 0)
+        self._fields = _fields(self._mm)
+
+    @property
+    def max_record_size(self) -> int:
+        return self.capacity // 2 - RECORD_HEADER.size
+
+    def _record_size_at(self, pos: int) -> int:
+        """Logical size of the record (or skip) starting at pos, read from the ring itself."""
+        offset = pos % self.capacity
+        if self.capacity - offset < RECORD_HEADER.size:
+            return self.capacity - offset
+        length, _ = RECORD_HEADER.unpack_from(self._mm, HEADER_SIZE + offset)
+        if length == PAD_MARKER:
+            return self.capacity - offset
+        return _aligned(RECORD_HEADER.size + length)
+
+    def write(self, payload: bytes) -> int:
+        """Appends one record and returns its sequence number."""
+        if len(payload) > self.max_record_size:
+            raise ValueError(f"Record of {len(payload)} bytes exceeds the ring's limit of {self.max_record_size}")
+
+        pos = self.write_pos
+        offset = pos % self.capacity
+        size = _aligned(RECORD_HEADER.size + len(payload))
+        skip = 0
+        if self.capacity - offset < size:
+            skip = self.capacity - offset  # wrap to the start of the data area
+        end = pos + skip + size
+
+        # Release everything that this write will overwrite before touching it.
+        while self.tail_pos < end - self.capacity:
+            self.tail_pos += self._record_size_at(self.tail_pos)
+        self._fields[_TAIL] = self.tail_pos
+
+        if skip >= RECORD_HEADER.size:
+            RECORD_HEADER.pack_into(self._mm, HEADER_SIZE + offset, PAD_MARKER, 0)
+        start = HEADER_SIZE + (pos + skip) % self.capacity
+        seq = self.last_seq + 1
+        RECORD_HEADER.pack_into(self._mm, start, len(payload), seq)
+        self._mm[start + RECORD_HEADER.size:start + RECORD_HEADER.size + len(payload)] = payload
+
+        # Publish: readers only look at records below write_pos.
+        self.write_pos = end
+        self.last_seq = seq
+        self._fields[_SEQ] = seq
+        self._fields[_WRITE] = end
+        return seq
+
+    def close(self):
+        self._fields.release()
+        self._mm.close()
+
+class RingReader:
+    """
+    Reads records from a ring written by RingWriter, at this reader's own pace.
+    start="latest" begins with the next record written, "earliest" with the
+    oldest record still in the ring.
+    """
+
+    def __init__(self, path: str, start: str = "latest"):
+        if start not in ("latest", "earliest"):
+            raise ValueError("start must be 'latest' or 'earliest'")
+        self.path = path
+        self.start = start
+        self.lost = 0      # records skipped because they were overwritten before being read
+        self.overruns = 0  # number of times the reader fell behind the writer
+        self.resets = 0    # number of times the writer recreated the ring
+        self._mm: Optional[mmap.mmap] = None
+        self._fields: Optional[memoryview] = None
+        self._open()
+
+    def _open(self):
+        self.close()
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._fields = _fields(self._mm)
+        magic, version, _, self.epoch, self.capacity, _, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{self.path}' is not a version {VERSION} event ring")
+        # The writer publishes last_seq before write_pos, so reading them in the
+        # opposite order can only overestimate next_seq, never report false losses.
+        if self.start == "earliest":
+            self.pos = self._fields[_TAIL]
+            self.next_seq: Optional[int] = None
+        else:
+            self.pos = self._fields[_WRITE]
+            self.next_seq = self._fields[_SEQ] + 1
+
+    def _seq_at(self, pos: int) -> int:
+        offset = pos % self.capacity
+        if self.capacity - offset < RECORD_HEADER.size:
+            return self._seq_at(pos + self.capacity - offset)
+        length, seq = RECORD_HEADER.unpack_from(self._mm, HEADER_SIZE + offset)
+        if length == PAD_MARKER:
+            return self._seq_at(pos + self.capacity - offset)
+        return seq
+
+    def _resync(self):
+        """Jumps to the oldest intact record after falling behind the writer."""
+        while True:
+            tail = self._fields[_TAIL]
+            if tail >= self._fields[_WRITE]:
+                # The writer has just wrapped and no complete record is left, so the
+                # header at tail is stale. Losses are counted when the next record is read.
+                self.overruns += 1
+                self.pos = tail
+                return
+            seq = self._seq_at(tail)
+            if self._fields[_TAIL] == tail:
+                break
+        self.overruns += 1
+        if self.next_seq is not None:
+            self.lost += max(0, seq - self.next_seq)
+        self.pos = tail
+        self.next_seq = seq
+
+    def read(self, max_records: int = 1000) -> Tuple[List[Tuple[int, bytes]], int]:
+        """
+        Returns up to max_records ``(seq, payload)`` records that are available
+        now, and how many records were lost to overruns during this call.
+        """
+        if HEADER.unpack_from(self._mm, 0)[3] != self.epoch:
+            self.resets += 1
+            self._open()
+
+        lost_before = self.lost
+        records: List[Tuple[int, bytes]] = []
+        write_pos = self._fields[_WRITE]
+        while self.pos < write_pos and len(records) < max_records:
+            if self.pos < self._fields[_TAIL]:
+                self._resync()
+                continue
+            offset = self.pos % self.capacity
+            if self.capacity - offset < RECORD_HEADER.size:
+                self.pos += self.capacity - offset
+                continue
+            length, seq = RECORD_HEADER.unpack_from(self._mm, HEADER_SIZE + offset)
+            if length == PAD_MARKER:
+                self.pos += self.capacity - offset
+                continue
+            start = HEADER_SIZE + offset + RECORD_HEADER.size
+            payload = self._mm[start:start + length] if length <= self.capacity else b""
+            # The record is only valid if the writer did not reclaim it while we were copying.
+            if self.pos < self._fields[_TAIL]:
+                self._resync()
+                continue
+            if self.next_seq is not None and seq > self.next_seq:
+                self.lost += seq - self.next_seq
+            records.append((seq, payload))
+            self.pos += _aligned(RECORD_HEADER.size + length)
+            self.next_seq = seq + 1
+        return records, self.lost - lost_before
+
+    def follow(self, poll_interval: float = 0.005, max_records: int = 1000) -> Iterator[Tuple[int, bytes]]:
+        """Yields records forever, polling the ring when it has nothing new."""
+        while True:
+            records, _ = self.read(max_records)
+            if not records:
+                time.sleep(poll_interval)
+            yield from records
+
+    def lag(self) -> int:
+        """Bytes written to the ring that this reader has not consumed yet."""
+        return self._fields[_WRITE] - self.pos
+
+    def close(self):
+        if self._fields is not None:
+            self._fields.release()
+            self._fields = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
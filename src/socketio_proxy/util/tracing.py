@@ -0,0 +1,134 @@
+"""
+Sampled per-event latency traces.
+
+SocketIOClient.catch_all starts a trace for a sampled fraction of incoming
+events. The trace travels with the event in a context variable (and inside
+delivery lanes, next to the queued message), and each stage records how long
+it took with ``span(stage)``. Recent traces are kept in a bounded buffer and
+served by GET /debug/traces.
+"""
+import contextlib
+import itertools
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+class Trace:
+    """Timings of one event. Repeated stages (e.g. matching against several rules) are summed."""
+    __slots__ = ("id", "event", "ts", "start", "stages")
+
+    def __init__(self, trace_id: int, event: str):
+        self.id = trace_id
+        self.event = event
+        self.ts = time.time()
+        self.start = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}  # stage -> [offset_s, duration_s, count]
+
+    def add(self, stage: str, started: float, duration: float):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [started - self.start, duration, 1]
+        else:
+            entry[1] += duration
+            entry[2] += 1
+
+    @contextlib.contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, started, time.perf_counter() - started)
+
+    @property
+    def total(self) -> float:
+        return max((offset + duration for offset, duration, _ in self.stages.values()), default=0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "event": self.event,
+            "ts": self.ts,
+            "total_ms": round(self.total * 1000, 3),
+            "stages": [
+                {"stage": stage, "offset_ms": round(offset * 1000, 3), "ms": round(duration * 1000, 3), "count": count}
+                for stage, (offset, duration, count) in sorted(self.stages.items(), key=lambda item: item[1][0])
+            ],
+        }
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_NO_SPAN = contextlib.nullcontext()
+
+def span(stage: str):
+    """Times a stage of the current event if it is being traced; a no-op otherwise."""
+    trace = current_trace.get()
+    return trace.span(stage) if trace is not None else _NO_SPAN
+
+class Tracer:
+    def __init__(self, sample_rate: float = 0.01, buffer_size: int = 500):
+        self.sample_rate = sample_rate
+        self.traces: Deque[Trace] = deque(maxlen=buffer_size)
+        self.sampled = 0
+        self._ids = itertools.count(1)
+
+    def configure(self, sample_rate: Optional[float] = None, buffer_size: Optional[int] = None):
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+        if buffer_size is not None and buffer_size != self.traces.maxlen:
+            self.traces = deque(self.traces, maxlen=buffer_size)
+
+    @contextlib.contextmanager
+    def trace(self, event: str) -> Iterator[Optional[Trace]]:
+        """Starts a trace for this event if it is sampled and makes it current for the block."""
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace(next(self._ids), event)
+        self.sampled += 1
+        self.traces.append(trace)
+        token = current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            current_trace.reset(token)
+
+    def recent(self, limit: int = 100, event: Optional[str] = None, min_ms: float = 0.0) -> List[Dict[str, Any]]:
+        """Most recent traces first, optionally filtered by event name and total duration."""
+        result = []
+        for trace in reversed(self.traces):
+            if event is not None and trace.event != event:
+                continue
+            if trace.total * 1000 < min_ms:
+                continue
+            result.append(trace.to_dict())
+            if len(result) >= limit:
+                break
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """p50 / p99 / max duration (ms) of each stage over the buffered traces."""
+        durations: Dict[str, List[float]] = {}
+        for trace in list(self.traces):
+            for stage, (_, duration, _) in trace.stages.items():
+                durations.setdefault(stage, []).append(duration * 1000)
+        summary = {}
+        for stage, values in durations.items():
+            values.sort()
+            summary[stage] = {
+                "count": len(values),
+                "p50": round(values[len(values) // 2], 3),
+                "p99": round(values[min(len(values) - 1, int(0.99 * len(values)))], 3),
+                "max": round(values[-1], 3),
+            }
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sample_rate": self.sample_rate, "buffer_size": self.traces.maxlen,
+                "buffered": len(self.traces), "sampled": self.sampled}
+
+# Process-wide tracer, configured from proxy settings by SocketIOProxyBuilder.
+tracer = Tracer()
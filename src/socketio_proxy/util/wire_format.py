@@ -0,0 +1,86 @@
+"""
+Wire formats for dispatched events: JSON, MessagePack and (optionally) CBOR.
+
+A rule hands the same message object to each of its dispatchers, so
+``encode()`` keeps the encodings of recent messages and every format is
+produced at most once per event, however many sinks ask for it.
+"""
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+import msgpack
+from socketio_proxy.util.tracing import span
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+class WireFormat(NamedTuple):
+    name: str
+    content_type: str
+    binary: bool  # sent as a binary WebSocket frame / written in binary mode
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+def _encode_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+def _encode_cbor(value: Any) -> bytes:
+    return cbor2.dumps(value)
+
+def _decode_cbor(data: bytes) -> Any:
+    return cbor2.loads(data)
+
+FORMATS: Dict[str, WireFormat] = {
+    "json": WireFormat("json", "application/json", False, _encode_json, json.loads),
+    "msgpack": WireFormat("msgpack", "application/msgpack", True,
+                          lambda value: msgpack.packb(value, use_bin_type=True),
+                          lambda data: msgpack.unpackb(data, raw=False)),
+    "cbor": WireFormat("cbor", "application/cbor", True, _encode_cbor, _decode_cbor),
+}
+
+def get_format(name: str) -> WireFormat:
+    wire_format = FORMATS.get(name or "json")
+    if not wire_format:
+        raise ValueError(f"Unknown format: '{name}'. Available: {', '.join(FORMATS)}")
+    if wire_format.name == "cbor" and cbor2 is None:
+        raise ValueError("cbor format requires the 'cbor2' package")
+    return wire_format
+
+# id(message) -> (message, {format name: bytes}). The message itself is kept so
+# its id cannot be reused by another object while the entry exists. Bounded by
+# entry count and by the total size of the encodings, so large (binary)
+# payloads are not kept alive long after delivery.
+_CACHE_SIZE = 1024
+_CACHE_MAX_BYTES = 8 * 1024 * 1024
+_cache: "OrderedDict[int, Tuple[Any, Dict[str, bytes]]]" = OrderedDict()
+_cache_bytes = 0
+
+def _evict(entry: Tuple[Any, Dict[str, bytes]]):
+    global _cache_bytes
+    _cache_bytes -= sum(len(data) for data in entry[1].values())
+
+def encode(message: Any, wire_format: WireFormat) -> bytes:
+    """Encodes message, reusing the result if another sink already encoded this message object."""
+    global _cache_bytes
+    key = id(message)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] is not message:
+        _evict(_cache.pop(key))
+        entry = None
+    if entry is not None:
+        data = entry[1].get(wire_format.name)
+        if data is not None:
+            return data
+    with span(f"encode:{wire_format.name}"):
+        data = wire_format.encode(message)
+    if len(data) > _CACHE_MAX_BYTES:
+        return data
+    if entry is None:
+        entry = _cache[key] = (message, {})
+    entry[1][wire_format.name] = data
+    _cache_bytes += len(data)
+    while _cache and (len(_cache) > _CACHE_SIZE or _cache_bytes > _CACHE_MAX_BYTES):
+        _evict(_cache.popitem(last=False)[1])
+    return data
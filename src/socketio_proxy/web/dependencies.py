@@ -5,7 +5,7 @@ This module provides a global context (`app_context`) that holds shared
 instances of services like the SocketIOClient, WebSocketManager, etc.,
 which are primarily used by the web routes and plugins.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Awaitable, Callable
 from socketio_proxy.core.socketio_client import SocketIOClient
 from socketio_proxy.web.websocket_manager import WebSocketManager
 
@@ -20,6 +20,11 @@ class AppContext:
             cls._instance = super(AppContext, cls).__new__(cls)
             cls._instance.sio_client: Optional[SocketIOClient] = None
             cls._instance.websocket_manager: Optional[WebSocketManager] = None
+            cls._instance.event_stores: Dict[str, Any] = {}
+            cls._instance.sse_manager: Optional[Any] = None
+            cls._instance.event_handler_manager: Optional[Any] = None
+            cls._instance.config_reloader: Optional[Callable[[], Awaitable[dict]]] = None
+            cls._instance.loop_monitor: Optional[Any] = None
             cls._instance.custom_data: Dict[str, Any] = {}
         return cls._instance
 
@@ -43,6 +48,46 @@ class AppContext:
             raise RuntimeError("WebSocketManager has not been initialized in the app context.")
         return self.websocket_manager
     
+    def set_sse_manager(self, manager: Any):
+        """Registers the SseManager instance."""
+        self.sse_manager = manager
+
+    def get_sse_manager(self) -> Optional[Any]:
+        """Retrieves the SseManager instance, or None if SSE is not set up."""
+        return self.sse_manager
+
+    def set_event_handler_manager(self, manager: Any):
+        """Registers the EventHandlerManager instance."""
+        self.event_handler_manager = manager
+
+    def get_event_handler_manager(self) -> Optional[Any]:
+        """Retrieves the EventHandlerManager instance, or None if it is not set up."""
+        return self.event_handler_manager
+
+    def set_config_reloader(self, reloader: Callable[[], Awaitable[dict]]):
+        """Registers the coroutine function that reloads dispatch rules from the config file."""
+        self.config_reloader = reloader
+
+    def get_config_reloader(self) -> Optional[Callable[[], Awaitable[dict]]]:
+        """Retrieves the config reloader, or None if the proxy was not built from a config file."""
+        return self.config_reloader
+
+    def set_loop_monitor(self, monitor: Any):
+        """Registers the LoopLagMonitor instance."""
+        self.loop_monitor = monitor
+
+    def get_loop_monitor(self) -> Optional[Any]:
+        """Retrieves the LoopLagMonitor instance, or None if it is not set up."""
+        return self.loop_monitor
+
+    def register_event_store(self, name: str, store: Any):
+        """Registers an EventStore so the query route can find it by name."""
+        self.event_stores[name] = store
+
+    def get_event_store(self, name: str) -> Optional[Any]:
+        """Retrieves a registered EventStore, or None if there is none by that name."""
+        return self.event_stores.get(name)
+
     def set_custom_data(self, key: str, value: Any):
         """Stores custom data in the context."""
         self.custom_data[key] = value
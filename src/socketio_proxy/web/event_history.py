@@ -0,0 +1,82 @@
+from collections import deque
+from itertools import islice
+from typing import Deque, List, Optional, Tuple, Union
+
+Frame = Union[str, bytes]
+
+class EventHistory:
+    """
+    Bounded ring buffer of recently broadcast events.
+    Frames are stored pre-encoded (JSON text, or bytes for binary events)
+    together with a monotonically increasing sequence number, so backfill
+    and resume requests only copy references.
+    """
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._frames: Deque[Tuple[int, str, Frame]] = deque()
+        self._size = 0
+        self._last_seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest retained frame, or last_seq + 1 when empty."""
+        return self._frames[0][0] if self._frames else self._last_seq + 1
+
+    def next_seq(self) -> int:
+        self._last_seq += 1
+        return self._last_seq
+
+    def record(self, seq: int, frame: Frame, event: str = ""):
+        """
+        Appends a frame numbered elsewhere (a web worker replicating the ingest
+        process). Sequence numbers must stay contiguous, so after a gap the
+        retained frames are discarded; clients resuming from before it see gap=true.
+        """
+        if seq != self._last_seq + 1 and self._frames:
+            self._frames.clear()
+            self._size = 0
+        self._last_seq = seq
+        self.append(seq, frame, event)
+
+    def append(self, seq: int, frame: Frame, event: str = ""):
+        if self.max_entries <= 0:
+            return
+        self._frames.append((seq, event, frame))
+        self._size += len(frame)
+        while self._frames and (len(self._frames) > self.max_entries or self._size > self.max_bytes):
+            _, _, dropped = self._frames.popleft()
+            self._size -= len(dropped)
+
+    def last(self, count: int) -> List[Frame]:
+        """Returns the most recent `count` frames, oldest first."""
+        if count <= 0:
+            return []
+        start = max(0, len(self._frames) - count)
+        return [frame for _, _, frame in islice(self._frames, start, None)]
+
+    def since(self, seq: int, limit: Optional[int] = None) -> Tuple[List[Tuple[int, str, Frame]], bool]:
+        """
+        Returns (seq, event, frame) entries with a sequence number greater than
+        `seq`, oldest first, and whether entries between `seq` and the oldest
+        retained one were lost.
+        """
+        gap = seq + 1 < self.first_seq and seq < self._last_seq
+        # Sequence numbers are contiguous, so the start position can be computed directly.
+        start = max(0, seq + 1 - self.first_seq)
+        stop = start + limit if limit is not None else None
+        return list(islice(self._frames, start, stop)), gap
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._frames),
+            "bytes": self._size,
+            "first_seq": self.first_seq,
+            "last_seq": self._last_seq,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
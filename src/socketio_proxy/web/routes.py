@@ -1,15 +1,25 @@
 """
 Defines the FastAPI application and its routes.
 """
-from fastapi import FastAPI, Request, HTTPException, APIRouter, WebSocket
+from fastapi import FastAPI, Request, HTTPException, APIRouter, WebSocket, Header
+from fastapi.responses import Response, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import socketio
 import json
+import asyncio
+import time
+from datetime import datetime
 from socketio_proxy.config.logging import logger
-from typing import List
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
-from socketio_proxy.core.socketio_client import SocketIOClient
+from socketio_proxy.core.socketio_client import SocketIOClient, CallCapacityError
+from socketio_proxy.core.emit_scheduler import EmitQueueFullError
+from socketio_proxy.web.dependencies import app_context
+from socketio_proxy.util.binary import binary_frame_to_json
+from socketio_proxy.util.wire_format import get_format
+from socketio_proxy.util.tracing import tracer
+from socketio_proxy.util.profiling import profile_loop, ProfilerBusyError
 
 import importlib.resources
 
@@ -21,6 +31,55 @@ except (ImportError, AttributeError):
 
 templates_dir = resources_path / 'templates'
 static_dir = resources_path / 'static'
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+async def _iter_batch_items(request: Request) -> AsyncIterator[Any]:
+    """
+    Yields raw items from a batch body: either a JSON array, or NDJSON parsed
+    line by line as the body streams in. Lines that are not valid JSON are
+    yielded as the exception so they get a per-item error result.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in NDJSON_MEDIA_TYPES:
+        try:
+            items = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body.")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Batch body must be a JSON array or NDJSON.")
+        for item in items:
+            yield item
+        return
+
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield e
+    if buffer.strip():
+        try:
+            yield json.loads(buffer)
+        except ValueError as e:
+            yield e
+
+def _parse_time(value: Optional[str], name: str) -> Optional[float]:
+    """Accepts epoch seconds or an ISO 8601 timestamp."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}': expected epoch seconds or ISO 8601 time.")
  
 def create_app(sio_client: SocketIOClient, base_url: str = "", websocket_manager=None, external_routers: List[APIRouter] = None):
     app = FastAPI()
@@ -34,9 +93,18 @@ def create_app(sio_client: SocketIOClient, base_url: str = "", websocket_manager
         return templates.TemplateResponse("index.html", {"request": request, "base_url": base_url})
 
     @router.websocket("/ws")
-    async def websocket_endpoint(websocket: WebSocket):
-        await websocket_manager.connect(websocket)
+    async def websocket_endpoint(websocket: WebSocket, backfill: Optional[int] = None, since: Optional[int] = None,
+                                 format: str = "json", compress: Optional[str] = None):
         try:
+            wire_format = get_format(format)
+            if compress not in (None, "deflate"):
+                raise ValueError(f"Unknown compression: '{compress}'. Available: deflate")
+        except ValueError as e:
+            await websocket.close(code=1003, reason=str(e))
+            return
+        try:
+            await websocket_manager.connect(websocket, backfill=backfill, since=since, wire_format=wire_format,
+                                            compress=compress is not None)
             while True:
                 await websocket.receive_text()
         except Exception as e:
@@ -44,10 +112,62 @@ def create_app(sio_client: SocketIOClient, base_url: str = "", websocket_manager
         finally:
             websocket_manager.disconnect(websocket)
 
+    @router.get("/ws/stats")
+    async def websocket_stats():
+        """Connected /ws clients, history usage and the shared frame compression ratio."""
+        return websocket_manager.stats()
+
+    @router.get("/events")
+    async def recent_events(since: int = 0, limit: Optional[int] = None):
+        """
+        Returns buffered events with seq > since, oldest first.
+        "gap" is true when events after `since` have already left the buffer.
+        """
+        if limit is not None and limit <= 0:
+            raise HTTPException(status_code=400, detail="'limit' must be a positive integer.")
+        history = websocket_manager.history
+        frames, gap = history.since(since, limit)
+        next_seq = frames[-1][0] if frames else max(since, history.first_seq - 1)
+        # Frames are already JSON-encoded; splice them instead of decoding and re-encoding.
+        # Binary frames are the exception and are converted with base64 attachments.
+        encoded = (binary_frame_to_json(frame) if isinstance(frame, bytes) else frame for _, _, frame in frames)
+        body = (f'{{"events":[{",".join(encoded)}],'
+                f'"next":{next_seq},"last_seq":{history.last_seq},"gap":{json.dumps(gap)}}}')
+        return Response(content=body, media_type="application/json")
+
+    @router.get("/stream")
+    async def event_stream(events: Optional[str] = None, last_event_id: Optional[int] = None,
+                           last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")):
+        """
+        Streams published events as Server-Sent Events.
+        `events` is an optional comma-separated list of event names to receive.
+        Reconnecting clients resume after the Last-Event-ID header (or the
+        `last_event_id` query parameter) from the recent event history.
+        """
+        sse_manager = app_context.get_sse_manager()
+        if not sse_manager:
+            raise HTTPException(status_code=404, detail="SSE streaming is not enabled.")
+
+        resume_from = last_event_id
+        if last_event_id_header:
+            try:
+                resume_from = int(last_event_id_header)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid Last-Event-ID header.")
+
+        event_filter = {name.strip() for name in events.split(",") if name.strip()} if events else None
+        return StreamingResponse(
+            sse_manager.stream(event_filter, resume_from),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
     @router.post("/send_message")
     async def send_message(request: Request):
         """
-        Receives a message via HTTP POST and emits it to the Socket.IO server.
+        Receives a message via HTTP POST and emits it to the Socket.IO server
+        through the outbound scheduler. Optional body fields: "priority"
+        (high / normal / low) and "coalesce_key".
         """
         if not sio_client.client.connected:
             raise HTTPException(status_code=503, detail="Socket.IO client is not connected.")
@@ -59,9 +179,186 @@ def create_app(sio_client: SocketIOClient, base_url: str = "", websocket_manager
         except (KeyError, TypeError):
             raise HTTPException(status_code=400, detail="Invalid request format. Required JSON: {'event': str, 'data': dict}")
 
-        await sio_client.client.emit(event, data)
+        try:
+            await sio_client.emit(event, data, body.get("priority", "normal"), body.get("coalesce_key"))
+        except EmitQueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         return {"status": "ok"}
 
+    @router.post("/send_messages")
+    async def send_messages(request: Request, ack: bool = False, ack_timeout: float = 10.0, max_inflight: int = 100):
+        """
+        Emits a batch of {"event", "data"} items over the single Socket.IO
+        connection. The body is a JSON array or a streamed NDJSON body.
+        Plain emits go through the outbound scheduler in order (waiting for
+        queue space rather than being rejected); items that request an ack
+        (per item "ack": true, or ?ack=true for all) wait for the server's
+        acknowledgement concurrently, at most max_inflight at a time.
+        """
+        if not sio_client.client.connected:
+            raise HTTPException(status_code=503, detail="Socket.IO client is not connected.")
+        if max_inflight <= 0:
+            raise HTTPException(status_code=400, detail="'max_inflight' must be a positive integer.")
+
+        results: List[dict] = []
+        ack_tasks: List[asyncio.Task] = []
+        emit_futures: List[Tuple[dict, asyncio.Future]] = []
+        inflight = asyncio.Semaphore(max_inflight)
+
+        async def call_with_ack(result: dict, event: str, data: Any):
+            try:
+                result["ack"] = await sio_client.call(event, data, ack_timeout, block=True)
+            except socketio.exceptions.TimeoutError:
+                result.update(status="error", error="ack timeout")
+            except Exception as e:
+                result.update(status="error", error=str(e))
+            finally:
+                inflight.release()
+
+        async for item in _iter_batch_items(request):
+            result = {"index": len(results), "status": "ok"}
+            results.append(result)
+            if isinstance(item, Exception):
+                result.update(status="error", error=f"invalid JSON: {item}")
+                continue
+            try:
+                event = item["event"]
+                data = item.get("data")
+            except (KeyError, TypeError, AttributeError):
+                result.update(status="error", error="item must be an object with an 'event' field")
+                continue
+
+            if item.get("ack", ack):
+                # Waiting for a free slot applies backpressure to the request body stream.
+                await inflight.acquire()
+                ack_tasks.append(asyncio.create_task(call_with_ack(result, event, data)))
+            else:
+                try:
+                    future = await sio_client.scheduler.submit(event, data, item.get("priority", "normal"),
+                                                               item.get("coalesce_key"), block=True)
+                    emit_futures.append((result, future))
+                except ValueError as e:
+                    result.update(status="error", error=str(e))
+
+        if ack_tasks:
+            await asyncio.gather(*ack_tasks)
+        for result, future in emit_futures:
+            try:
+                await future
+            except Exception as e:
+                result.update(status="error", error=str(e))
+
+        failed = sum(1 for result in results if result["status"] != "ok")
+        return {"status": "ok" if not failed else "partial", "sent": len(results) - failed, "failed": failed, "results": results}
+
+    @router.post("/call")
+    async def call_event(request: Request):
+        """
+        Emits an event and returns the server's acknowledgement as the HTTP response.
+        Body: {"event": str, "data": any, "timeout": float (optional)}
+        """
+        if not sio_client.client.connected:
+            raise HTTPException(status_code=503, detail="Socket.IO client is not connected.")
+
+        try:
+            body = await request.json()
+            event = body["event"]
+            data = body.get("data")
+            timeout = float(body["timeout"]) if body.get("timeout") is not None else None
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Invalid request format. Required JSON: {'event': str, 'data': any, 'timeout'?: float}")
+
+        start = time.perf_counter()
+        try:
+            ack = await sio_client.call(event, data, timeout)
+        except (CallCapacityError, EmitQueueFullError) as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        except socketio.exceptions.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"No acknowledgement for '{event}' within the timeout.")
+        return {"status": "ok", "ack": ack, "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+    @router.get("/call/stats")
+    async def call_stats():
+        """Returns in-flight count and per-event latency statistics for /call."""
+        return sio_client.get_call_stats()
+
+    @router.get("/emit/stats")
+    async def emit_stats():
+        """Returns outbound queue depth, counters and send latency of the emit scheduler."""
+        return sio_client.get_emit_stats()
+
+    @router.get("/dispatch/stats")
+    async def dispatch_stats():
+        """Returns runtime metrics (limits, queue depths, ...) of the active dispatchers and the overload controller."""
+        manager = app_context.get_event_handler_manager()
+        if not manager:
+            return {"dispatchers": []}
+        result = {"dispatchers": manager.dispatcher_stats()}
+        if manager.overload is not None:
+            result["overload"] = manager.overload.stats()
+        return result
+
+    @router.post("/admin/reload")
+    async def reload_config():
+        """
+        Reloads dispatch rules from the config file without reconnecting upstream
+        or dropping web clients. On error the current rules stay active.
+        """
+        reloader = app_context.get_config_reloader()
+        if reloader is None:
+            raise HTTPException(status_code=503, detail="Config reload is not available.")
+        try:
+            result = await reloader()
+        except Exception as e:
+            logger.error(f"Config reload failed: {e}")
+            raise HTTPException(status_code=400, detail=f"Config reload failed, keeping current rules: {e}")
+        return {"status": "ok", **result}
+
+    @router.get("/debug/traces")
+    async def debug_traces(limit: int = 100, event: Optional[str] = None, min_ms: float = 0.0):
+        """
+        Recent sampled event traces (newest first) with per-stage timings
+        (match, preprocess, summarize, submit, queue:<lane>, dispatch:<lane>,
+        encode:<format>), and p50/p99 per stage over the buffered traces.
+        """
+        return {**tracer.stats(), "stages": tracer.summary(), "traces": tracer.recent(limit, event, min_ms)}
+
+    @router.post("/debug/traces/config")
+    async def configure_traces(sample_rate: Optional[float] = None, buffer_size: Optional[int] = None):
+        """Changes the trace sample rate (0-1) and/or buffer size at runtime."""
+        try:
+            tracer.configure(sample_rate, buffer_size)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return tracer.stats()
+
+    @router.get("/debug/loop")
+    async def debug_loop():
+        """Event loop lag: how late a periodic timer fires, i.e. how long callbacks block the loop."""
+        monitor = app_context.get_loop_monitor()
+        if monitor is None:
+            raise HTTPException(status_code=503, detail="Loop lag monitor is not running.")
+        return monitor.stats()
+
+    @router.post("/admin/profile")
+    async def profile(seconds: float = 10.0, mode: str = "sampling", limit: int = 50):
+        """
+        Profiles the live event loop for `seconds` (at most 300) and returns a
+        text report. mode=sampling (low overhead, includes collapsed stacks)
+        or mode=cprofile (deterministic, slows the proxy while recording).
+        """
+        if not 0 < seconds <= 300:
+            raise HTTPException(status_code=400, detail="seconds must be in (0, 300].")
+        try:
+            report = await profile_loop(seconds, mode=mode, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ProfilerBusyError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return PlainTextResponse(report)
+
     @router.post("/restart_sio")
     async def restart_sio_connection():
         """
@@ -71,6 +368,22 @@ def create_app(sio_client: SocketIOClient, base_url: str = "", websocket_manager
         await sio_client.restart()
         return {"status": "ok", "message": "Socket.IO connection restarted."}
 
+    @router.get("/event_store")
+    async def query_event_store(start: Optional[str] = None, end: Optional[str] = None, event: Optional[str] = None,
+                                limit: Optional[int] = None, store: str = "default"):
+        """
+        Streams stored events with start <= ts <= end as NDJSON, oldest first.
+        """
+        event_store = app_context.get_event_store(store)
+        if not event_store:
+            raise HTTPException(status_code=404, detail=f"Event store '{store}' is not configured.")
+        if limit is not None and limit <= 0:
+            raise HTTPException(status_code=400, detail="'limit' must be a positive integer.")
+
+        chunks = event_store.query(_parse_time(start, "start"), _parse_time(end, "end"), event, limit)
+        # Starlette iterates sync generators in a threadpool, keeping disk reads off the event loop.
+        return StreamingResponse(chunks, media_type="application/x-ndjson")
+
     @router.post("/test")
     async def test_endpoint(request: Request):
         """
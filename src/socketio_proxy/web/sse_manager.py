@@ -0,0 +1,84 @@
+import asyncio
+from typing import AsyncIterator, Optional, Set, Tuple
+from socketio_proxy.config.logging import logger
+from socketio_proxy.web.websocket_manager import WebSocketManager, Frame
+from socketio_proxy.util.binary import binary_frame_to_json
+
+class SseClient:
+    """A single Server-Sent Events connection with its own bounded buffer."""
+    def __init__(self, events: Optional[Set[str]], buffer_size: int):
+        self.events = events
+        self.queue: asyncio.Queue[Tuple[int, bytes]] = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def matches(self, event: str) -> bool:
+        return not self.events or event in self.events
+
+class SseManager:
+    """
+    Serves published events as Server-Sent Events.
+    Each event is encoded into an SSE frame once and shared by all matching
+    clients. A client whose buffer overflows is disconnected; it reconnects
+    with Last-Event-ID and resumes from the WebSocketManager history.
+    """
+    KEEPALIVE_SECONDS = 15.0
+    KEEPALIVE_FRAME = b": keepalive\n\n"
+
+    def __init__(self, websocket_manager: WebSocketManager, buffer_size: int = 1000):
+        self.websocket_manager = websocket_manager
+        self.buffer_size = buffer_size
+        self.clients: Set[SseClient] = set()
+        websocket_manager.add_listener(self._on_publish)
+
+    @staticmethod
+    def encode_frame(seq: int, event: str, frame: Frame) -> bytes:
+        if isinstance(frame, bytes):
+            frame = binary_frame_to_json(frame)  # SSE is text-only: attachments as base64
+        return f"id: {seq}\nevent: {event}\ndata: {frame}\n\n".encode("utf-8")
+
+    def _on_publish(self, seq: int, message: dict, frame: Frame):
+        if not self.clients:
+            return
+        event = message.get("event", "")
+        sse_frame = None
+        for client in self.clients:
+            if client.overflowed or not client.matches(event):
+                continue
+            if sse_frame is None:
+                sse_frame = self.encode_frame(seq, event, frame)
+            try:
+                client.queue.put_nowait((seq, sse_frame))
+            except asyncio.QueueFull:
+                client.overflowed = True
+                logger.warning(f"SSE client buffer full ({self.buffer_size}), disconnecting it for resume.")
+
+    async def stream(self, events: Optional[Set[str]] = None, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Yields SSE frames for one client: first the buffered history after
+        last_event_id (if given), then live events, with periodic keepalives.
+        """
+        client = SseClient(events, self.buffer_size)
+        # Subscribe before reading the history so nothing published in between is missed.
+        self.clients.add(client)
+        try:
+            last_sent = 0
+            if last_event_id is not None:
+                frames, gap = self.websocket_manager.history.since(last_event_id)
+                if gap:
+                    yield b"event: gap\ndata: {}\n\n"
+                for seq, event, frame in frames:
+                    if client.matches(event):
+                        yield self.encode_frame(seq, event, frame)
+                    last_sent = seq
+
+            while not client.overflowed or not client.queue.empty():
+                try:
+                    seq, sse_frame = await asyncio.wait_for(client.queue.get(), timeout=self.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield self.KEEPALIVE_FRAME
+                    continue
+                if seq > last_sent:
+                    last_sent = seq
+                    yield sse_frame
+        finally:
+            self.clients.discard(client)
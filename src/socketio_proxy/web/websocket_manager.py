@@ -1,19 +1,160 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from fastapi import WebSocket
+from socketio_proxy.web.event_history import EventHistory
+from socketio_proxy.util.binary import has_binary, split_binary, join_binary, pack_binary, unpack_binary
+from socketio_proxy.util.wire_format import WireFormat
+from socketio_proxy.util.compression import Compressor
+from socketio_proxy.util.tracing import span
+
+Frame = Union[str, bytes]
+# What a client asked for: a non-JSON format (or None) and whether frames are deflate-compressed.
+Variant = Tuple[Optional[WireFormat], bool]
 
 class WebSocketManager:
     """
     Manages active WebSocket connections and broadcasts messages.
+    Published events are numbered and kept in a bounded history so new
+    clients can be backfilled and disconnected clients can resume.
+    Events with binary attachments are sent as binary frames (see
+    socketio_proxy.util.binary) instead of being expanded into JSON.
+    Clients may ask for msgpack or cbor frames, and for deflate-compressed
+    frames; each event is encoded and compressed at most once per variant
+    in use, not once per client.
     """
-    def __init__(self):
+    def __init__(self, history_size: int = 1000, history_max_bytes: int = 8 * 1024 * 1024, backfill: int = 100,
+                 compress_level: int = 6):
         self.active_connections: list[WebSocket] = []
+        self.history = EventHistory(history_size, history_max_bytes)
+        self.backfill = backfill
+        # Connections still receiving backfill; live frames are queued here meanwhile.
+        self._backfilling: Dict[WebSocket, List[Frame]] = {}
+        self._listeners: List[Callable[[int, dict, Frame], None]] = []
+        # Connections that asked for something other than uncompressed JSON.
+        self._variants: Dict[WebSocket, Variant] = {}
+        self.compressor = Compressor("deflate", level=compress_level, threshold=0, always=True)
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, backfill: Optional[int] = None, since: Optional[int] = None,
+                      wire_format: Optional[WireFormat] = None, compress: bool = False):
         await websocket.accept()
+        if since is not None:
+            frames = [frame for _, _, frame in self.history.since(since)[0]]
+        else:
+            frames = self.history.last(self.backfill if backfill is None else backfill)
+        if wire_format is not None and wire_format.name == "json":
+            wire_format = None
+        if wire_format is not None or compress:
+            variant = self._variants[websocket] = (wire_format, compress)
+            frames = [self._render(frame, None, variant) for frame in frames]
+
+        # Register and snapshot without awaiting in between, so no frame is lost or duplicated.
+        pending: List[Frame] = []
+        self._backfilling[websocket] = pending
         self.active_connections.append(websocket)
+        try:
+            for frame in frames:
+                await self._send(websocket, frame)
+            while pending:
+                frame = pending.pop(0)
+                await self._send(websocket, frame)
+        except BaseException:
+            # The client went away during backfill; don't leave it for broadcast() to trip over.
+            self.disconnect(websocket)
+            raise
+        finally:
+            self._backfilling.pop(websocket, None)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        self._backfilling.pop(websocket, None)
+        self._variants.pop(websocket, None)
+
+    @staticmethod
+    async def _send(websocket: WebSocket, frame: Frame):
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+
+    @staticmethod
+    def convert(frame: Frame, wire_format: WireFormat) -> bytes:
+        """Re-encodes a stored frame in another format (used for backfill only)."""
+        if isinstance(frame, bytes):
+            header, attachments = unpack_binary(frame)
+            return wire_format.encode(join_binary(header, attachments))
+        return wire_format.encode(json.loads(frame))
+
+    def _render(self, frame: Frame, source: Optional[dict], variant: Variant) -> bytes:
+        """Produces the frame a client with the given variant receives."""
+        wire_format, compress = variant
+        data: Frame = frame
+        if wire_format is not None:
+            data = wire_format.encode(source) if source is not None else self.convert(frame, wire_format)
+        if compress:
+            data = self.compressor.compress(data.encode("utf-8") if isinstance(data, str) else data)[0]
+        return data
+
+    def encode(self, message: dict) -> Frame:
+        """Assigns the next sequence number and encodes the frame once for all clients."""
+        seq = self.history.next_seq()
+        with span("encode:ws"):
+            if has_binary(message):
+                skeleton, attachments = split_binary(message)
+                frame = pack_binary({"seq": seq, **skeleton}, attachments)
+            else:
+                frame = json.dumps({"seq": seq, **message})
+        self.history.append(seq, frame, message.get("event", ""))
+        for listener in self._listeners:
+            listener(seq, message, frame)
+        return frame
+
+    def add_listener(self, listener: Callable[[int, dict, Frame], None]):
+        """Registers a synchronous callback invoked with (seq, message, frame) for every published event."""
+        self._listeners.append(listener)
+
+    async def publish(self, message: dict):
+        """Records the event in the history, notifies listeners and broadcasts it."""
+        frame = self.encode(message)
+        source = {"seq": self.history.last_seq, **message} if self._variants else None
+        await self.broadcast(frame, source)
+
+    async def publish_frame(self, seq: int, event: str, frame: Frame):
+        """
+        Records and broadcasts a frame already encoded and numbered by another
+        process (see socketio_proxy.core.web_workers). Listeners receive a
+        message containing only the event name.
+        """
+        self.history.record(seq, frame, event)
+        message = {"event": event}
+        for listener in self._listeners:
+            listener(seq, message, frame)
+        await self.broadcast(frame)
+
+    async def broadcast(self, message: Frame, source: Optional[dict] = None):
+        """
+        Sends a frame to every client. Clients that use another format get
+        `source` (or, without it, the decoded frame) encoded once per format,
+        and compressed once per variant.
+        """
+        rendered: Dict[Tuple[Optional[str], bool], bytes] = {}
+        for connection in list(self.active_connections):
+            frame = message
+            variant = self._variants.get(connection)
+            if variant is not None:
+                key = (variant[0].name if variant[0] else None, variant[1])
+                frame = rendered.get(key)
+                if frame is None:
+                    frame = rendered[key] = self._render(message, source, variant)
+            pending = self._backfilling.get(connection)
+            if pending is not None:
+                pending.append(frame)
+            else:
+                await self._send(connection, frame)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
\ No newline at end of file
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self.active_connections),
+            "history": self.history.stats(),
+            "compression": self.compressor.stats(),
+        }
@@ -76,12 +76,41 @@ const apiService = {
     }
 };
 
+/**
+ * 解析含二进制附件的帧: u32 头长度 | 头 JSON | u32 附件数 | (u32 长度 | 字节)* (大端序)。
+ * 附件以 "<N bytes>" 显示。
+ */
+function decodeBinaryFrame(buffer) {
+    const view = new DataView(buffer);
+    const headerLength = view.getUint32(0);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+    let offset = 4 + headerLength;
+    const count = view.getUint32(offset);
+    offset += 4;
+    const sizes = [];
+    for (let i = 0; i < count; i++) {
+        const size = view.getUint32(offset);
+        sizes.push(size);
+        offset += 4 + size;
+    }
+    const join = (value) => {
+        if (Array.isArray(value)) return value.map(join);
+        if (value && typeof value === 'object') {
+            if (value._placeholder === true && 'num' in value) return `<${sizes[value.num]} bytes>`;
+            return Object.fromEntries(Object.entries(value).map(([k, v]) => [k, join(v)]));
+        }
+        return value;
+    };
+    return join(header);
+}
+
 /**
  * WebSocket 服务，用于处理 WebSocket 连接和事件。
  */
 const webSocketService = {
     init: () => {
         const ws = new WebSocket(`ws://${window.location.host}${BASE_URL}/ws`);
+        ws.binaryType = 'arraybuffer';
 
         ws.onopen = (event) => {
             console.log('WebSocket connected:', event);
@@ -90,7 +119,7 @@ const webSocketService = {
 
         ws.onmessage = (event) => {
             try {
-                const message = JSON.parse(event.data);
+                const message = event.data instanceof ArrayBuffer ? decodeBinaryFrame(event.data) : JSON.parse(event.data);
                 processAndStoreMessage(message);
             } catch (e) {
                 console.error(`Received non-JSON message: ${event.data}`);
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from socketio_proxy.util.adaptive_limiter import AdaptiveLimiter, LimiterOverflowError
+
+def _saturate(limiter: AdaptiveLimiter, latency: float, ok: bool = True, rounds: int = 1):
+    """Runs `rounds` rounds of limit-many requests that all complete with `latency`."""
+    async def run():
+        for _ in range(rounds):
+            slots = int(limiter.limit)
+            for _ in range(slots):
+                await limiter.acquire()
+            for _ in range(slots):
+                limiter.release(latency, ok)
+    asyncio.run(run())
+
+def test_limit_grows_additively_while_latency_stays_low():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=6)
+    _saturate(limiter, 0.01)
+    assert 4 < limiter.limit < 5  # +1/limit per release made while the limit is in use
+    _saturate(limiter, 0.01, rounds=10)
+    assert limiter.limit == 6
+
+def test_limit_does_not_grow_when_it_is_not_used():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=10)
+        for _ in range(50):
+            await limiter.acquire()
+            limiter.release(0.01)
+        assert limiter.limit == 10
+    asyncio.run(run())
+
+def test_errors_back_off_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, backoff=0.5)
+    _saturate(limiter, latency=60.0, ok=False)
+    assert limiter.limit == 5  # the other nine failures belong to the same episode
+    assert limiter.errors == 10
+    _saturate(limiter, latency=0.0, ok=False)
+    assert limiter.limit == 2
+
+def test_rising_latency_shrinks_the_limit():
+    limiter = AdaptiveLimiter(initial_limit=10, tolerance=2.0, backoff=0.5)
+    _saturate(limiter, 0.01)
+    grown = limiter.limit
+    _saturate(limiter, 0.015)
+    assert limiter.limit > grown  # within tolerance of the best latency
+    _saturate(limiter, 0.05)
+    assert limiter.limit < grown
+
+def test_waiters_are_served_in_order():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1)
+        await limiter.acquire()
+        order = []
+        async def request(name):
+            await limiter.acquire()
+            order.append(name)
+        waiters = [asyncio.create_task(request(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued"] == 3
+        for _ in range(3):
+            limiter.release(0.01)
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiters)
+        assert order == [0, 1, 2]
+        assert limiter.inflight == 1
+    asyncio.run(run())
+
+@pytest.mark.parametrize("overflow, rejected", [("drop_new", "new"), ("drop_oldest", "oldest")])
+def test_full_queue_drops_by_policy(overflow, rejected):
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, queue_size=1, overflow=overflow)
+        await limiter.acquire()
+        oldest = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        new = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        dropped, kept = (new, oldest) if rejected == "new" else (oldest, new)
+        with pytest.raises(LimiterOverflowError):
+            await dropped
+        limiter.release(0.01)
+        await asyncio.wait_for(kept, 1)
+        assert limiter.dropped == 1
+    asyncio.run(run())
+
+def test_block_policy_waits_for_queue_space():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, queue_size=1, overflow="block")
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        blocked = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        limiter.release(0.01)
+        await queued
+        limiter.release(0.01)
+        await asyncio.wait_for(blocked, 1)
+        assert limiter.dropped == 0
+    asyncio.run(run())
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        limiter.release(0.01)
+        assert limiter.inflight == 0
+        assert limiter.stats()["queued"] == 0
+    asyncio.run(run())
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AdaptiveLimiter.from_config({"overflow": "drop_everything"})
@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+import pytest
+
+from socketio_proxy.core.emit_scheduler import EmitQueueFullError, EmitScheduler, TokenBucket
+from socketio_proxy.core.socketio_client import SocketIOClient
+
+class _Upstream:
+    """Records emits and answers calls in place of the Socket.IO client."""
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def emit(self, event, data):
+        await self.release.wait()
+        self.sent.append((event, data))
+
+    async def call(self, event, data, timeout=None):
+        await self.release.wait()
+        self.sent.append((event, data))
+        return {"ack": data}
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=10, burst=2)
+    now = bucket.updated
+    assert bucket.wait_time(now) == 0
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time(now) == pytest.approx(0.1)
+    assert bucket.wait_time(now + 0.11) == 0
+
+def test_higher_priority_lanes_are_served_first():
+    async def run():
+        upstream = _Upstream()
+        upstream.release.clear()
+        scheduler = EmitScheduler(upstream.emit)
+        futures = [await scheduler.submit("first", 0)]
+        await asyncio.sleep(0)  # the worker takes "first" and waits on the upstream
+        for event, priority in (("low", "low"), ("normal", "normal"), ("high", "high")):
+            futures.append(await scheduler.submit(event, 0, priority=priority))
+        upstream.release.set()
+        await asyncio.gather(*futures)
+        assert [event for event, _ in upstream.sent] == ["first", "high", "normal", "low"]
+        await scheduler.close()
+    asyncio.run(run())
+
+def test_coalescing_replaces_queued_data():
+    async def run():
+        upstream = _Upstream()
+        upstream.release.clear()
+        scheduler = EmitScheduler(upstream.emit)
+        blocker = await scheduler.submit("blocker", 0)
+        await asyncio.sleep(0)
+        futures = [await scheduler.submit("state", i, coalesce_key="room") for i in range(5)]
+        assert all(future is futures[0] for future in futures)
+        upstream.release.set()
+        await asyncio.gather(blocker, *futures)
+        assert upstream.sent == [("blocker", 0), ("state", 4)]
+        assert scheduler.stats()["coalesced"] == 4
+        await scheduler.close()
+    asyncio.run(run())
+
+def test_full_queue_rejects_or_blocks():
+    async def run():
+        upstream = _Upstream()
+        upstream.release.clear()
+        scheduler = EmitScheduler(upstream.emit, max_queue=2)
+        await scheduler.submit("a", 0)
+        await asyncio.sleep(0)
+        await scheduler.submit("a", 1)
+        await scheduler.submit("a", 2)
+        with pytest.raises(EmitQueueFullError):
+            await scheduler.submit("a", 3)
+        blocked = asyncio.create_task(scheduler.submit("a", 3, block=True))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        upstream.release.set()
+        await asyncio.wait_for(await blocked, 1)
+        assert [data for _, data in upstream.sent] == [0, 1, 2, 3]
+        assert scheduler.stats()["rejected"] == 1
+        await scheduler.close()
+    asyncio.run(run())
+
+def test_per_event_rate_limit_keeps_other_events_moving():
+    async def run():
+        upstream = _Upstream()
+        scheduler = EmitScheduler(upstream.emit, rate_limits={"slow": {"rate": 20, "burst": 1}})
+        start = time.monotonic()
+        futures = [await scheduler.submit("slow", i) for i in range(3)]
+        fast = await scheduler.submit("fast", 0)
+        await fast
+        assert time.monotonic() - start < 0.04
+        await asyncio.gather(*futures)
+        assert time.monotonic() - start >= 0.09
+        assert [data for event, data in upstream.sent if event == "slow"] == [0, 1, 2]
+        await scheduler.close()
+    asyncio.run(run())
+
+def test_close_fails_queued_and_in_flight_work_and_rejects_later_submits():
+    """Regression: closing left the emit being sent and pending calls unresolved."""
+    async def run():
+        upstream = _Upstream()
+        upstream.release.clear()
+        scheduler = EmitScheduler(upstream.emit, call=upstream.call)
+        call = await scheduler.submit("ask", 0, call_timeout=5)
+        await asyncio.sleep(0)
+        sending = await scheduler.submit("a", 1)
+        await asyncio.sleep(0)
+        queued = await scheduler.submit("a", 2)
+        await scheduler.close()
+        assert call.cancelled()
+        for future in (sending, queued):
+            with pytest.raises(ConnectionError):
+                future.result()
+        with pytest.raises(ConnectionError):
+            await scheduler.submit("a", 3)
+    asyncio.run(run())
+
+def _client(**emit_options) -> SocketIOClient:
+    client = SocketIOClient(emit_options=emit_options)
+    upstream = _Upstream()
+    client.scheduler._send = upstream.emit
+    client.scheduler._call = upstream.call
+    return client
+
+def test_calls_go_through_the_scheduler_rate_limit():
+    """Regression: /call bypassed the emit scheduler and its rate limits."""
+    async def run():
+        client = _client(rate_limits={"ask": {"rate": 20, "burst": 1}})
+        start = time.monotonic()
+        results = await asyncio.gather(*(client.call("ask", i, timeout=1) for i in range(3)))
+        assert results == [{"ack": i} for i in range(3)]
+        assert time.monotonic() - start >= 0.09
+        assert client.get_emit_stats()["sent"] == 3
+        assert client.get_call_stats()["events"]["ask"]["count"] == 3
+        await client.stop()
+        await client.http_client.aclose()
+    asyncio.run(run())
+
+def test_call_stats_fold_extra_event_names_into_other():
+    """Regression: every distinct event name passed to /call got its own stats entry forever."""
+    async def run():
+        client = _client()
+        for i in range(client.MAX_TRACKED_EVENTS + 50):
+            await client.call(f"event{i}", i, timeout=1)
+        events = client.get_call_stats()["events"]
+        assert len(events) == client.MAX_TRACKED_EVENTS + 1
+        assert events["event0"]["count"] == 1
+        assert events[client.OTHER_EVENTS]["count"] == 50
+        await client.stop()
+        await client.http_client.aclose()
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+
+from socketio_proxy.handlers.dispatchers import event_store_dispatcher
+from socketio_proxy.handlers.dispatchers.event_store_dispatcher import EventStoreDispatcher
+from socketio_proxy.util.event_store import INDEX_RECORD, EventStore
+
+def _events(store: EventStore, **query) -> list:
+    return [json.loads(line) for line in b"".join(store.query(**query)).splitlines()]
+
+def test_rotates_segments_and_queries_by_time_and_event(tmp_path):
+    store = EventStore(str(tmp_path), max_segment_bytes=200)
+    store.append_batch([(100.0 + i, "even" if i % 2 == 0 else "odd", {"i": i}) for i in range(20)])
+    assert len(list(tmp_path.glob("*.seg"))) > 1
+
+    assert [event["data"]["i"] for event in _events(store)] == list(range(20))
+    assert [event["data"]["i"] for event in _events(store, start=105, end=108)] == [5, 6, 7, 8]
+    assert [event["data"]["i"] for event in _events(store, event="odd", limit=3)] == [1, 3, 5]
+    assert [event["data"]["i"] for event in _events(store, start=110, event="even")] == [10, 12, 14, 16, 18]
+    store.close()
+
+def test_timestamps_stay_monotonic_when_the_clock_steps_back(tmp_path):
+    store = EventStore(str(tmp_path))
+    store.append_batch([(200.0, "a", 1), (150.0, "a", 2)])
+    assert [event["ts"] for event in _events(store)] == [200.0, 200.0]
+    store.close()
+
+def test_retention_drops_oldest_segments_but_not_the_active_one(tmp_path):
+    store = EventStore(str(tmp_path), max_segment_bytes=100, retention_bytes=400)
+    for i in range(30):
+        store.append_batch([(1000.0 + i, "e", "x" * 40)])
+    assert sum(os.path.getsize(path) for path in tmp_path.iterdir()) <= 400 + 100 + INDEX_RECORD.size
+    remaining = [event["data"] for event in _events(store)]
+    assert remaining and len(remaining) < 30
+    assert _events(store)[-1]["ts"] == 1029.0
+    store.close()
+
+def test_recovers_a_torn_tail(tmp_path):
+    store = EventStore(str(tmp_path))
+    store.append_batch([(1.0, "a", 1), (2.0, "b", 2)])
+    store.close()
+    data_path, = tmp_path.glob("*.seg")
+    index_path, = tmp_path.glob("*.idx")
+    with open(data_path, "ab") as f:
+        f.write(b'{"ts":3.0,"ev')
+    with open(index_path, "ab") as f:
+        f.write(b"\x00" * (INDEX_RECORD.size // 2))
+
+    store = EventStore(str(tmp_path))
+    store.append_batch([(3.0, "c", 3)])
+    assert [event["event"] for event in _events(store)] == ["a", "b", "c"]
+    store.close()
+
+def test_dispatchers_share_one_store_per_directory(tmp_path):
+    """Regression: a reload opened a second EventStore on the directory still written by the old one."""
+    async def run():
+        config = {"path": str(tmp_path), "retention_seconds": 100}
+        first = EventStoreDispatcher.from_config(config)
+        second = EventStoreDispatcher.from_config({**config, "retention_seconds": 200})
+        assert second.store is first.store
+        assert first.store.retention_seconds == 200
+        await first.dispatch({"event": "a", "data": 1})
+        await second.dispatch({"event": "b", "data": 2})
+
+        await first.close()
+        assert os.path.realpath(str(tmp_path)) in event_store_dispatcher._open_stores
+        await second.close()
+        assert os.path.realpath(str(tmp_path)) not in event_store_dispatcher._open_stores
+        assert [event["event"] for event in _events(EventStore(str(tmp_path)))] == ["a", "b"]
+    asyncio.run(run())
+
+def test_dispatch_waits_for_the_write_once_max_pending_is_reached(tmp_path):
+    """Regression: the pending buffer grew without bound while the disk fell behind."""
+    async def run():
+        dispatcher = EventStoreDispatcher.from_config({"path": str(tmp_path), "max_pending": 10})
+        for i in range(100):
+            await dispatcher.dispatch({"event": "e", "data": i})
+            assert len(dispatcher._pending) < 10
+        await dispatcher.close()
+        assert [event["data"] for event in _events(EventStore(str(tmp_path)))] == list(range(100))
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+import msgpack
+import pytest
+
+from socketio_proxy.handlers.dispatchers.http_dispatcher import HttpDispatcher
+from socketio_proxy.util.binary import BINARY_MEDIA_TYPE
+
+def _post(config: dict, message: dict, status: int = 200) -> httpx.Request:
+    """Dispatches one message with `config` and returns the request the webhook received."""
+    received = []
+    def handler(request: httpx.Request) -> httpx.Response:
+        request.read()
+        received.append(request)
+        return httpx.Response(status)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            dispatcher = HttpDispatcher.from_config({"url": "http://hook/events", **config}, http_client=client)
+            await dispatcher.dispatch(message)
+    asyncio.run(run())
+    request, = received
+    return request
+
+MESSAGE = {"event": "e", "data": {"text": "x" * 2000}}
+BINARY_MESSAGE = {"event": "e", "data": {"blob": b"\x00\x01\x02"}}
+
+def test_body_format_follows_config():
+    request = _post({"headers": {"X-Token": "t"}}, MESSAGE)
+    assert request.headers["content-type"] == "application/json"
+    assert request.headers["x-token"] == "t"
+    assert json.loads(request.content) == MESSAGE
+
+    request = _post({"format": "msgpack"}, BINARY_MESSAGE)
+    assert request.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(request.content) == BINARY_MESSAGE
+
+def test_large_bodies_are_compressed_with_a_matching_content_encoding():
+    request = _post({"compression": {"encoding": "gzip", "threshold": 100}}, MESSAGE)
+    assert request.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(request.content)) == MESSAGE
+
+    request = _post({"compression": {"encoding": "gzip", "threshold": 100}}, {"event": "e"})
+    assert "content-encoding" not in request.headers
+
+@pytest.mark.parametrize("binary, content_type", [("length", BINARY_MEDIA_TYPE), ("base64", "application/json")])
+def test_binary_modes(binary, content_type):
+    request = _post({"binary": binary}, BINARY_MESSAGE)
+    assert request.headers["content-type"] == content_type
+
+@pytest.mark.parametrize("header", ["Content-Type", "content-type"])
+def test_multipart_keeps_its_boundary_with_a_configured_content_type(header):
+    """Regression: a configured Content-Type replaced the multipart one and its boundary."""
+    request = _post({"headers": {header: "application/json", "X-Token": "t"}}, BINARY_MESSAGE)
+    assert request.headers.get_list("content-type") == [request.headers["content-type"]]
+    assert request.headers["content-type"].startswith("multipart/form-data; boundary=")
+    assert request.headers["x-token"] == "t"
+    assert b'name="attachment0"' in request.content
+
+def test_multipart_compression_keeps_the_boundary():
+    request = _post({"headers": {"Content-Type": "application/json"},
+                     "compression": {"encoding": "gzip", "threshold": 0}}, BINARY_MESSAGE)
+    assert request.headers["content-type"].startswith("multipart/form-data; boundary=")
+    boundary = request.headers["content-type"].split("boundary=")[1].encode()
+    assert boundary in gzip.decompress(request.content)
+
+def test_missing_url_is_rejected():
+    with pytest.raises(ValueError):
+        HttpDispatcher.from_config({}, http_client=None)
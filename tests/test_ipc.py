@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from socketio_proxy.core.emit_scheduler import EmitQueueFullError
+from socketio_proxy.core.ipc import IngestHub, RemoteSocketIOClient
+from socketio_proxy.core.socketio_client import SocketIOClient
+from socketio_proxy.web.websocket_manager import WebSocketManager
+
+async def _until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+def _run_with_worker(tmp_path, test, reloader=None, **emit_options):
+    """Runs `test(hub, worker, sent)` against a hub and one connected worker client."""
+    async def run():
+        sent = []
+        async def emit(event, data):
+            sent.append((event, data))
+        async def call(event, data, timeout=None):
+            return {"ack": data}
+
+        sio_client = SocketIOClient(emit_options=emit_options)
+        sio_client.scheduler._send = emit
+        sio_client.scheduler._call = call
+        hub = IngestHub(str(tmp_path / "hub.sock"), sio_client, WebSocketManager(), reloader=reloader)
+        worker = RemoteSocketIOClient(hub.path, WebSocketManager(), index=3)
+        await hub.start()
+        await worker.start()
+        try:
+            await _until(lambda: worker.status and any(w.index == 3 for w in hub.workers))
+            await test(hub, worker, sent)
+        finally:
+            await worker.stop()
+            await hub.stop()
+            await sio_client.stop()
+            await sio_client.http_client.aclose()
+    asyncio.run(run())
+
+def test_published_frames_reach_the_worker_encoded_once(tmp_path):
+    async def test(hub, worker, sent):
+        hub_manager = WebSocketManager()
+        hub_manager.add_listener(hub._on_publish)
+        frames = [hub_manager.encode({"event": "e", "data": i}) for i in range(3)]
+        await _until(lambda: worker.websocket_manager.history.last_seq == 3)
+        assert worker.websocket_manager.history.last(3) == frames
+        assert worker.status["connected"] is False
+    _run_with_worker(tmp_path, test)
+
+def test_emits_and_calls_run_on_the_ingest_client(tmp_path):
+    async def test(hub, worker, sent):
+        await worker.emit("chat", {"text": "hi"}, priority="high")
+        assert sent == [("chat", {"text": "hi"})]
+        assert await worker.call("ask", 1, timeout=1) == {"ack": 1}
+        assert hub.rpcs == 2
+        await _until(lambda: worker.get_call_stats().get("events", {}).get("ask"))
+    _run_with_worker(tmp_path, test)
+
+def test_errors_keep_their_type_across_the_channel(tmp_path):
+    async def test(hub, worker, sent):
+        with pytest.raises(ValueError):
+            await worker.emit("chat", None, priority="urgent")
+        with pytest.raises(RuntimeError):
+            await worker.reload()
+        hub.sio_client.scheduler.max_queue = 0
+        with pytest.raises(EmitQueueFullError):
+            await worker.emit("chat", None)
+    _run_with_worker(tmp_path, test)
+
+def test_reload_runs_the_ingest_reloader(tmp_path):
+    async def reloader():
+        return {"rules": 2}
+
+    async def test(hub, worker, sent):
+        assert await worker.reload() == {"rules": 2}
+    _run_with_worker(tmp_path, test, reloader=reloader)
+
+def test_rpcs_fail_fast_without_the_ingest_process(tmp_path):
+    async def test(hub, worker, sent):
+        await hub.stop()
+        await _until(lambda: worker._writer is None)
+        with pytest.raises(ConnectionError):
+            await worker.emit("chat", None)
+        assert worker.get_emit_stats() == {}
+    _run_with_worker(tmp_path, test)
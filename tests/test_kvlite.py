@@ -0,0 +1,67 @@
+import asyncio
+
+from socketio_proxy.util.kvlite import KvLite
+from socketio_proxy.util.sharded_kvlite import ShardedKvLite
+
+def test_stream_append_range_and_trim(tmp_path):
+    async def run():
+        async with await KvLite.create(str(tmp_path / "kv.db"), cleanup_interval=None) as kv:
+            ids = [await kv.xadd("s", {"n": i}) for i in range(5)]
+            assert ids == sorted(ids)
+            assert await kv.xlen("s") == 5
+            assert [value["n"] for _, value in await kv.xrange("s", ids[1], ids[3])] == [1, 2, 3]
+            assert [value["n"] for _, value in await kv.xread("s", after_id=ids[2])] == [3, 4]
+
+            await kv.xadd("s", {"n": 5}, maxlen=3)
+            assert [value["n"] for _, value in await kv.xrange("s")] == [3, 4, 5]
+            assert await kv.xtrim("s", maxlen=1) == 2
+            assert await kv.xlen("s") == 1
+    asyncio.run(run())
+
+def test_blocking_xread_wakes_on_xadd(tmp_path):
+    async def run():
+        async with await KvLite.create(str(tmp_path / "kv.db"), cleanup_interval=None) as kv:
+            reader = asyncio.create_task(kv.xread("s", block=5))
+            await asyncio.sleep(0.05)
+            entry_id = await kv.xadd("s", "hello")
+            assert await asyncio.wait_for(reader, 1) == [(entry_id, "hello")]
+            assert await kv.xread("s", after_id=entry_id, block=0.05) == []
+    asyncio.run(run())
+
+def test_consumer_group_offset_only_moves_forward(tmp_path):
+    async def run():
+        async with await KvLite.create(str(tmp_path / "kv.db"), cleanup_interval=None) as kv:
+            ids = [await kv.xadd("s", i) for i in range(3)]
+            assert await kv.xgroup_offset("s", "g") == 0
+            assert [value for _, value in await kv.xreadgroup("s", "g")] == [0, 1, 2]
+            assert await kv.xack("s", "g", ids[1]) == ids[1]
+            assert await kv.xack("s", "g", ids[0]) == ids[1]
+            assert [value for _, value in await kv.xreadgroup("s", "g")] == [2]
+    asyncio.run(run())
+
+def test_sharded_routes_keys_and_merges_scans(tmp_path):
+    async def run():
+        async with await ShardedKvLite.create(str(tmp_path / "kv.db"), shard_count=3, cleanup_interval=None) as kv:
+            items = {f"k{i:02d}": i for i in range(30)}
+            await kv.mset(items, group="g")
+            assert await kv.mget(list(items) + ["missing"], group="g") == items
+            assert sum([await shard.count_group("g") for shard in kv.shards]) == 30
+            assert all([await shard.count_group("g") for shard in kv.shards]), "keys should spread over every shard"
+
+            assert [key async for key in kv.scan(group="g", prefix="k1")] == [f"k1{i}" for i in range(10)]
+            scanned = [item async for item in kv.scan(group="g", count=4, with_values=True)]
+            assert scanned == sorted(items.items())
+            assert await kv.count_group("g") == 30
+            assert await kv.delete_prefix("k2", group="g") == 10
+            assert await kv.list_group("g") == sorted(key for key in items if not key.startswith("k2"))
+    asyncio.run(run())
+
+def test_sharded_stream_stays_on_one_shard(tmp_path):
+    async def run():
+        async with await ShardedKvLite.create(str(tmp_path / "kv.db"), shard_count=4, cleanup_interval=None) as kv:
+            ids = [await kv.xadd("events", i) for i in range(4)]
+            assert [value for _, value in await kv.xrange("events")] == [0, 1, 2, 3]
+            assert await kv.xack("events", "g", ids[1]) == ids[1]
+            assert [value for _, value in await kv.xreadgroup("events", "g")] == [2, 3]
+            assert sorted([await shard.xlen("events") for shard in kv.shards]) == [0, 0, 0, 4]
+    asyncio.run(run())
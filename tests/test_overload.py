@@ -0,0 +1,44 @@
+import pytest
+
+from socketio_proxy.handlers.overload import OverloadController
+
+class _LoopMonitor:
+    def __init__(self, lag_seconds: float = 0.0):
+        self.current = lag_seconds
+
+def _controller(lag_ms: float) -> OverloadController:
+    controller = OverloadController(loop_lag_ms=100, loop_monitor=_LoopMonitor(lag_ms / 1000))
+    controller.CHECK_INTERVAL = 0  # re-evaluate on every admit()
+    return controller
+
+@pytest.mark.parametrize("lag_ms, level", [(0, "ok"), (150, "shedding"), (250, "critical")])
+def test_normal_without_sample_rate_is_never_shed(lag_ms, level):
+    controller = _controller(lag_ms)
+    assert all(controller.admit("normal") for _ in range(100))
+    assert controller.stats()["level"] == level
+    assert controller.counts["normal"] == {"passed": 100, "shed": 0, "sampled_out": 0}
+
+@pytest.mark.parametrize("lag_ms", [150, 250])
+def test_normal_with_sample_rate_is_sampled_under_overload(lag_ms):
+    controller = _controller(lag_ms)
+    assert not any(controller.admit("normal", sample_rate=0.0) for _ in range(10))
+    assert all(controller.admit("normal", sample_rate=1.0) for _ in range(10))
+    assert controller.counts["normal"] == {"passed": 10, "shed": 0, "sampled_out": 10}
+
+def test_low_is_sampled_when_shedding_and_dropped_when_critical():
+    controller = _controller(150)
+    assert not controller.admit("low")
+    assert controller.admit("low", sample_rate=1.0)
+    controller.loop_monitor.current = 0.25
+    assert not controller.admit("low", sample_rate=1.0)
+    assert controller.counts["low"] == {"passed": 1, "shed": 2, "sampled_out": 0}
+
+def test_high_is_always_admitted():
+    controller = _controller(1000)
+    assert controller.admit("high")
+    assert controller.counts["high"]["passed"] == 1
+
+def test_disabled_without_thresholds():
+    controller = OverloadController(loop_monitor=_LoopMonitor(10.0))
+    assert controller.admit("low")
+    assert controller.stats()["level"] == "ok"
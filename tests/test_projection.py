@@ -0,0 +1,61 @@
+import pytest
+
+from socketio_proxy.util.projection import Projection, parse_path
+
+MESSAGE = {
+    "event": "e",
+    "data": {
+        "user": {"id": 1, "name": "n", "a/b": 2},
+        "items": [{"id": 1, "big": "zzz"}, {"id": 2, "big": "y"}],
+        "count": 5,
+    },
+}
+
+def test_parse_path_accepts_dotted_paths_and_json_pointers():
+    assert parse_path("data.user.id") == ["data", "user", "id"]
+    assert parse_path("/data/a~1b/c~0d") == ["data", "a/b", "c~d"]
+    for bad in ("", "data..id", "/", "data.", 3):
+        with pytest.raises(ValueError):
+            parse_path(bad)
+
+def test_fields_keep_only_the_listed_paths_and_the_event():
+    projection = Projection(fields=["data.user.id", "/data/user/a~1b", "data.items.*.id"])
+    assert projection(MESSAGE) == {
+        "event": "e",
+        "data": {"user": {"id": 1, "a/b": 2}, "items": [{"id": 1}, {"id": 2}]},
+    }
+
+def test_missing_paths_are_left_out():
+    assert Projection(fields=["data.missing.x", "data.count.x"])(MESSAGE) == {"event": "e", "data": {}}
+
+def test_shorter_path_covers_longer_ones():
+    projection = Projection(fields=["data.user.id", "data.user"])
+    assert projection(MESSAGE)["data"] == {"user": MESSAGE["data"]["user"]}
+
+def test_exclude_drops_paths_without_touching_the_original():
+    projection = Projection(exclude=["data.items.*.big", "data.user"])
+    result = projection(MESSAGE)
+    assert result == {"event": "e", "data": {"items": [{"id": 1}, {"id": 2}], "count": 5}}
+    assert MESSAGE["data"]["items"][0] == {"id": 1, "big": "zzz"}
+    assert "user" in MESSAGE["data"]
+
+def test_fields_and_exclude_combine():
+    assert Projection(fields=["data"], exclude=["data.items", "data.user"])(MESSAGE) == \
+        {"event": "e", "data": {"count": 5}}
+
+def test_result_is_reused_for_the_same_message_object():
+    projection = Projection(fields=["data.count"])
+    result = projection(MESSAGE)
+    assert projection(MESSAGE) is result
+    assert projection(dict(MESSAGE)) is not result
+
+def test_from_config_shares_projections_only_through_the_given_cache():
+    assert Projection.from_config({}) is None
+    assert Projection.from_config({"fields": "data.count"}).fields == ["data.count"]
+    assert Projection.from_config({"fields": ["data.count"]}) is not Projection.from_config({"fields": ["data.count"]})
+
+    shared = {}
+    first = Projection.from_config({"fields": ["data.count"]}, shared)
+    assert Projection.from_config({"fields": ["data.count"]}, shared) is first
+    assert Projection.from_config({"fields": ["data.count"], "exclude": ["data.x"]}, shared) is not first
+    assert len(shared) == 2
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from socketio_proxy.core.proxy_builder import SocketIOProxyBuilder
+from socketio_proxy.main import _install_reload_signal
+
+RULE = "    - schema: {{}}\n      dispatchers: [{dispatchers}]\n"
+
+def _write_config(path, *rules: str, extra: str = ""):
+    body = "".join(RULE.format(dispatchers=rule) for rule in rules)
+    path.write_text(f"dispatch:\n  rules:\n{body}{extra}")
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the default dispatcher writes unhandled_messages.log here
+    return tmp_path / "config.yaml"
+
+def test_failed_reload_closes_only_the_dispatchers_it_created(config, tmp_path):
+    """Regression: a reload that failed validation leaked the dispatchers it had already opened."""
+    async def run():
+        _write_config(config, f"{{type: file, path: {tmp_path / 'a.log'}}}")
+        builder = SocketIOProxyBuilder(str(config))
+        await builder.build()
+        manager = builder.dispatcher_manager
+        before = dict(manager._instance_cache)
+        closed = []
+        close_dispatcher = manager.close_dispatcher
+        async def spy(dispatcher):
+            closed.append(dispatcher.file_path)
+            await close_dispatcher(dispatcher)
+        manager.close_dispatcher = spy
+
+        _write_config(config, f"{{type: file, path: {tmp_path / 'a.log'}}}, {{type: file, path: {tmp_path / 'b.log'}}}",
+                      f"{{type: file, path: {tmp_path / 'c.log'}}}", extra="      priority: bogus\n")
+        with pytest.raises(ValueError):
+            await builder.reload_dispatch_rules()
+        assert manager._instance_cache == before
+        assert closed == [str(tmp_path / "b.log")]
+        await manager.close()
+        await builder.http_client.aclose()
+    asyncio.run(run())
+
+def test_projections_are_shared_and_pruned_across_reloads(config, tmp_path):
+    """Regression: every reload with new fields left its projection behind in a process-wide cache."""
+    async def run():
+        def rule(field: str) -> str:
+            return (f"{{type: file, path: {tmp_path / 'a.log'}, fields: [{field}]}}, "
+                    f"{{type: file, path: {tmp_path / 'b.log'}, fields: [{field}]}}")
+        _write_config(config, rule("data.f0"))
+        builder = SocketIOProxyBuilder(str(config))
+        await builder.build()
+        for i in range(1, 5):
+            _write_config(config, rule(f"data.f{i}"))
+            await builder.reload_dispatch_rules()
+
+        manager = builder.dispatcher_manager
+        first, second = [d for d in builder.event_handler_manager._current.dispatchers().values()
+                         if d.projection is not None]
+        assert first.projection is second.projection
+        assert first.projection.fields == ["data.f4"]
+        assert list(manager._projections.values()) == [first.projection]
+        await manager.close()
+        assert manager._projections == {}
+        await builder.http_client.aclose()
+    asyncio.run(run())
+
+def test_proxy_stop_closes_the_emit_scheduler(config, tmp_path):
+    """Regression: stop() disconnected the client but left the emit scheduler and its queue running."""
+    async def run():
+        _write_config(config, f"{{type: file, path: {tmp_path / 'a.log'}}}")
+        builder = SocketIOProxyBuilder(str(config))
+        proxy = await builder.build()
+        queued = await proxy.sio_client.scheduler.submit("event", 1)
+        await proxy.stop()
+        with pytest.raises(ConnectionError):
+            queued.result()
+        with pytest.raises(ConnectionError):
+            await proxy.sio_client.emit("event", 2)
+        await builder.dispatcher_manager.close()
+    asyncio.run(run())
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP is not available")
+def test_sighup_reloads_survive_failures_and_are_tracked_until_done():
+    """Regression: SIGHUP reload tasks were unreferenced, and a failed one was never reported."""
+    class Builder:
+        calls = 0
+        async def reload_dispatch_rules(self):
+            Builder.calls += 1
+            await asyncio.sleep(0.01)
+            if Builder.calls == 1:
+                raise ValueError("bad config")
+
+    async def run():
+        reloads = _install_reload_signal(Builder())
+        try:
+            os.kill(os.getpid(), signal.SIGHUP)
+            await asyncio.sleep(0.001)  # let the loop read the signal and start the reload
+            assert len(reloads) == 1
+            await asyncio.gather(*reloads)
+            os.kill(os.getpid(), signal.SIGHUP)
+            await asyncio.sleep(0.001)  # let the loop read the signal and start the reload
+            await asyncio.gather(*reloads)
+            assert Builder.calls == 2
+            assert not reloads
+        finally:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+    asyncio.run(run())
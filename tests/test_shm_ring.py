@@ -0,0 +1,81 @@
+import pytest
+
+from socketio_proxy.util.shm_ring import _TAIL, _WRITE, RingReader, RingWriter
+
+@pytest.fixture
+def ring_path(tmp_path):
+    return str(tmp_path / "events.ring")
+
+def test_latest_and_earliest_start(ring_path):
+    writer = RingWriter(ring_path, capacity=4096)
+    writer.write(b"old")
+    latest = RingReader(ring_path)
+    earliest = RingReader(ring_path, start="earliest")
+    writer.write(b"new")
+    assert latest.read() == ([(2, b"new")], 0)
+    assert earliest.read() == ([(1, b"old"), (2, b"new")], 0)
+    assert latest.read() == ([], 0)
+    assert latest.lag() == 0
+
+def test_reader_keeping_up_sees_every_record_across_wraps(ring_path):
+    writer = RingWriter(ring_path, capacity=1024)
+    reader = RingReader(ring_path)
+    seen = []
+    for i in range(500):
+        writer.write(bytes([i % 256]) * (i % 97))
+        records, lost = reader.read()
+        assert lost == 0
+        seen.extend(records)
+    assert [seq for seq, _ in seen] == list(range(1, 501))
+    assert all(payload == bytes([(seq - 1) % 256]) * ((seq - 1) % 97) for seq, payload in seen)
+
+def test_overrun_reports_lost_records_and_continues_in_order(ring_path):
+    writer = RingWriter(ring_path, capacity=1024)
+    reader = RingReader(ring_path)
+    for _ in range(50):
+        writer.write(b"x" * 100)
+    records, lost = reader.read()
+    assert records and lost == 50 - len(records)
+    assert [seq for seq, _ in records] == list(range(lost + 1, 51))
+    assert reader.overruns == 1
+    writer.write(b"y")
+    assert reader.read() == ([(51, b"y")], 0)
+
+def test_resync_to_an_empty_ring_does_not_read_a_stale_header(ring_path):
+    """Regression: with tail == write the reader took the seq of a stale header at tail."""
+    writer = RingWriter(ring_path, capacity=1024)
+    reader = RingReader(ring_path, start="earliest")
+    for _ in range(3):
+        writer.write(b"x" * 100)
+    assert [seq for seq, _ in reader.read()[0]] == [1, 2, 3]
+    for _ in range(30):
+        writer.write(b"y" * 100)
+    # The state right after a wrap that left no complete record in the ring.
+    writer.tail_pos = writer.write_pos
+    writer._fields[_TAIL] = writer._fields[_WRITE]
+    assert reader.read() == ([], 0)
+    assert reader.overruns == 1 and reader.lost == 0
+
+    seq = writer.write(b"z")
+    records, lost = reader.read()
+    assert records == [(seq, b"z")]
+    assert lost == seq - 4
+
+def test_reader_follows_a_recreated_ring(ring_path):
+    RingWriter(ring_path, capacity=1024).write(b"first run")
+    reader = RingReader(ring_path, start="earliest")
+    writer = RingWriter(ring_path, capacity=1024)
+    writer.write(b"second run")
+    assert reader.read() == ([(1, b"second run")], 0)
+    assert reader.resets == 1
+
+def test_invalid_records_and_files_are_rejected(ring_path, tmp_path):
+    writer = RingWriter(ring_path, capacity=1024)
+    with pytest.raises(ValueError):
+        writer.write(b"x" * writer.capacity)
+    other = tmp_path / "not-a-ring"
+    other.write_bytes(b"\x00" * 128)
+    with pytest.raises(ValueError):
+        RingReader(str(other))
+    with pytest.raises(ValueError):
+        RingReader(ring_path, start="middle")
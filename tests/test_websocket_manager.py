@@ -0,0 +1,95 @@
+import asyncio
+import json
+import zlib
+
+import msgpack
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from socketio_proxy.core.socketio_client import SocketIOClient
+from socketio_proxy.util.wire_format import get_format
+from socketio_proxy.web import routes
+from socketio_proxy.web.websocket_manager import WebSocketManager
+
+class _Socket:
+    """Stands in for a starlette WebSocket; `fail_after` sends succeed before it starts raising."""
+    def __init__(self, fail_after=None):
+        self.frames = []
+        self.fail_after = fail_after
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self.fail_after is not None and len(self.frames) >= self.fail_after:
+            raise RuntimeError("client went away")
+        self.frames.append(frame)
+
+    send_bytes = send_text
+
+def test_variants_are_rendered_once_and_backfill_is_converted():
+    async def run():
+        manager = WebSocketManager(backfill=10)
+        manager.encode({"event": "old", "data": 1})
+        plain, packed, packed_too, deflated = _Socket(), _Socket(), _Socket(), _Socket()
+        await manager.connect(plain)
+        await manager.connect(packed, wire_format=get_format("msgpack"))
+        await manager.connect(packed_too, wire_format=get_format("msgpack"))
+        await manager.connect(deflated, compress=True)
+        assert msgpack.unpackb(packed.frames[0]) == {"seq": 1, "event": "old", "data": 1}
+        assert json.loads(zlib.decompress(deflated.frames[0])) == {"seq": 1, "event": "old", "data": 1}
+
+        await manager.publish({"event": "new", "data": 2})
+        assert json.loads(plain.frames[-1]) == {"seq": 2, "event": "new", "data": 2}
+        assert packed.frames[-1] is packed_too.frames[-1]
+        assert msgpack.unpackb(packed.frames[-1]) == {"seq": 2, "event": "new", "data": 2}
+        assert manager.compressor.compressed == 2
+    asyncio.run(run())
+
+def test_resume_since_sends_only_newer_events():
+    async def run():
+        manager = WebSocketManager()
+        for i in range(5):
+            manager.encode({"event": "e", "data": i})
+        socket = _Socket()
+        await manager.connect(socket, since=3)
+        assert [json.loads(frame)["seq"] for frame in socket.frames] == [4, 5]
+    asyncio.run(run())
+
+def test_client_dropping_during_backfill_is_removed():
+    """Regression: a client that failed during backfill stayed registered and broke every broadcast."""
+    async def run():
+        manager = WebSocketManager()
+        for i in range(3):
+            manager.encode({"event": "e", "data": i})
+        dropped = _Socket(fail_after=1)
+        with pytest.raises(RuntimeError):
+            await manager.connect(dropped, wire_format=get_format("msgpack"))
+        assert manager.active_connections == []
+        assert manager._variants == {} and manager._backfilling == {}
+
+        healthy = _Socket()
+        await manager.connect(healthy, backfill=0)
+        await manager.publish({"event": "e", "data": 3})
+        assert len(healthy.frames) == 1
+        manager.disconnect(dropped)  # the route's cleanup after a failed connect is harmless
+    asyncio.run(run())
+
+@pytest.fixture
+def client():
+    manager = WebSocketManager()
+    manager.encode({"event": "hello", "data": "x" * 100})
+    return TestClient(routes.create_app(SocketIOClient(), websocket_manager=manager))
+
+def test_ws_negotiates_format_and_compression(client):
+    with client.websocket_connect("/ws?format=msgpack&compress=deflate") as websocket:
+        frame = websocket.receive_bytes()
+    assert msgpack.unpackb(zlib.decompress(frame)) == {"seq": 1, "event": "hello", "data": "x" * 100}
+
+@pytest.mark.parametrize("query", ["format=yaml", "compress=br"])
+def test_ws_rejects_unknown_format_or_compression(client, query):
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        with client.websocket_connect(f"/ws?{query}"):
+            pass
+    assert disconnect.value.code == 1003
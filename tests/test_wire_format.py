@@ -0,0 +1,72 @@
+import gzip
+import json
+import zlib
+
+import msgpack
+import pytest
+
+from socketio_proxy.util import wire_format
+from socketio_proxy.util.compression import Compressor
+from socketio_proxy.util.wire_format import encode, get_format
+
+def _cached_bytes() -> int:
+    return sum(len(data) for _, encodings in wire_format._cache.values() for data in encodings.values())
+
+def test_formats_round_trip():
+    message = {"event": "e", "data": {"n": 1, "text": "é"}}
+    for name in ("json", "msgpack"):
+        fmt = get_format(name)
+        assert fmt.decode(fmt.encode(message)) == message
+    assert get_format(None).name == "json"
+    with pytest.raises(ValueError):
+        get_format("yaml")
+
+def test_each_format_is_encoded_once_per_message():
+    message = {"event": "e", "data": list(range(10))}
+    json_format, msgpack_format = get_format("json"), get_format("msgpack")
+    data = encode(message, json_format)
+    assert encode(message, json_format) is data
+    assert json.loads(data) == message
+    assert msgpack.unpackb(encode(message, msgpack_format)) == message
+    assert encode(dict(message), json_format) is not data  # equal, but another message object
+
+def test_cache_is_bounded_by_total_bytes():
+    """Regression: the cache only counted entries, so large payloads stayed alive long after delivery."""
+    json_format, msgpack_format = get_format("json"), get_format("msgpack")
+    messages = [{"event": "e", "data": "x" * 100_000} for _ in range(200)]
+    for message in messages:
+        encode(message, json_format)
+        encode(message, msgpack_format)
+    assert wire_format._cache_bytes <= wire_format._CACHE_MAX_BYTES
+    assert wire_format._cache_bytes == _cached_bytes()
+
+    huge = {"event": "e", "data": b"x" * (wire_format._CACHE_MAX_BYTES + 1)}
+    encode(huge, msgpack_format)
+    assert id(huge) not in wire_format._cache
+
+    for i in range(wire_format._CACHE_SIZE * 2):
+        encode({"i": i}, json_format)
+    assert len(wire_format._cache) <= wire_format._CACHE_SIZE
+    assert wire_format._cache_bytes == _cached_bytes()
+
+def test_compressor_skips_small_and_incompressible_payloads():
+    compressor = Compressor("gzip", threshold=100)
+    assert compressor.compress(b"x" * 10) == (b"x" * 10, None)
+    noise = bytes(range(256)) * 2
+    assert compressor.compress(zlib.compress(noise)) == (zlib.compress(noise), None)
+    payload, encoding = compressor.compress(b"x" * 1000)
+    assert encoding == "gzip" and gzip.decompress(payload) == b"x" * 1000
+    assert compressor.stats()["compressed"] == 1 and compressor.stats()["skipped"] == 2
+    assert compressor.ratio > 1
+
+def test_always_compresses_for_receivers_that_expect_it():
+    compressor = Compressor("deflate", threshold=0, always=True)
+    payload, encoding = compressor.compress(b"ab")
+    assert encoding == "deflate" and zlib.decompress(payload) == b"ab"
+
+def test_compressor_from_config():
+    assert Compressor.from_config("deflate").encoding == "deflate"
+    compressor = Compressor.from_config({"encoding": "gzip", "level": 1, "threshold": 10})
+    assert (compressor.level, compressor.threshold) == (1, 10)
+    with pytest.raises(ValueError):
+        Compressor.from_config("br")